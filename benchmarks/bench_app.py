@@ -0,0 +1,276 @@
+# -----------------------------------------------------------------------------
+# Descripción del Código:
+# Benchmark de carga de los callbacks del dashboard. Ejecuta la aplicación en el
+# mismo proceso con el cliente de pruebas de Flask y envía las mismas solicitudes
+# que el navegador hace a `/_dash-update-component`:
+#
+# - `display_page` para las siete rutas (sesión iniciada).
+# - `login` con credenciales válidas e inválidas. El logout se resuelve en el
+#   navegador (callback del lado del cliente), así que no tiene solicitud que medir.
+# - La primera página de la tabla paginada de indicadores.
+# - `update_graph` de example_app_sheet.py con el cliente de Google Sheets en
+#   memoria (src/data/fake_gspread.py), al elegir columna y al hacer zoom.
+#
+# Para cada escenario informa la latencia p50/p95/p99 y el tamaño de la respuesta;
+# después simula sesiones concurrentes y mide el rendimiento (solicitudes/s).
+# Los resultados se guardan en JSON y se pueden comparar con otra ejecución.
+#
+# Uso:
+#   python benchmarks/bench_app.py
+#   python benchmarks/bench_app.py --iterations 200 --sessions 16 --output base.json
+#   python benchmarks/bench_app.py --compare base.json --threshold 0.2
+#
+# Con `--compare` el script termina con código 1 si el p95 de algún escenario
+# empeoró más que el umbral.
+# -----------------------------------------------------------------------------
+
+import argparse  # Lectura de parámetros de línea de comandos.
+import json  # Resultados en formato JSON.
+import os  # Variables de entorno y rutas.
+import platform  # Información del entorno de la medición.
+import random  # Secuencia de solicitudes de cada sesión.
+import subprocess  # Commit actual del repositorio.
+import sys  # Permite importar el paquete del proyecto.
+import threading  # Sesiones concurrentes.
+import time  # Medición de tiempos.
+from concurrent.futures import ThreadPoolExecutor  # Sesiones concurrentes.
+from datetime import datetime, timezone  # Fecha de la medición.
+
+import numpy as np  # Percentiles.
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(RAIZ)
+
+ROUTES = ['/', '/juridica', '/control-interno', '/administrativa', '/salud-publica', '/seguridad-social', '/aseguramiento']
+SHEET_COLUMNS = ['Natural_Gas_Price', 'Crude_oil_Price', 'Gold_Price']
+TABLE_OUTPUT = ('..{"key":["MATCH"],"source":["MATCH"],"type":"paged-table"}.data'
+                '...{"key":["MATCH"],"source":["MATCH"],"type":"paged-table"}.page_count'
+                '...{"key":["MATCH"],"source":["MATCH"],"type":"paged-table"}.page_current'
+                '...{"key":["MATCH"],"source":["MATCH"],"type":"paged-table-total"}.children..')
+
+
+def _prop(component_id, prop, value=None):
+    return {'id': component_id, 'property': prop, 'value': value}
+
+
+def _body(output, outputs, inputs, state=(), changed=()):
+    # Cuerpo de la solicitud que envía el navegador a /_dash-update-component.
+    return {'output': output, 'outputs': outputs, 'inputs': list(inputs), 'state': list(state),
+            'changedPropIds': list(changed)}
+
+
+def new_client(app):
+    # Cliente de pruebas con la sesión iniciada (los callbacks con datos comprueban la sesión del servidor).
+    from src.auth import SESSION_KEY
+    client = app.server.test_client()
+    if app.server.secret_key:
+        with client.session_transaction() as sesion:
+            sesion[SESSION_KEY] = True
+    return client
+
+
+def display_page_body(pathname):
+    return _body('page-content.children', {'id': 'page-content', 'property': 'children'},
+                 [_prop('route-store', 'data', pathname)], [], ['route-store.data'])
+
+
+def login_body(username, password):
+    return _body('..auth-store.data...login-output.children..',
+                 [{'id': 'auth-store', 'property': 'data'}, {'id': 'login-output', 'property': 'children'}],
+                 [_prop('login-button', 'n_clicks', 1)],
+                 [_prop('username', 'value', username), _prop('password', 'value', password)],
+                 ['login-button.n_clicks'])
+
+
+def table_body(source, key, page_current=0, search='', mode='all', search_column=None):
+    tabla = {'type': 'paged-table', 'source': source, 'key': key}
+    total = {'type': 'paged-table-total', 'source': source, 'key': key}
+    buscador = {'type': 'paged-table-search', 'source': source, 'key': key}
+    entradas = [_prop(tabla, p, v) for p, v in
+                [('page_current', page_current), ('page_size', 10), ('filter_query', ''), ('sort_by', [])]]
+    entradas += [_prop(buscador, 'value', search), _prop(dict(buscador, type='paged-table-search-mode'), 'value', mode)]
+    cambio = [json.dumps(buscador, sort_keys=True, separators=(',', ':')) + '.value'] if search else []
+    return _body(TABLE_OUTPUT, [{'id': tabla, 'property': 'data'}, {'id': tabla, 'property': 'page_count'},
+                                {'id': tabla, 'property': 'page_current'}, {'id': total, 'property': 'children'}],
+                 entradas, [_prop(dict(buscador, type='paged-table-search-column'), 'data', search_column),
+                            _prop(tabla, 'id', tabla)], cambio)
+
+
+def update_graph_body(columna, relayout=None):
+    cambio = 'graph-content.relayoutData' if relayout else 'dropdown-selection.value'
+    return _body('graph-content.figure', {'id': 'graph-content', 'property': 'figure'},
+                 [_prop('dropdown-selection', 'value', columna), _prop({'type': 'data-version', 'source': 'hoja'}, 'data', '0'),
+                  _prop('graph-content', 'relayoutData', relayout)], [], [cambio])
+
+
+def build_scenarios():
+    # Escenarios: nombre -> (aplicación, cuerpo de la solicitud). Las aplicaciones se
+    # importan aquí para que las variables de entorno ya estén configuradas.
+    from src.app import app
+    from config.settings import VALID_PASSWORD, VALID_USERNAME
+    app.server.test_client().get('/')  # Registra los callbacks globales en esta aplicación.
+    import example_app_sheet  # Aplicación de ejemplo con el cliente de Sheets en memoria.
+    example_app_sheet.app.server.test_client().get('/')
+
+    escenarios = {}
+    for ruta in ROUTES:
+        escenarios[f"display_page {ruta}"] = (app, display_page_body(ruta))
+    escenarios['login ok'] = (app, login_body(VALID_USERNAME, VALID_PASSWORD))
+    escenarios['login error'] = (app, login_body(VALID_USERNAME, 'incorrecta'))
+    escenarios['table page kpi'] = (app, table_body('kpi', 'juridica'))
+    for columna in SHEET_COLUMNS:
+        escenarios[f"update_graph {columna}"] = (example_app_sheet.app, update_graph_body(columna))
+    escenarios['update_graph zoom'] = (example_app_sheet.app, update_graph_body(
+        'Crude_oil_Price', {'xaxis.range[0]': 50, 'xaxis.range[1]': 150}))
+    return escenarios
+
+
+def request(client, body):
+    # Envía una solicitud y devuelve (segundos, bytes, código de estado).
+    inicio = time.perf_counter()
+    respuesta = client.post('/_dash-update-component', json=body)
+    datos = respuesta.get_data()
+    return time.perf_counter() - inicio, len(datos), respuesta.status_code
+
+
+def summarize(tiempos, tamanos, errores):
+    # Percentiles de latencia (ms) y tamaño medio de la respuesta.
+    ms = np.asarray(tiempos) * 1000
+    return {
+        'n': len(ms),
+        'errors': errores,
+        'p50_ms': round(float(np.percentile(ms, 50)), 3),
+        'p95_ms': round(float(np.percentile(ms, 95)), 3),
+        'p99_ms': round(float(np.percentile(ms, 99)), 3),
+        'mean_ms': round(float(ms.mean()), 3),
+        'bytes': int(np.mean(tamanos)),
+    }
+
+
+def run_sequential(escenarios, iteraciones):
+    # Cada escenario por separado, una solicitud a la vez.
+    resultados = {}
+    for nombre, (app, body) in escenarios.items():
+        client = new_client(app)
+        request(client, body)  # Calentamiento (cachés y primera serialización).
+        tiempos, tamanos, errores = [], [], 0
+        for _ in range(iteraciones):
+            t, n, estado = request(client, body)
+            tiempos.append(t)
+            tamanos.append(n)
+            errores += estado not in (200, 204)
+        resultados[nombre] = summarize(tiempos, tamanos, errores)
+        r = resultados[nombre]
+        print(f"{nombre:<32} p50 {r['p50_ms']:8.2f} ms  p95 {r['p95_ms']:8.2f} ms  "
+              f"p99 {r['p99_ms']:8.2f} ms  {r['bytes']:>9,} B")
+    return resultados
+
+
+def run_concurrent(escenarios, sesiones, solicitudes, semilla=0):
+    # Sesiones simultáneas: cada una envía una secuencia aleatoria de solicitudes.
+    nombres = list(escenarios)
+    tiempos, tamanos = [], []
+    errores = [0]
+    bloqueo = threading.Lock()
+
+    def sesion(n):
+        rng = random.Random(semilla + n)
+        clientes = {}
+        propios = []
+        for _ in range(solicitudes):
+            app, body = escenarios[rng.choice(nombres)]
+            client = clientes.setdefault(id(app), new_client(app))
+            t, tam, estado = request(client, body)
+            propios.append((t, tam, estado))
+        with bloqueo:
+            for t, tam, estado in propios:
+                tiempos.append(t)
+                tamanos.append(tam)
+                errores[0] += estado not in (200, 204)
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sesiones) as executor:
+        list(executor.map(sesion, range(sesiones)))
+    duracion = time.perf_counter() - inicio
+    resultado = summarize(tiempos, tamanos, errores[0])
+    resultado.update(sessions=sesiones, seconds=round(duracion, 3),
+                     throughput_rps=round(len(tiempos) / duracion, 2))
+    print(f"\nConcurrente: {sesiones} sesiones x {solicitudes} solicitudes -> "
+          f"{resultado['throughput_rps']:.1f} sol/s, p50 {resultado['p50_ms']:.2f} ms, "
+          f"p95 {resultado['p95_ms']:.2f} ms, p99 {resultado['p99_ms']:.2f} ms")
+    return resultado
+
+
+def _commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=RAIZ, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(actual, base, umbral):
+    # Compara el p95 de cada escenario con una ejecución anterior. Devuelve los que empeoraron.
+    empeorados = []
+    print(f"\nComparación con {base['meta'].get('commit')} (umbral {umbral:.0%}):")
+    filas = dict(actual['scenarios'], concurrente=actual['concurrent'])
+    filas_base = dict(base['scenarios'], concurrente=base.get('concurrent', {}))
+    for nombre, r in filas.items():
+        anterior = filas_base.get(nombre)
+        if not anterior:
+            continue
+        cambio = r['p95_ms'] / anterior['p95_ms'] - 1 if anterior['p95_ms'] else 0.0
+        marca = 'PEOR' if cambio > umbral else ''
+        print(f"{nombre:<32} p95 {anterior['p95_ms']:8.2f} -> {r['p95_ms']:8.2f} ms ({cambio:+.0%}) {marca}")
+        if cambio > umbral:
+            empeorados.append(nombre)
+    return empeorados
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de carga de los callbacks del dashboard')
+    parser.add_argument('--iterations', type=int, default=100, help='Solicitudes por escenario (secuencial)')
+    parser.add_argument('--sessions', type=int, default=8, help='Sesiones concurrentes')
+    parser.add_argument('--session-requests', type=int, default=50, help='Solicitudes por sesión')
+    parser.add_argument('--data-dir', default=None, help='Almacén de datos a usar (por defecto, datos de ejemplo)')
+    parser.add_argument('--output', default=os.path.join(RAIZ, 'benchmarks', 'results', 'bench_app.json'),
+                        help='Archivo JSON de resultados')
+    parser.add_argument('--compare', default=None, help='JSON de una ejecución anterior para comparar')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Aumento máximo permitido del p95')
+    args = parser.parse_args()
+
+    # Entorno de la medición: Sheets en memoria y datos de ejemplo (o el almacén indicado).
+    os.environ['SHEETS_CLIENT'] = 'fake'
+    if args.data_dir:
+        os.environ['DATA_DIR'] = os.path.abspath(args.data_dir)
+    else:
+        os.environ.setdefault('DATA_PROVIDER', 'sample')
+
+    escenarios = build_scenarios()
+    print(f"Escenarios: {len(escenarios)}, {args.iterations} solicitudes cada uno\n")
+    resultados = {
+        'meta': {
+            'commit': _commit(),
+            'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'args': {k: v for k, v in vars(args).items() if k not in ('output', 'compare')},
+        },
+        'scenarios': run_sequential(escenarios, args.iterations),
+        'concurrent': run_concurrent(escenarios, args.sessions, args.session_requests),
+    }
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(resultados, f, indent=2)
+    print(f"\nResultados guardados en {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            base = json.load(f)
+        if compare(resultados, base, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
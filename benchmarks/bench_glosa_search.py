@@ -0,0 +1,155 @@
+# -----------------------------------------------------------------------------
+# Descripción del Código:
+# Benchmark de la búsqueda de varias frases en las descripciones de las glosas
+# (`obs_glos`). Compara el índice de src/data/glosa_search.py contra una pasada de
+# `str.contains(case=False, regex=False)` por frase, que es como se buscaba antes.
+#
+# La entrada es el consolidado sintético de benchmarks/bench_glosas.py, separado
+# con `parse_glosas`. Las frases son fragmentos de textos reales de la entrada
+# (nombres, fechas, códigos) y algunas que no aparecen.
+#
+# Se mide:
+# - contains: una pasada de `str.contains` por frase sobre todas las filas.
+# - build: construcción del índice (una vez por versión de los datos).
+# - query: búsqueda de todas las frases con el índice ya construido (primera
+#   consulta y consulta repetida, que reutiliza los candidatos por palabra).
+# En cada corrida se verifica que las máscaras ('any' y 'all') sean iguales.
+#
+# Uso:
+#   python benchmarks/bench_glosa_search.py
+#   python benchmarks/bench_glosa_search.py --rows 5000000 --phrases 50 --output base.json
+#   python benchmarks/bench_glosa_search.py --compare base.json
+# -----------------------------------------------------------------------------
+
+import argparse  # Lectura de parámetros de línea de comandos.
+import json  # Resultados en formato JSON.
+import os  # Manejo de rutas.
+import platform  # Información del entorno de la medición.
+import subprocess  # Commit de la medición.
+import sys  # Permite importar el paquete del proyecto.
+import time  # Medición de tiempos.
+from datetime import datetime, timezone  # Fecha de la medición.
+
+import numpy as np  # Selección de frases y máscaras.
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(RAIZ)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from bench_glosas import generar_datos  # noqa: E402
+from src.data.glosa_search import GlosaSearch  # noqa: E402
+from src.data.glosas import parse_glosas  # noqa: E402
+
+MEDIDAS = ['contains_ms', 'build_ms', 'query_ms', 'query_repeat_ms']
+AUSENTES = ['sin glosa registrada', 'EPS999', '31/02/2023']  # Frases que no aparecen en la entrada.
+
+
+def generar_frases(textos, n, semilla=0):
+    # Fragmentos de `n` textos distintos (en minúsculas: la búsqueda no distingue mayúsculas).
+    rng = np.random.default_rng(semilla)
+    textos = [t for t in textos if len(t) >= 6]
+    frases = []
+    for i in rng.choice(len(textos), size=max(n - len(AUSENTES), 0), replace=len(textos) < n):
+        texto = textos[i]
+        inicio = int(rng.integers(0, len(texto) - 4))
+        fin = int(rng.integers(inicio + 4, min(len(texto), inicio + 20) + 1))
+        frases.append(texto[inicio:fin].lower())
+    return frases + AUSENTES[:n]
+
+
+def buscar_contains(s, frases, modo):
+    # Camino anterior: una pasada de `str.contains` por frase.
+    mascaras = [s.str.contains(f, case=False, regex=False).fillna(False).to_numpy(bool) for f in frases]
+    return np.logical_or.reduce(mascaras) if modo == 'any' else np.logical_and.reduce(mascaras)
+
+
+def medir(funcion, *args):
+    # Devuelve (milisegundos, resultado) de una ejecución.
+    inicio = time.perf_counter()
+    resultado = funcion(*args)
+    return (time.perf_counter() - inicio) * 1000, resultado
+
+
+def run(s, frases, modo):
+    # Tiempos de ambos caminos para un modo; falla si las máscaras no coinciden.
+    t_contains, esperado = medir(buscar_contains, s, frases, modo)
+    t_build, busqueda = medir(GlosaSearch, s)
+    t_query, mascara = medir(busqueda.mask, frases, modo)
+    t_repeat, repetida = medir(busqueda.mask, frases, modo)
+    if not (np.array_equal(mascara, esperado) and np.array_equal(repetida, esperado)):
+        raise AssertionError(f"La búsqueda con índice no coincide con str.contains (modo {modo})")
+    resumen = {'contains_ms': t_contains, 'build_ms': t_build, 'query_ms': t_query, 'query_repeat_ms': t_repeat}
+    resumen = {k: round(v, 1) for k, v in resumen.items()}
+    resumen['matches'] = int(esperado.sum())
+    print(f"{modo:<4} contains {t_contains:9.1f} ms  índice {t_build:8.1f} + {t_query:7.1f} ms "
+          f"(repetida {t_repeat:6.1f} ms)  {resumen['matches']:,} filas  "
+          f"aceleración {t_contains / (t_build + t_query):.1f}x ({t_contains / t_query:.0f}x sin construir)")
+    return resumen
+
+
+def _commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=RAIZ, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(actual, base, umbral):
+    # Compara cada medida con una ejecución anterior. Devuelve las que empeoraron.
+    empeoradas = []
+    print(f"\nComparación con {base['meta'].get('commit')} (umbral {umbral:.0%}):")
+    for modo, resumen in actual['modes'].items():
+        anterior = base['modes'].get(modo)
+        if not anterior:
+            continue
+        for medida in MEDIDAS:
+            antes, ahora = anterior[medida], resumen[medida]
+            cambio = ahora / antes - 1 if antes else 0.0
+            marca = 'PEOR' if cambio > umbral else ''
+            print(f"{modo:<4} {medida:<16} {antes:9.1f} -> {ahora:9.1f} ms ({cambio:+.0%}) {marca}")
+            if cambio > umbral:
+                empeoradas.append(f"{modo}.{medida}")
+    return empeoradas
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de la búsqueda de frases en las glosas')
+    parser.add_argument('--rows', type=int, default=2_000_000, help='Filas del consolidado sintético (antes de separar glosas)')
+    parser.add_argument('--phrases', type=int, default=30, help='Frases por búsqueda')
+    parser.add_argument('--output', default=os.path.join(RAIZ, 'benchmarks', 'results', 'bench_glosa_search.json'),
+                        help='Archivo JSON de resultados')
+    parser.add_argument('--compare', default=None, help='JSON de una ejecución anterior para comparar')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Aumento máximo permitido de cada medida')
+    args = parser.parse_args()
+
+    s = parse_glosas(generar_datos(args.rows))['obs_glos']
+    distintos = s.drop_duplicates()
+    frases = generar_frases(distintos.tolist(), args.phrases)
+    print(f"Entrada sintética: {len(s):,} glosas, {len(distintos):,} textos distintos, {len(frases)} frases")
+
+    resultados = {
+        'meta': {
+            'commit': _commit(),
+            'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'args': {'rows': args.rows, 'phrases': args.phrases},
+            'distinct_texts': len(distintos),
+        },
+        'modes': {modo: run(s, frases, modo) for modo in ('any', 'all')},
+    }
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(resultados, f, indent=2)
+    print(f"\nResultados guardados en {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            base = json.load(f)
+        if compare(resultados, base, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+# -----------------------------------------------------------------------------
+# Descripción del Código:
+# Benchmark de la separación de glosas. Compara `parse_glosas` (vectorizado,
+# src/data/glosas.py) contra el camino fila por fila que usaba el notebook
+# `1.conasolidado_ano.ipynb` (count_glosas con `.apply`, explode e `iterrows`
+# con `.at[]`) sobre una entrada sintética de 5 millones de registros.
+#
+# Uso:
+#   python benchmarks/bench_glosas.py                 # 5M filas en ambos caminos
+#   python benchmarks/bench_glosas.py --rows 1000000 --legacy-rows 200000
+#
+# Con `--legacy-rows` el camino fila por fila se mide sobre una muestra y su
+# tiempo se extrapola linealmente al total (el ciclo iterrows es lineal).
+# -----------------------------------------------------------------------------
+
+import argparse  # Lectura de parámetros de línea de comandos.
+import os  # Manejo de rutas.
+import re  # Expresiones regulares del camino original.
+import sys  # Permite importar el paquete del proyecto.
+import time  # Medición de tiempos.
+
+import numpy as np  # Generación de datos sintéticos.
+import pandas as pd  # Manejo de DataFrames.
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.data.glosas import parse_glosas  # noqa: E402
+
+# Plantillas de observaciones tomadas de los archivos .NEG reales.
+PLANTILLAS = np.array([
+    'GN0169(||||||);',
+    'GN0169(PRIMER APELLIDO|RIVAS|PONGUTA|SEGUNDO APELLIDO|BALLESTEROS);',
+    'GN0031(RC|{doc}|CHAPARRO|MENDIVELSON|AXEL|JOEL|S|EPS025);',
+    'GN0130(F|RE|10/10/2017);GN0088(F|RE|10/10/2017);GN0042(2);',
+    'GN0084(cnd_afl|01/11/2023);',
+    'GN0009(C|EPSC25|01/10/2022|85|410|C|AC|06/03/2023);',
+    '',
+], dtype=object)
+
+
+def generar_datos(filas, semilla=0):
+    # Genera un consolidado sintético con las columnas del notebook.
+    rng = np.random.default_rng(semilla)
+    docs = rng.integers(1_000_000, 1_300_000_000, size=filas).astype(str)
+    observs = PLANTILLAS[rng.integers(0, len(PLANTILLAS), size=filas)]
+    con_doc = observs == PLANTILLAS[2]  # Algunas glosas incluyen el documento y son todas distintas.
+    observs[con_doc] = [PLANTILLAS[2].format(doc=d) for d in docs[con_doc]]
+    observs[rng.random(filas) < 0.01] = np.nan  # Registros sin observaciones.
+    return pd.DataFrame({
+        'cod_reg': 'EPS025',
+        'tip_doc': rng.choice(['TI', 'RC', 'CC', 'CN'], size=filas),
+        'doc': docs,
+        'nov': rng.choice(['N01', 'N09', 'N14'], size=filas),
+        'observs': observs,
+    })
+
+
+def camino_fila_por_fila(df):
+    # Reproduce los pasos 4.7 a 4.7.2 del notebook original.
+    df = df.copy()
+
+    def count_glosas(observs):
+        if isinstance(observs, str):
+            return len(re.findall(r'GN\d{4}', observs))
+        return 0
+
+    df["No_Glosas"] = df["observs"].apply(count_glosas)
+    df['observaciones_split'] = df['observs'].str.split(';')
+    df = df.explode('observaciones_split').reset_index(drop=True)
+    df['obs_glos'] = ''
+
+    def separar_gn_glosa(texto):
+        if isinstance(texto, str):
+            match = re.match(r'(GN\d{4})(.*)', texto.strip())
+            if match:
+                return match.group(1), match.group(2).strip()
+        return texto, ''
+
+    for idx, row in df.iterrows():
+        gn, glosa = separar_gn_glosa(row['observaciones_split'])
+        df.at[idx, 'observaciones_split'] = gn
+        df.at[idx, 'obs_glos'] = glosa
+
+    df = df[df['observaciones_split'].notna()]
+    df = df[df['observaciones_split'].str.strip() != '']
+    return df
+
+
+def medir(funcion, df):
+    # Devuelve (segundos, resultado) de una ejecución.
+    inicio = time.perf_counter()
+    resultado = funcion(df)
+    return time.perf_counter() - inicio, resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de separación de glosas')
+    parser.add_argument('--rows', type=int, default=5_000_000, help='Filas del consolidado sintético')
+    parser.add_argument('--legacy-rows', type=int, default=None,
+                        help='Filas para medir el camino fila por fila (por defecto, todas)')
+    args = parser.parse_args()
+
+    df = generar_datos(args.rows)
+    print(f"Entrada sintética: {len(df):,} filas")
+
+    t_vec, resultado = medir(parse_glosas, df)
+    print(f"parse_glosas (vectorizado): {t_vec:.2f} s -> {len(resultado):,} filas de glosas")
+
+    filas_legacy = min(args.legacy_rows or args.rows, args.rows)
+    t_leg, esperado = medir(camino_fila_por_fila, df.iloc[:filas_legacy])
+    t_leg_total = t_leg * args.rows / filas_legacy
+    nota = '' if filas_legacy == args.rows else f" (medido sobre {filas_legacy:,} filas y extrapolado)"
+    print(f"Camino fila por fila (iterrows): {t_leg_total:.2f} s{nota}")
+    print(f"Aceleración: {t_leg_total / t_vec:.1f}x")
+
+    # Verificación de que ambos caminos producen el mismo resultado en la muestra.
+    muestra = parse_glosas(df.iloc[:filas_legacy])
+    muestra['observaciones_split'] = muestra['observaciones_split'].astype(object)
+    pd.testing.assert_frame_equal(esperado.reset_index(drop=True), muestra, check_dtype=False)
+    print("Resultados equivalentes en la muestra comparada.")
+
+
+if __name__ == '__main__':
+    main()
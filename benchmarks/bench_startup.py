@@ -0,0 +1,147 @@
+# -----------------------------------------------------------------------------
+# Descripción del Código:
+# Benchmark del arranque en frío. Cada medición se hace en un proceso nuevo de
+# Python (como un worker recién creado) y registra, desde el inicio del proceso:
+#
+# - import: tiempo de importación de la aplicación.
+# - first_response: primera respuesta del servidor (la página índice `/`).
+# - layout: layout y dependencias (`/_dash-layout`, `/_dash-dependencies`).
+# - first_data: primer callback con datos (página de una dirección o gráfico de la hoja).
+#
+# Objetivos: `app` (src/app.py) y `sheet` (example_app_sheet.py con el cliente de
+# Sheets en memoria). Los resultados se guardan en JSON y se pueden comparar con
+# otra ejecución, igual que benchmarks/bench_app.py.
+#
+# Uso:
+#   python benchmarks/bench_startup.py
+#   python benchmarks/bench_startup.py --runs 10 --output base.json
+#   python benchmarks/bench_startup.py --compare base.json
+# -----------------------------------------------------------------------------
+
+import argparse  # Lectura de parámetros de línea de comandos.
+import json  # Resultados en formato JSON.
+import os  # Variables de entorno y rutas.
+import platform  # Información del entorno de la medición.
+import subprocess  # Procesos nuevos para cada medición.
+import sys  # Intérprete actual.
+import time  # Medición de tiempos.
+from datetime import datetime, timezone  # Fecha de la medición.
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+ETAPAS = ['import', 'first_response', 'layout', 'first_data']
+
+
+def child(objetivo):
+    # Medición dentro de un proceso nuevo; imprime los tiempos acumulados en JSON.
+    inicio = time.perf_counter()
+    sys.path.append(RAIZ)
+    if objetivo == 'app':
+        from src.app import app
+    else:
+        from example_app_sheet import app
+    tiempos = {'import': time.perf_counter() - inicio}
+    client = app.server.test_client()
+    if objetivo == 'app':  # Sesión iniciada: display_page comprueba la sesión del servidor.
+        from src.auth import SESSION_KEY
+        with client.session_transaction() as sesion:
+            sesion[SESSION_KEY] = True
+    estados = [client.get('/').status_code]
+    tiempos['first_response'] = time.perf_counter() - inicio
+    estados += [client.get('/_dash-layout').status_code, client.get('/_dash-dependencies').status_code]
+    tiempos['layout'] = time.perf_counter() - inicio
+    import bench_app  # Cuerpos de las solicitudes (importa numpy, que el callback necesita de todos modos).
+    if objetivo == 'app':
+        body = bench_app.display_page_body('/juridica')
+    else:
+        body = bench_app.update_graph_body('Crude_oil_Price')
+    estados.append(client.post('/_dash-update-component', json=body).status_code)
+    tiempos['first_data'] = time.perf_counter() - inicio
+    print(json.dumps({'seconds': tiempos, 'errors': sum(e != 200 for e in estados)}))
+
+
+def measure(objetivo, corridas):
+    # Ejecuta `corridas` procesos nuevos y resume cada etapa (mediana y mínimo, en ms).
+    muestras, errores = [], 0
+    for _ in range(corridas):
+        salida = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', objetivo],
+                                cwd=RAIZ, capture_output=True, text=True, check=True).stdout
+        resultado = json.loads(salida.strip().splitlines()[-1])  # La última línea es la medición.
+        muestras.append(resultado['seconds'])
+        errores += resultado['errors']
+    resumen = {'runs': corridas, 'errors': errores}
+    for etapa in ETAPAS:
+        valores = sorted(m[etapa] * 1000 for m in muestras)
+        resumen[etapa] = {'median_ms': round(valores[len(valores) // 2], 1), 'min_ms': round(valores[0], 1)}
+    print(f"{objetivo:<6} " + '  '.join(f"{e} {resumen[e]['median_ms']:8.1f} ms" for e in ETAPAS))
+    return resumen
+
+
+def _commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=RAIZ, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(actual, base, umbral):
+    # Compara la mediana de cada etapa con una ejecución anterior. Devuelve las que empeoraron.
+    empeoradas = []
+    print(f"\nComparación con {base['meta'].get('commit')} (umbral {umbral:.0%}):")
+    for objetivo, resumen in actual['targets'].items():
+        anterior = base['targets'].get(objetivo)
+        if not anterior:
+            continue
+        for etapa in ETAPAS:
+            antes, ahora = anterior[etapa]['median_ms'], resumen[etapa]['median_ms']
+            cambio = ahora / antes - 1 if antes else 0.0
+            marca = 'PEOR' if cambio > umbral else ''
+            print(f"{objetivo:<6} {etapa:<15} {antes:8.1f} -> {ahora:8.1f} ms ({cambio:+.0%}) {marca}")
+            if cambio > umbral:
+                empeoradas.append(f"{objetivo}.{etapa}")
+    return empeoradas
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark del arranque en frío de la aplicación')
+    parser.add_argument('--runs', type=int, default=5, help='Procesos nuevos por objetivo')
+    parser.add_argument('--targets', default='app,sheet', help='Objetivos separados por coma (app, sheet)')
+    parser.add_argument('--output', default=os.path.join(RAIZ, 'benchmarks', 'results', 'bench_startup.json'),
+                        help='Archivo JSON de resultados')
+    parser.add_argument('--compare', default=None, help='JSON de una ejecución anterior para comparar')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Aumento máximo permitido de la mediana')
+    parser.add_argument('--child', default=None, help=argparse.SUPPRESS)  # Uso interno: medición en un proceso nuevo.
+    args = parser.parse_args()
+
+    # Entorno de la medición: Sheets en memoria y datos de ejemplo.
+    os.environ['SHEETS_CLIENT'] = 'fake'
+    os.environ.setdefault('DATA_PROVIDER', 'sample')
+    if args.child:
+        child(args.child)
+        return
+
+    resultados = {
+        'meta': {
+            'commit': _commit(),
+            'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'args': {'runs': args.runs, 'targets': args.targets},
+        },
+        'targets': {objetivo: measure(objetivo, args.runs) for objetivo in args.targets.split(',')},
+    }
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(resultados, f, indent=2)
+    print(f"\nResultados guardados en {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            base = json.load(f)
+        if compare(resultados, base, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -2,7 +2,10 @@
 # Se comunica con un archivo .env para obtener las credenciales y aplica estilos con hojas de estilo externas.
 # Los datos de usuario y contraseña se utilizan para validar el acceso a la aplicación.
 
+import json  # Manifiesto de los assets construidos
 import os  # Importa el módulo 'os' para interactuar con el sistema operativo
+import secrets  # Llave de la sesión si no se configura
+import tempfile  # Carpeta temporal del sistema
 from dotenv import load_dotenv  # Importa la función 'load_dotenv' para cargar variables de entorno desde un archivo .env
 
 # Cargar las variables de entorno desde un archivo .env
@@ -11,6 +14,10 @@ load_dotenv()
 # Credenciales de acceso obtenidas desde las variables de entorno, con valores predeterminados si no se encuentran definidas
 VALID_USERNAME = os.getenv('VALID_USERNAME', 'lumethik')  # Usuario válido, por defecto 'lumethik'
 VALID_PASSWORD = os.getenv('VALID_PASSWORD', '2025')  # Contraseña válida, por defecto '2025'
+# Llave con la que Flask firma la cookie de sesión (la sesión iniciada se comprueba en el servidor). Sin
+# SECRET_KEY se genera una al importar: con gunicorn (preload_app) la comparten los workers, pero las
+# sesiones se pierden al reiniciar el servidor
+SECRET_KEY = os.getenv('SECRET_KEY') or secrets.token_hex(32)
 
 # Paleta de colores utilizada en la aplicación
 COLORS = {
@@ -20,8 +27,112 @@ COLORS = {
     'text': '#2C3E50'  # Color del texto (azul oscuro)
 }
 
-# Hojas de estilo externas para el diseño de la aplicación
-EXTERNAL_STYLESHEETS = [
-    'https://cdn.jsdelivr.net/npm/bootstrap@5.1.3/dist/css/bootstrap.min.css',  # Hoja de estilo de Bootstrap 5 para componentes responsivos
-    'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css'  # Íconos de Font Awesome 6
-]
+# Hojas de estilo de Bootstrap y Font Awesome en la CDN (se usan si no se han construido las copias locales)
+CDN_STYLESHEETS = {
+    'bootstrap': 'https://cdn.jsdelivr.net/npm/bootstrap@5.1.3/dist/css/bootstrap.min.css',  # Hoja de estilo de Bootstrap 5 para componentes responsivos
+    'fontawesome': 'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css',  # Íconos de Font Awesome 6
+}
+
+# Carpeta de assets de Dash (custom.css se incluye en todas las páginas). `python scripts/build_assets.py`
+# deja en ASSETS_FOLDER/vendor las hojas de estilo y fuentes depuradas, con huella en el nombre y versiones
+# .gz/.br, y el manifiesto con sus nombres. Dash no incluye por su cuenta los archivos con huella (ASSETS_IGNORE).
+ASSETS_FOLDER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'static')
+ASSETS_IGNORE = r'\.[0-9a-f]{12}\.'
+VENDOR_DIR = 'vendor'
+ASSETS_MANIFEST = os.path.join(ASSETS_FOLDER, VENDOR_DIR, 'manifest.json')
+
+
+def _vendor_stylesheets():
+    # URLs de las hojas de estilo locales según el manifiesto (None si no se han construido).
+    try:
+        with open(ASSETS_MANIFEST, encoding='utf-8') as f:
+            archivos = json.load(f)['files']
+    except (OSError, ValueError, KeyError):
+        return None
+    if not all(nombre in archivos for nombre in CDN_STYLESHEETS):
+        return None
+    return [f"/assets/{VENDOR_DIR}/{archivos[nombre]}" for nombre in CDN_STYLESHEETS]
+
+
+# Hojas de estilo para el diseño de la aplicación: las copias locales o, si no existen, la CDN
+EXTERNAL_STYLESHEETS = _vendor_stylesheets() or list(CDN_STYLESHEETS.values())
+
+# Carpeta del almacén de datos (datasets Parquet particionados por año y mes)
+DATA_DIR = os.getenv('DATA_DIR', os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data'))
+
+# Nombres de los datasets dentro del almacén
+DATASET_NOVEDADES = os.getenv('DATASET_NOVEDADES', 'neg_all')  # Consolidado anual (1.conasolidado_ano.ipynb)
+DATASET_CONSOLIDADO = os.getenv('DATASET_CONSOLIDADO', 'mer_sub_neg_2018_2024')  # Unión multianual (2.final_merged.ipynb)
+
+# Fuente de datos del dashboard: 'auto' (Parquet si existe el consolidado, si no datos de ejemplo),
+# 'sample', 'parquet', 'csv' o 'sheets'
+DATA_PROVIDER = os.getenv('DATA_PROVIDER', 'auto')
+DATA_CSV_PATH = os.getenv('DATA_CSV_PATH', '')  # Ruta del CSV consolidado para el proveedor 'csv'
+
+# Hoja de Google Sheets para el proveedor 'sheets' (columnas Mes, Casos, Resueltos, Pendientes y opcional Direccion)
+SHEETS_KEY_FILE = os.getenv('SHEETS_KEY_FILE', 'key.json')
+SHEETS_SPREADSHEET_ID = os.getenv('SHEETS_SPREADSHEET_ID', '')
+SHEETS_WORKSHEET = os.getenv('SHEETS_WORKSHEET', 'indicadores')
+SHEETS_RANGE = os.getenv('SHEETS_RANGE', 'A:Z')  # Rango A1 que se lee de cada hoja
+SHEETS_REFRESH_SECONDS = int(os.getenv('SHEETS_REFRESH_SECONDS', '300'))  # Cada cuánto se consulta la hoja en segundo plano
+SHEETS_CLIENT = os.getenv('SHEETS_CLIENT', 'gspread')  # 'gspread' o 'fake' (cliente en memoria, sin credenciales)
+
+# Caché de datos por proceso: tiempo de vida (segundos) y número máximo de entradas
+CACHE_TTL = int(os.getenv('CACHE_TTL', '300'))
+CACHE_MAXSIZE = int(os.getenv('CACHE_MAXSIZE', '128'))
+# Carpeta de la caché en disco compartida entre workers (vacío = solo memoria del proceso)
+SHARED_CACHE_DIR = os.getenv('SHARED_CACHE_DIR', '')
+
+# Servidor: modo de depuración (solo desarrollo), compresión de respuestas y caché de los assets
+DEBUG = os.getenv('DASH_DEBUG', '0') == '1'
+COMPRESS = os.getenv('DASH_COMPRESS', '1') == '1'
+ASSETS_MAX_AGE = int(os.getenv('ASSETS_MAX_AGE', str(365 * 24 * 3600)))  # Segundos (un año)
+WARMUP = os.getenv('DASH_WARMUP', '0') == '1'  # Carga datos y figuras en segundo plano al arrancar el servidor
+
+# Avisos de nuevas versiones de los datos (Server-Sent Events en /events/data-version): cada cuánto se envía
+# un comentario para mantener viva la conexión y cuántas conexiones atiende cada proceso a la vez (0 = sin
+# límite). Con gunicorn cada conexión ocupa un hilo del worker: gunicorn.conf.py suma EVENTS_MAX_STREAMS
+# hilos a los WEB_THREADS de las solicitudes. Las que pasan del límite reciben los cambios pendientes y se
+# reconectan más tarde
+EVENTS_HEARTBEAT_SECONDS = int(os.getenv('EVENTS_HEARTBEAT_SECONDS', '30'))
+EVENTS_MAX_STREAMS = int(os.getenv('EVENTS_MAX_STREAMS', '32'))
+EVENTS_RETRY_SECONDS = int(os.getenv('EVENTS_RETRY_SECONDS', '5'))  # Espera del navegador antes de reconectarse
+
+# Exportación de los datasets (/export): carpeta de los archivos ya generados (para reanudar descargas),
+# cuánto tiempo se conservan y filas por bloque al leer el dataset
+EXPORT_DIR = os.getenv('EXPORT_DIR', os.path.join(tempfile.gettempdir(), 'dashboard_eps_exports'))
+EXPORT_MAX_AGE = int(os.getenv('EXPORT_MAX_AGE', str(24 * 3600)))  # Segundos
+EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', '65536'))
+
+# Filas por bloque al unir los consolidados anuales (.NEG, .csv, .xlsx) en el dataset multianual
+MERGE_CHUNKSIZE = int(os.getenv('MERGE_CHUNKSIZE', '200000'))
+
+# Novedades repetidas entre archivos (misma tip_doc, doc, nov y fech_nov): 'first' conserva la del reporte
+# más antiguo, 'last' la del más reciente y 'off' no deduplica
+DEDUP_POLICY = os.getenv('DATA_DEDUP', 'first')
+
+# Instantáneas de solo lectura del consolidado (columnas .npy mapeadas en memoria y compartidas entre workers):
+# se publican al terminar cada actualización del pipeline; se conservan las últimas SNAPSHOT_KEEP versiones
+SNAPSHOTS = os.getenv('DATA_SNAPSHOTS', '1') == '1'
+SNAPSHOT_KEEP = int(os.getenv('SNAPSHOT_KEEP', '2'))
+
+# Instrumentación opcional de los callbacks: tiempos por etapa, encabezado Server-Timing y /metrics
+PROFILING = os.getenv('DASH_PROFILING', '0') == '1'
+PROFILING_MEMORY = os.getenv('DASH_PROFILING_MEMORY', '0') == '1'  # Memoria por etapa con tracemalloc (más lento)
+PROFILING_WINDOW = int(os.getenv('DASH_PROFILING_WINDOW', '1000'))  # Mediciones que se conservan por métrica
+PROFILE_SLOWEST = int(os.getenv('DASH_PROFILE_SLOWEST', '0'))  # Perfiles cProfile de las N solicitudes más lentas (0 = no)
+PROFILE_DIR = os.getenv('DASH_PROFILE_DIR', 'profiles')  # Carpeta de los perfiles (.prof)
+
+# Códigos de novedad que corresponden a cada dirección (clave de la dirección -> lista de códigos, por
+# ejemplo 'juridica': ['N01', 'N09']). Los indicadores, la tabla de registros y la exportación de una
+# dirección solo cuentan esas novedades. Mientras una lista esté vacía la dirección no filtra y muestra
+# todas las novedades: con esta configuración inicial todas las direcciones ven los mismos indicadores.
+# Cambiar los códigos no obliga a reconstruir el cubo (se filtra al consultarlo).
+NOVEDADES_POR_DIRECCION = {
+    'juridica': [],
+    'control': [],
+    'administrativa': [],
+    'salud': [],
+    'seguridad': [],
+    'aseguramiento': [],
+}
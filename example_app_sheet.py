@@ -1,75 +1,142 @@
-from dash import Dash, html, dcc, callback, Output, Input  # Importación de las librerías necesarias de Dash
-import dash_table
-import plotly.express as px  # Para crear gráficos interactivos
-import pandas as pd  # Para la manipulación de datos con DataFrame
-import gspread  # Para trabajar con Google Sheets
-from oauth2client.service_account import ServiceAccountCredentials  # Para la autenticación en Google Sheets
+import threading  # Creación única del lector de la hoja entre hilos
 
-# Configuración de credenciales para acceder a Google Sheets
-scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]  # Alcance necesario para acceder a Google Sheets y Drive
-creds = ServiceAccountCredentials.from_json_keyfile_name('key.json', scope)  # Autenticación mediante las credenciales del archivo JSON
+from dash import Dash, html, dcc, callback, ctx, no_update, Output, Input  # Importación de las librerías necesarias de Dash
+from src.components.table import create_paged_table, register_table_callbacks, register_table_source  # Tabla paginada en el servidor
+from src.events import data_version_stores, events_stats, publish, register_data_events  # Avisos de datos nuevos (Server-Sent Events)
+from src.profiling import register_metrics_source, register_profiling, stage  # Instrumentación opcional (DASH_PROFILING=1)
+from src.startup import mark_imported, register_startup_hooks, register_warmup, start_warmup, startup_stats  # Arranque y precalentamiento
 
-# Autenticación con Google
-client = gspread.authorize(creds)  # Autoriza el cliente gspread para trabajar con Google Sheets
+# La hoja se consulta en un hilo de fondo (uno solo para todo el proceso) cada SHEETS_REFRESH_SECONDS.
+# El cliente de gspread se crea con la llave de SHEETS_KEY_FILE ('key.json'); con SHEETS_CLIENT=fake
+# se usa un cliente en memoria con datos de ejemplo.
+# El cliente y la primera lectura no se hacen al importar: empiezan con la primera solicitud
+# (o en el precalentamiento, al iniciar el servidor), así el servidor responde antes.
+# Cada vez que la hoja cambia se publica su versión y las pestañas abiertas la reciben por
+# /events/data-version: sin cambios en la hoja, las pestañas no hacen solicitudes.
+_refresher = None
+_refresher_lock = threading.Lock()  # Dos primeras solicitudes a la vez crean un solo lector (y un solo aviso)
 
-# Función para cargar los datos desde la hoja de Google Sheets
+def get_sheet_refresher():
+    global _refresher
+    if _refresher is None:
+        with _refresher_lock:
+            if _refresher is None:
+                from src.data.sheets import get_refresher  # Lectura de Google Sheets en segundo plano (pandas y gspread)
+                refresher = get_refresher('117Zx18JKM_lk-muHBjIPqFNeTrf_LIwL5OI-Cpx2yM4', 'dataset_limpio')  # Hoja por su id y nombre
+                refresher.add_listener(lambda version: publish('hoja', version))  # Avisa a las pestañas cuando cambia la hoja
+                refresher.wait(timeout=30)  # Espera la primera lectura de la hoja
+                publish('hoja', refresher.version)  # Versión de la primera lectura
+                _refresher = refresher
+    return _refresher
+
+# Función para obtener los datos de la hoja de Google Sheets
 def cargar_datos():
-    # Abre la hoja de Google utilizando la clave de la hoja (ID de la hoja de cálculo)
-    sheet = client.open_by_key('117Zx18JKM_lk-muHBjIPqFNeTrf_LIwL5OI-Cpx2yM4').worksheet('dataset_limpio')  # Selecciona la hoja activa por su nombre
-    # Extrae todos los registros de la hoja de cálculo (como lista de diccionarios)
-    data = sheet.get_all_records()  # Obtiene todos los datos en un formato de lista de diccionarios
-    df = pd.DataFrame(data)  # Convierte la lista de diccionarios en un DataFrame de pandas
-    return df  # Retorna el DataFrame con los datos
+    # Devuelve el último DataFrame leído por el hilo de fondo (no consulta la API)
+    return get_sheet_refresher().get()
 
-# Inicializa el DataFrame con los datos cargados al principio
-df = cargar_datos()  # Llama a la función cargar_datos para obtener los datos iniciales
+# Fuente de la tabla: se vuelve a crear solo cuando cambia la versión de la hoja
+_fuente = {'version': None, 'fuente': None}
 
-# Inicializa la aplicación Dash
-app = Dash()
+def fuente_hoja(key):
+    version = get_sheet_refresher().version
+    if _fuente['version'] != version:
+        from src.data.paging import FrameSource  # Páginas, filtros y orden sobre el DataFrame
+        _fuente['fuente'], _fuente['version'] = FrameSource(cargar_datos()), version
+    return _fuente['fuente']
 
-# Obtiene las columnas del DataFrame como una lista
-columnas = df.columns.tolist()  # Lista con los nombres de las columnas del DataFrame
+register_table_source('hoja', fuente_hoja)  # La tabla pide sus páginas a esta fuente
+
+# Inicializa la aplicación Dash
+# El layout es una función, así que los ids de los callbacks no se validan al importar.
+app = Dash(suppress_callback_exceptions=True)
+register_profiling(app)  # Tiempos por etapa, Server-Timing y /metrics
+register_startup_hooks(app)  # Tiempo hasta la primera respuesta
+register_metrics_source('hoja', lambda: _refresher.stats() if _refresher else None)  # Lecturas de la hoja en segundo plano
+register_metrics_source('arranque', startup_stats)
+register_metrics_source('avisos', events_stats)  # Conexiones abiertas y avisos enviados
+register_data_events(app)  # Ruta /events/data-version y conexión desde el navegador
+register_warmup('hoja', get_sheet_refresher)  # Primera lectura de la hoja (DASH_WARMUP=1)
 
 # Define el layout (diseño) de la aplicación
-app.layout = [
-    html.H1(children='Title of Dash App', style={'textAlign': 'center'}),  # Título de la aplicación (centrado)
-    dcc.Dropdown(  # Componente Dropdown (desplegable) para seleccionar la columna del gráfico
-        id='dropdown-selection',  # ID del componente, utilizado para conectarlo con el callback
-        options=[{'label': col, 'value': col} for col in columnas],  # Crea una lista de opciones para el Dropdown dinámicamente
-        value=columnas[0],  # Valor por defecto, selecciona la primera columna del DataFrame
-        style={'width': '50%'}  # Estilo CSS para el ancho del Dropdown
-    ),
-    dcc.Graph(id='graph-content'),  # Componente Graph para mostrar el gráfico generado
-    dcc.Interval(  # Componente Interval para actualizar la aplicación periódicamente
-        id='interval-component',  # ID del componente Interval
-        interval=5*60*1000,  # Intervalo de actualización en milisegundos (5 minutos)
-        n_intervals=0  # Número de intervalos que se han producido (comienza en 0)
-    ),
-    #Tabla de datos
-    html.Div(children='Tabla de datos'),
-    dash_table.DataTable(data=df.to_dict('records'), page_size=5),
-    #historgraama con el nombre de las columnas
-    html.Div(children='Histograma de precio de gas natural vs precio de crudo'),
-    dcc.Graph(figure=px.histogram(df, x='Natural_Gas_Price', y='Crude_oil_Price'))
-]
+# Se arma con la primera carga de la página y se reutiliza mientras no cambie la versión de la hoja.
+# Si la primera lectura falló (o no terminó a tiempo) la hoja llega vacía: la página muestra un aviso
+# y gráficos vacíos, y se vuelve a armar cuando llegan los datos (cambia la versión).
+_layout = {'version': None, 'layout': None}
+COLUMNAS_HISTOGRAMA = ['Natural_Gas_Price', 'Crude_oil_Price']  # Columnas que necesita el histograma
 
-# Callback que actualiza el gráfico en función del valor seleccionado en el Dropdown y el intervalo de tiempo
+def serve_layout():
+    version = get_sheet_refresher().version
+    if _layout['version'] == version:
+        return _layout['layout']
+    df = cargar_datos()  # Datos actuales de la hoja
+    from src.components.charts import histogram_figure, line_figure  # Histograma calculado en el servidor
+    # Obtiene las columnas del DataFrame como una lista
+    columnas = df.columns.tolist()  # Lista con los nombres de las columnas del DataFrame
+    completa = len(df) > 0 and all(c in columnas for c in COLUMNAS_HISTOGRAMA)  # La hoja trae los datos esperados
+    if completa:
+        histograma = histogram_figure(df['Natural_Gas_Price'], weights=df['Crude_oil_Price'],
+                                      x_title='Natural_Gas_Price', y_title='sum of Crude_oil_Price')
+    else:
+        histograma = line_figure([], [])  # Gráfico vacío mientras no haya datos
+    _layout['layout'] = [
+        html.H1(children='Title of Dash App', style={'textAlign': 'center'}),  # Título de la aplicación (centrado)
+        html.Div(  # Aviso cuando la hoja todavía no tiene datos (la lectura falló o no terminó)
+            children='' if completa else 'No se pudieron leer los datos de la hoja; se mostrarán en cuanto estén disponibles.',
+            role='alert', className='' if completa else 'alert alert-warning',
+        ),
+        dcc.Dropdown(  # Componente Dropdown (desplegable) para seleccionar la columna del gráfico
+            id='dropdown-selection',  # ID del componente, utilizado para conectarlo con el callback
+            options=[{'label': col, 'value': col} for col in columnas],  # Crea una lista de opciones para el Dropdown dinámicamente
+            value=columnas[0] if columnas else None,  # Valor por defecto, selecciona la primera columna del DataFrame
+            style={'width': '50%'}  # Estilo CSS para el ancho del Dropdown
+        ),
+        dcc.Graph(id='graph-content'),  # Componente Graph para mostrar el gráfico generado
+        *data_version_stores({'hoja': version}),  # Versión de la hoja; cambia con cada aviso del servidor
+        #Tabla de datos
+        html.Div(children='Tabla de datos'),
+        create_paged_table('hoja', 'dataset_limpio', fuente_hoja('dataset_limpio').columns(), page_size=5),  # Solo se envía la página visible
+        #historgraama con el nombre de las columnas (los intervalos se calculan en el servidor)
+        html.Div(children='Histograma de precio de gas natural vs precio de crudo'),
+        dcc.Graph(figure=histograma)
+    ]
+    _layout['version'] = version
+    return _layout['layout']
+
+app.layout = serve_layout
+
+# Callback que entrega las páginas de la tabla (paginación, filtros y orden en el servidor)
+register_table_callbacks(app)
+
+# Callback que actualiza el gráfico en función del valor seleccionado en el Dropdown, la versión de la hoja y el zoom
 @callback(
     Output('graph-content', 'figure'),  # Salida: el contenido del gráfico (figura)
     Input('dropdown-selection', 'value'),  # Entrada: valor seleccionado en el Dropdown
-    Input('interval-component', 'n_intervals')  # Entrada: número de intervalos (se activa cada vez que pasa el intervalo)
+    Input({'type': 'data-version', 'source': 'hoja'}, 'data'),  # Entrada: versión de la hoja (se activa solo cuando la hoja cambia)
+    Input('graph-content', 'relayoutData')  # Entrada: zoom del usuario sobre el gráfico
 )
-def update_graph(value, n_intervals):
-    # Recargar los datos desde Google Sheets cada vez que se activa el callback
-    df = cargar_datos()  # Llama a la función cargar_datos para obtener los datos actualizados
+def update_graph(value, version, relayout):
+    from src.components.charts import line_figure, relayout_range  # Gráficos reducidos en el servidor
+    # Se leen los últimos datos de la hoja desde la memoria (el hilo de fondo los mantiene al día)
+    with stage('data'):
+        df = cargar_datos()  # Llama a la función cargar_datos para obtener los datos actualizados
+    # Rango visible: al hacer zoom se vuelven a pedir los puntos de ese rango con más detalle
+    rango = None
+    if ctx.triggered_id == 'graph-content':
+        rango = relayout_range(relayout)
+        if rango is False:  # El evento no cambió el eje X
+            return no_update
     # Verifica que la columna seleccionada exista en el DataFrame
     if value in df.columns:
-        # Si la columna existe, crea un gráfico de línea utilizando Plotly Express
-        return px.line(df, x=df.index, y=value, title=f'Gráfico de {value}')  # Crea un gráfico de línea donde 'x' es el índice del DataFrame y 'y' es la columna seleccionada
+        # Si la columna existe, crea un gráfico de línea (reducido con LTTB y con WebGL si tiene muchos puntos)
+        with stage('figure'):
+            return line_figure(df.index, df[value], title=f'Gráfico de {value}', x_range=rango)  # 'x' es el índice del DataFrame y 'y' es la columna seleccionada
     else:
         # Si la columna no existe, retorna un gráfico vacío
-        return px.line()  # Retorna un gráfico vacío si la columna seleccionada no existe
+        return line_figure([], [])  # Retorna un gráfico vacío si la columna seleccionada no existe
+
+mark_imported('example_app_sheet')  # Tiempo de importación
 
 # Ejecuta la aplicación Dash
 if __name__ == '__main__':  
+    start_warmup()  # Con DASH_WARMUP=1 lee la hoja en segundo plano mientras el servidor arranca
     app.run(debug=True)  # Ejecuta el servidor de la aplicación en modo de depuración para ver los errores y actualizaciones en tiempo real
@@ -0,0 +1,59 @@
+# -----------------------------------------------------------------------------
+# Descripción del Código:
+# Configuración de gunicorn para servir `wsgi:server` en producción:
+#
+#     gunicorn -c gunicorn.conf.py wsgi:server
+#
+# - Varios workers (procesos) con varios hilos cada uno, para que un callback
+#   lento no bloquee a los demás usuarios. Se ajustan con WEB_WORKERS y WEB_THREADS.
+# - Los avisos de datos nuevos (/events/data-version, src/events.py) mantienen la
+#   conexión abierta mientras la pestaña está abierta, y con workers gthread cada
+#   conexión ocupa un hilo. Por eso cada worker tiene WEB_THREADS hilos para las
+#   solicitudes más EVENTS_MAX_STREAMS (32) para las conexiones de avisos: el worker
+#   atiende hasta EVENTS_MAX_STREAMS pestañas sin quedarse sin hilos para los
+#   callbacks. Con más pestañas abiertas por worker hay que subir EVENTS_MAX_STREAMS
+#   (o WEB_WORKERS); las que pasan del límite reciben los cambios al reconectarse,
+#   cada 6 x EVENTS_RETRY_SECONDS.
+# - `preload_app`: la aplicación (layouts estáticos, plantillas) se carga una vez
+#   en el proceso principal y los workers la comparten al crearse.
+# - Los workers comparten la caché de datos en disco (SHARED_CACHE_DIR), así que
+#   los datasets y figuras se cargan una vez y no una vez por worker.
+# - La aplicación se importa sin datos; con DASH_WARMUP=1 cada worker los carga en
+#   un hilo de fondo al iniciar (`post_worker_init`), sin dejar de responder.
+#
+# Variables de entorno:
+# - WEB_BIND (0.0.0.0:8050), WEB_WORKERS (2 x núcleos + 1), WEB_THREADS (4),
+#   EVENTS_MAX_STREAMS (32), WEB_TIMEOUT (120), SHARED_CACHE_DIR (carpeta temporal
+#   del sistema), DASH_WARMUP.
+# -----------------------------------------------------------------------------
+
+import multiprocessing  # Número de núcleos.
+import os  # Variables de entorno.
+import tempfile  # Carpeta temporal para la caché compartida.
+
+# La caché compartida debe estar configurada antes de que se importe la aplicación.
+os.environ.setdefault('SHARED_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'dashboard_eps_cache'))
+os.environ.setdefault('DASH_DEBUG', '0')
+# Conexiones de avisos por worker; la aplicación lee el mismo valor (config/settings.py).
+events_streams = int(os.environ.setdefault('EVENTS_MAX_STREAMS', '32'))
+
+bind = os.getenv('WEB_BIND', '0.0.0.0:8050')
+workers = int(os.getenv('WEB_WORKERS', str(multiprocessing.cpu_count() * 2 + 1)))
+if events_streams <= 0:
+    raise ValueError("EVENTS_MAX_STREAMS debe ser mayor que 0 con workers gthread (cada conexión ocupa un hilo)")
+threads = int(os.getenv('WEB_THREADS', '4')) + events_streams  # Hilos de las solicitudes más los de los avisos.
+worker_class = 'gthread'  # Workers con hilos.
+timeout = int(os.getenv('WEB_TIMEOUT', '120'))
+graceful_timeout = 30
+keepalive = 5
+preload_app = True
+max_requests = int(os.getenv('WEB_MAX_REQUESTS', '1000'))  # Reinicio periódico de los workers.
+max_requests_jitter = 100
+accesslog = '-'
+errorlog = '-'
+
+
+def post_worker_init(worker):
+    # Con DASH_WARMUP=1 cada worker carga datos y figuras en segundo plano mientras ya atiende solicitudes.
+    from src.startup import start_warmup
+    start_warmup()
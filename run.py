@@ -2,8 +2,11 @@
 # Descripción del Código:
 # Este código es el punto de entrada para ejecutar la aplicación Dash. Importa 
 # la instancia de la aplicación desde `src.app` y ejecuta el servidor de Dash 
-# cuando el script se ejecuta directamente. Se establece el modo de depuración 
-# (`debug=True`) para facilitar la detección de errores y mejorar el desarrollo.
+# cuando el script se ejecuta directamente con el servidor de desarrollo de Dash.
+# El modo de depuración se activa con DASH_DEBUG=1 (solo para desarrollo).
+#
+# En producción no se usa este archivo: gunicorn sirve `wsgi:server` con varios
+# workers (ver gunicorn.conf.py).
 # 
 # Información Enviada:
 # - La aplicación Dash se ejecuta en el servidor, permitiendo visualizar la interfaz 
@@ -13,7 +16,10 @@
 # - La instancia de la aplicación Dash `app` se importa desde `src.app`.
 # -----------------------------------------------------------------------------
 
+from config.settings import DEBUG  # Modo de depuración (DASH_DEBUG).
 from src.app import app  # Importa la instancia de la aplicación Dash.
+from src.startup import start_warmup  # Precalentamiento opcional (DASH_WARMUP=1).
 
 if __name__ == '__main__':  # Verifica si el script se ejecuta directamente.
-    app.run_server(debug=True)  # Inicia el servidor de la aplicación Dash en modo depuración.
+    start_warmup()  # Carga datos y figuras en segundo plano mientras el servidor arranca.
+    app.run(debug=DEBUG)  # Inicia el servidor de desarrollo de Dash.
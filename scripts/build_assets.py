@@ -0,0 +1,391 @@
+# -----------------------------------------------------------------------------
+# Descripción del Código:
+# Construye las copias locales de Bootstrap y Font Awesome para que las páginas no
+# dependan de jsdelivr/cdnjs (en la red del hospital esas CDN son lentas o están
+# bloqueadas y el primer pintado las espera).
+#
+# Pasos:
+# 1. Descarga (o lee de archivos locales) las hojas de estilo de CDN_STYLESHEETS.
+# 2. Quita los selectores que la aplicación no usa. Las clases usadas son las
+#    palabras de los textos de src/ (className="...") y de static/, más las que
+#    agregan los componentes de dash-bootstrap-components que aparecen en el
+#    código (DBC_CLASSES). Un selector se conserva si todas sus clases se usan;
+#    las reglas sin clases (elementos, :root) se conservan siempre. Los
+#    @font-face y @keyframes que ya nadie referencia también se quitan.
+# 3. Copia las fuentes que siguen referenciadas (url(...)) y reescribe las URLs.
+# 4. Escribe cada archivo con la huella del contenido en el nombre
+#    (bootstrap.<sha256[:12]>.css) y sus versiones .gz y .br.
+# 5. Guarda `manifest.json`, que config/settings.py usa para enlazar las copias
+#    locales; sin manifiesto la aplicación sigue usando la CDN.
+#
+# Las salidas quedan en ASSETS_FOLDER/vendor (static/vendor/), fuera del control de
+# versiones; se construyen en el despliegue.
+#
+# Uso:
+#   python scripts/build_assets.py
+#   python scripts/build_assets.py --source bootstrap=/ruta/bootstrap.min.css \
+#       --source fontawesome=/ruta/fontawesome-free-6.0.0-web/css/all.min.css
+#   python scripts/build_assets.py --no-purge
+#
+# Con `--source` se leen archivos locales (por ejemplo el paquete descargado en otra
+# máquina); las fuentes se buscan junto a la hoja de estilo, como en la CDN.
+# -----------------------------------------------------------------------------
+
+import argparse  # Lectura de parámetros de línea de comandos.
+import ast  # Textos del código de la aplicación.
+import gzip  # Versiones .gz.
+import hashlib  # Huella del contenido.
+import json  # Manifiesto.
+import os  # Rutas.
+import re  # Selectores y URLs de las hojas de estilo.
+import shutil  # Limpieza de la carpeta de salida.
+import sys  # Permite importar el paquete del proyecto.
+import urllib.parse  # URLs relativas de las fuentes.
+import urllib.request  # Descarga desde la CDN.
+from datetime import datetime, timezone  # Fecha de la construcción.
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(RAIZ)
+from config.settings import ASSETS_FOLDER, ASSETS_MANIFEST, CDN_STYLESHEETS, VENDOR_DIR  # noqa: E402
+
+try:
+    import brotli  # Versiones .br (lo instala Flask-Compress).
+except ImportError:
+    brotli = None
+
+# Prefijos de las clases que agrega cada componente de dash-bootstrap-components
+# (según sus propiedades: color, md, dark, ...). Se conservan solo los de los
+# componentes que aparecen en el código.
+DBC_CLASSES = {
+    'Alert': ('alert', 'btn-close', 'fade', 'show'),
+    'Badge': ('badge', 'bg', 'text', 'rounded-pill'),
+    'Button': ('btn', 'active', 'disabled'),
+    'Card': ('card',),
+    'CardBody': ('card-body',),
+    'CardHeader': ('card-header',),
+    'CardFooter': ('card-footer',),
+    'Col': ('col',),
+    'Collapse': ('collapse', 'collapsing', 'show'),
+    'Container': ('container',),
+    'DropdownMenu': ('dropdown', 'dropdown-menu', 'dropdown-toggle', 'nav-item', 'nav-link', 'btn', 'show'),
+    'DropdownMenuItem': ('dropdown-item', 'active', 'disabled'),
+    'Input': ('form-control', 'is-valid', 'is-invalid'),
+    'Nav': ('nav', 'navbar-nav'),
+    'NavItem': ('nav-item',),
+    'NavLink': ('nav-link', 'active', 'disabled'),
+    'NavbarSimple': ('navbar', 'navbar-brand', 'navbar-toggler', 'navbar-collapse', 'navbar-nav', 'collapse',
+                     'collapsing', 'show', 'container', 'bg', 'ms-auto'),
+    'Row': ('row', 'g', 'gx', 'gy', 'row-cols'),
+    'Spinner': ('spinner-border', 'spinner-grow', 'visually-hidden'),
+    'Table': ('table',),
+    'Tooltip': ('tooltip', 'bs-tooltip', 'fade', 'show'),
+}
+HASH_LENGTH = 12  # Caracteres de la huella (coincide con ASSETS_IGNORE).
+SKIP_COMPRESSION = ('.woff', '.woff2')  # Formatos ya comprimidos.
+_CLASS = re.compile(r'\.((?:[_a-zA-Z]|-[_a-zA-Z]|\\.)(?:[\w-]|\\.)*)')
+_URL = re.compile(r'url\(\s*([\'"]?)([^\'")]+)\1\s*\)')
+
+
+# --- Lectura de las hojas de estilo y de las clases usadas ------------------------
+
+def read_source(origen, relativo=None):
+    # Contenido (bytes) de una URL o de un archivo local; `relativo` se resuelve contra `origen`.
+    if relativo is not None:
+        if re.match(r'^https?://', origen):
+            origen = urllib.parse.urljoin(origen, relativo)
+        else:
+            origen = os.path.normpath(os.path.join(os.path.dirname(origen), relativo))
+    if re.match(r'^https?://', origen):
+        with urllib.request.urlopen(origen, timeout=60) as respuesta:
+            return respuesta.read()
+    with open(origen, 'rb') as f:
+        return f.read()
+
+
+def used_classes(carpetas):
+    # Palabras de los textos del código (Python) y de los assets propios (CSS/JS), y
+    # componentes de dash-bootstrap-components usados.
+    palabras, componentes = set(), set()
+    for carpeta in carpetas:
+        for actual, directorios, archivos in os.walk(carpeta):
+            directorios[:] = [d for d in directorios if d not in (VENDOR_DIR, '__pycache__')]
+            for archivo in archivos:
+                ruta = os.path.join(actual, archivo)
+                if archivo.endswith('.py'):
+                    with open(ruta, encoding='utf-8') as f:
+                        arbol = ast.parse(f.read())
+                    for nodo in ast.walk(arbol):
+                        if isinstance(nodo, ast.Constant) and isinstance(nodo.value, str):
+                            palabras.update(nodo.value.split())
+                        elif (isinstance(nodo, ast.Attribute) and isinstance(nodo.value, ast.Name)
+                              and nodo.value.id == 'dbc'):
+                            componentes.add(nodo.attr)
+                elif archivo.endswith(('.css', '.js')):
+                    with open(ruta, encoding='utf-8') as f:
+                        palabras.update(re.findall(r'[\w-]+', f.read()))
+    prefijos = tuple(p for c in sorted(componentes) for p in DBC_CLASSES.get(c, ()))
+    return palabras, prefijos
+
+
+# --- Lectura y escritura de CSS ---------------------------------------------------
+
+def _skip(texto, i, cierre):
+    # Posición después del final de un texto entre comillas o de un comentario.
+    fin = texto.find(cierre, i)
+    while cierre in '"\'' and fin > 0 and texto[fin - 1] == '\\' and texto[fin - 2] != '\\':
+        fin = texto.find(cierre, fin + 1)
+    return len(texto) if fin < 0 else fin + len(cierre)
+
+
+def _scan(texto, i, paradas):
+    # Avanza hasta un carácter de `paradas` fuera de comillas, comentarios y paréntesis.
+    profundidad = 0
+    while i < len(texto):
+        c = texto[i]
+        if c in '"\'':
+            i = _skip(texto, i + 1, c)
+            continue
+        if texto.startswith('/*', i):
+            i = _skip(texto, i + 2, '*/')
+            continue
+        if c in '([':
+            profundidad += 1
+        elif c in ')]':
+            profundidad -= 1
+        elif profundidad == 0 and c in paradas:
+            return i
+        i += 1
+    return i
+
+
+def _block_end(texto, i):
+    # Posición de la llave que cierra el bloque que empieza en `i` (después de '{').
+    nivel = 1
+    while i < len(texto):
+        i = _scan(texto, i, '{}')
+        if i >= len(texto):
+            break
+        nivel += 1 if texto[i] == '{' else -1
+        if nivel == 0:
+            return i
+        i += 1
+    return len(texto)
+
+
+def parse_css(texto):
+    # Lista de nodos: ('comment', texto), ('rule', selectores, cuerpo), ('at', preludio, cuerpo)
+    # y ('group', preludio, nodos) para @media, @supports y similares.
+    nodos, i = [], 0
+    while i < len(texto):
+        while i < len(texto) and texto[i].isspace():
+            i += 1
+        if i >= len(texto):
+            break
+        if texto.startswith('/*', i):
+            fin = _skip(texto, i + 2, '*/')
+            nodos.append(('comment', texto[i:fin]))
+            i = fin
+            continue
+        fin = _scan(texto, i, '{;}')
+        preludio = texto[i:fin].strip()
+        if fin >= len(texto) or texto[fin] != '{':
+            if preludio:
+                nodos.append(('at', preludio, None))  # @charset, @import, ...
+            i = fin + 1
+            continue
+        cierre = _block_end(texto, fin + 1)
+        cuerpo = texto[fin + 1:cierre]
+        if re.match(r'@(media|supports|layer|container|document)\b', preludio):
+            nodos.append(('group', preludio, parse_css(cuerpo)))
+        elif preludio.startswith('@'):
+            nodos.append(('at', preludio, cuerpo))
+        else:
+            nodos.append(('rule', preludio, cuerpo))
+        i = cierre + 1
+    return nodos
+
+
+def write_css(nodos):
+    # CSS (sin espacios innecesarios) a partir de los nodos.
+    partes = []
+    for nodo in nodos:
+        if nodo[0] == 'comment':
+            partes.append(nodo[1])
+        elif nodo[0] == 'group':
+            partes.append(f"{nodo[1]}{{{write_css(nodo[2])}}}")
+        elif nodo[2] is None:
+            partes.append(f"{nodo[1]};")
+        else:
+            partes.append(f"{nodo[1]}{{{nodo[2]}}}")
+    return ''.join(partes)
+
+
+# --- Depuración de selectores -----------------------------------------------------
+
+def split_selectors(selectores):
+    # Selectores de una lista separada por comas (las comas dentro de :is(), [..] no cuentan).
+    partes, i = [], 0
+    while i <= len(selectores):
+        fin = _scan(selectores, i, ',')
+        partes.append(selectores[i:fin].strip())
+        i = fin + 1
+    return [p for p in partes if p]
+
+
+def selector_classes(selector):
+    # Clases que exige un selector. Las de :not(...) y los textos de [atributo="..."] no cuentan.
+    selector = re.sub(r'\[[^\]]*\]', '', selector)
+    while ':not(' in selector:
+        inicio = selector.index(':not(')
+        fin = _scan(selector, inicio + 5, ')')
+        selector = selector[:inicio] + selector[fin + 1:]
+    return [re.sub(r'\\(.)', r'\1', c) for c in _CLASS.findall(selector)]
+
+
+def is_used(clase, palabras, prefijos):
+    return clase in palabras or any(clase == p or clase.startswith(p + '-') for p in prefijos)
+
+
+def purge(nodos, palabras, prefijos):
+    # Nodos sin los selectores que usan clases que la aplicación no tiene.
+    resultado = []
+    for nodo in nodos:
+        if nodo[0] == 'rule':
+            vivos = [s for s in split_selectors(nodo[1])
+                     if all(is_used(c, palabras, prefijos) for c in selector_classes(s))]
+            if vivos:
+                resultado.append(('rule', ','.join(vivos), nodo[2]))
+        elif nodo[0] == 'group':
+            hijos = purge(nodo[2], palabras, prefijos)
+            if hijos:
+                resultado.append(('group', nodo[1], hijos))
+        elif nodo[0] == 'comment':
+            if nodo[1].startswith('/*!'):  # Licencias.
+                resultado.append(nodo)
+        else:
+            resultado.append(nodo)
+    return _drop_unreferenced(resultado)
+
+
+def _drop_unreferenced(nodos):
+    # Quita los @font-face y @keyframes que ninguna regla conservada nombra.
+    def cuerpos(lista):
+        for nodo in lista:
+            if nodo[0] == 'rule':
+                yield nodo[2]
+            elif nodo[0] == 'group':
+                yield from cuerpos(nodo[2])
+    usado = ' '.join(cuerpos(nodos))
+
+    def filtrar(lista):
+        salida = []
+        for nodo in lista:
+            if nodo[0] == 'at' and nodo[2] is not None:
+                familia = re.search(r'font-family:\s*([\'"]?)([^;\'"}]+)\1', nodo[2])
+                if nodo[1] == '@font-face' and familia and familia.group(2) not in usado:
+                    continue
+                animacion = re.match(r'@(?:-webkit-)?keyframes\s+(\S+)', nodo[1])
+                if animacion and not re.search(rf'(?<![\w-]){re.escape(animacion.group(1))}(?![\w-])', usado):
+                    continue
+            elif nodo[0] == 'group':
+                hijos = filtrar(nodo[2])
+                if not hijos:
+                    continue
+                nodo = ('group', nodo[1], hijos)
+            salida.append(nodo)
+        return salida
+    return filtrar(nodos)
+
+
+# --- Salidas con huella ---------------------------------------------------------
+
+def hashed_name(nombre, contenido):
+    # nombre.ext -> nombre.<huella>.ext
+    base, ext = os.path.splitext(nombre)
+    return f"{base}.{hashlib.sha256(contenido).hexdigest()[:HASH_LENGTH]}{ext}"
+
+
+def write_asset(carpeta, nombre, contenido):
+    # Escribe el archivo y sus versiones comprimidas; devuelve los tamaños.
+    tamanos = {'raw': len(contenido)}
+    with open(os.path.join(carpeta, nombre), 'wb') as f:
+        f.write(contenido)
+    if not nombre.endswith(SKIP_COMPRESSION):
+        comprimido = gzip.compress(contenido, compresslevel=9, mtime=0)  # mtime=0: misma salida en cada construcción.
+        with open(os.path.join(carpeta, f"{nombre}.gz"), 'wb') as f:
+            f.write(comprimido)
+        tamanos['gzip'] = len(comprimido)
+        if brotli is not None:
+            comprimido = brotli.compress(contenido, quality=11)
+            with open(os.path.join(carpeta, f"{nombre}.br"), 'wb') as f:
+                f.write(comprimido)
+            tamanos['br'] = len(comprimido)
+    return tamanos
+
+
+def vendor_fonts(css, origen, carpeta, manifiesto):
+    # Copia las fuentes referenciadas por la hoja de estilo y reescribe sus URLs.
+    copiadas = {}
+
+    def reemplazar(coincidencia):
+        url = coincidencia.group(2).strip()
+        if url.startswith(('data:', '#')):
+            return coincidencia.group(0)
+        limpia = re.split(r'[?#]', url)[0]
+        if limpia not in copiadas:
+            contenido = read_source(origen, limpia)
+            nombre = hashed_name(os.path.basename(limpia), contenido)
+            manifiesto['sizes'][nombre] = write_asset(carpeta, nombre, contenido)
+            manifiesto['files'][os.path.basename(limpia)] = nombre
+            copiadas[limpia] = nombre
+        return f"url({copiadas[limpia]})"
+    return _URL.sub(reemplazar, css)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Construye las copias locales de Bootstrap y Font Awesome')
+    parser.add_argument('--source', action='append', default=[], metavar='NOMBRE=RUTA',
+                        help='Archivo local o URL de una hoja de estilo (por defecto la CDN de CDN_STYLESHEETS)')
+    parser.add_argument('--output', default=os.path.join(ASSETS_FOLDER, VENDOR_DIR), help='Carpeta de salida')
+    parser.add_argument('--no-purge', action='store_true', help='Conserva todos los selectores')
+    args = parser.parse_args()
+
+    fuentes = dict(CDN_STYLESHEETS)
+    for valor in args.source:
+        nombre, _, ruta = valor.partition('=')
+        if nombre not in fuentes:
+            parser.error(f"Hoja de estilo desconocida: {nombre} (opciones: {', '.join(fuentes)})")
+        fuentes[nombre] = ruta
+
+    palabras, prefijos = used_classes([os.path.join(RAIZ, 'src'), ASSETS_FOLDER])
+    print(f"Clases en el código: {len(palabras)} palabras, {len(prefijos)} prefijos de componentes")
+
+    # Se construye en una carpeta temporal y se reemplaza al final: si algo falla, la anterior sigue igual.
+    temporal = f"{args.output}.tmp"
+    shutil.rmtree(temporal, ignore_errors=True)
+    os.makedirs(temporal)
+    manifiesto = {'built': datetime.now(timezone.utc).isoformat(timespec='seconds'), 'sources': fuentes,
+                  'purged': not args.no_purge, 'files': {}, 'sizes': {}}
+    for nombre, origen in fuentes.items():
+        original = read_source(origen).decode('utf-8')
+        nodos = parse_css(original)
+        if not args.no_purge:
+            nodos = purge(nodos, palabras, prefijos)
+        css = vendor_fonts(write_css(nodos), origen, temporal, manifiesto).encode('utf-8')
+        archivo = hashed_name(f"{nombre}.css", css)
+        manifiesto['files'][nombre] = archivo
+        manifiesto['sizes'][archivo] = tamanos = write_asset(temporal, archivo, css)
+        print(f"{nombre:<12} {len(original.encode('utf-8')):>9,} -> {tamanos['raw']:>9,} bytes "
+              f"(gzip {tamanos.get('gzip', 0):,}, br {tamanos.get('br', 0):,}) {archivo}")
+    with open(os.path.join(temporal, os.path.basename(ASSETS_MANIFEST)), 'w', encoding='utf-8') as f:
+        json.dump(manifiesto, f, indent=2, ensure_ascii=False)
+
+    shutil.rmtree(args.output, ignore_errors=True)
+    os.replace(temporal, args.output)
+    print(f"\nAssets en {args.output}")
+    if brotli is None:
+        print("Brotli no está instalado: no se generaron las versiones .br.")
+
+
+if __name__ == '__main__':
+    main()
@@ -6,77 +6,104 @@
 # un callback que cambia el contenido de la página dependiendo de la URL actual 
 # y el estado de autenticación del usuario.
 #
+# El estado visual (mostrar el login o la aplicación, cerrar sesión) se resuelve en
+# el navegador con callbacks del lado del cliente. Al servidor solo llegan la
+# verificación de credenciales y el contenido que depende de datos: un callback del
+# cliente copia la ruta a 'route-store' únicamente cuando hay sesión y la ruta cambia.
+#
+# Al importar solo se construyen las partes estáticas; los datos y las páginas de
+# las direcciones se cargan con la primera solicitud que los pide, o antes en el
+# precalentamiento opcional (DASH_WARMUP=1, ver src/startup.py).
+#
 # Fuentes de Información:
 # - La URL de la página se maneja a través del componente dcc.Location.
-# - El estado de autenticación se maneja a través de dcc.Store y se utiliza 
-#   en los callbacks para determinar si mostrar el contenido de la página o 
-#   la tarjeta de inicio de sesión.
+# - El estado de autenticación se guarda en dcc.Store para mostrar la página o la
+#   tarjeta de inicio de sesión. El contenido con datos solo se entrega si la sesión
+#   de Flask (cookie firmada, ver src/auth.py) está iniciada.
 #
 # Información Enviada:
 # - Se envía el contenido de la página actualizado a la interfaz de usuario 
-#   a través del componente 'page-content'.
+#   a través del componente 'page-content'. La página se elige con la tabla de
+#   rutas de `src.routes`, y la barra de navegación ya forma parte del layout
+#   (solo se muestra u oculta).
 #
 # -----------------------------------------------------------------------------
 
-from dash import Dash, html, dcc, Input, Output  # Se importan los componentes esenciales de Dash, incluyendo Input y Output que se usan para crear interactividad.
-import dash_bootstrap_components as dbc  # Se importan los componentes de diseño de Bootstrap para mejorar la apariencia.
-from config.settings import EXTERNAL_STYLESHEETS, COLORS  # Se importan configuraciones externas, como hojas de estilo y colores definidos.
-from src.components.navbar import create_navbar  # Se importa la función para crear la barra de navegación.
-from src.components.login import create_login_card  # Se importa la función para crear la tarjeta de inicio de sesión.
-from src.layouts.home import create_home_content  # Se importa la función para crear el contenido principal de la página de inicio.
-from src.layouts.direction import create_direction_content  # Se importa la función para crear el contenido de las distintas direcciones.
-from src.auth import register_auth_callbacks  # Se importa la función para registrar los callbacks de autenticación.
+from src.startup import mark_imported, register_startup_hooks, register_warmup, startup_stats  # Tiempos de arranque (se importa primero).
+from dash import Dash, html, dcc, Input, Output, State, clientside_callback  # Se importan los componentes esenciales de Dash, incluyendo Input y Output que se usan para crear interactividad.
+from config.settings import ASSETS_FOLDER, ASSETS_IGNORE, COMPRESS, EXTERNAL_STYLESHEETS, COLORS, SECRET_KEY  # Se importan configuraciones externas, como hojas de estilo y colores definidos.
+from src.routes import build_static_layouts, get_login_layout, get_navbar, render_route, warm_up_routes  # Se importa la tabla de rutas y las partes estáticas ya construidas.
+from src.auth import is_authenticated, register_auth_callbacks  # Se importa la función para registrar los callbacks de autenticación.
+from src.components.table import register_table_callbacks  # Callback de las tablas paginadas en el servidor.
+from src.layouts.affiliates import register_affiliate_callbacks  # Búsqueda de la consulta de afiliados.
+from src.server import register_export_routes, register_server_hooks  # Caché de los assets y exportación de datasets.
+from src.profiling import register_metrics_source, register_profiling  # Instrumentación opcional (DASH_PROFILING).
 
 # Inicialización de la aplicación Dash
 app = Dash(
     __name__,  # El nombre del módulo para la app.
-    external_stylesheets=EXTERNAL_STYLESHEETS,  # Se configuran las hojas de estilo externas desde el archivo de configuración.
-    suppress_callback_exceptions=True  # Se permite que existan callbacks sin excepciones hasta ser registrados.
+    external_stylesheets=EXTERNAL_STYLESHEETS,  # Bootstrap y Font Awesome locales (scripts/build_assets.py) o de la CDN.
+    assets_folder=ASSETS_FOLDER,  # Carpeta static/ (custom.css y los assets construidos en static/vendor).
+    assets_ignore=ASSETS_IGNORE,  # Los archivos con huella se enlazan desde el manifiesto, no automáticamente.
+    suppress_callback_exceptions=True,  # Se permite que existan callbacks sin excepciones hasta ser registrados.
+    compress=COMPRESS  # Respuestas comprimidas con gzip/brotli (Flask-Compress).
 )
+app.server.secret_key = SECRET_KEY  # Firma de la cookie de sesión.
+register_server_hooks(app)  # Caché de larga duración para los assets.
+register_export_routes(app)  # /export/<dataset>.<formato> por bloques.
+register_profiling(app)  # Tiempos por etapa, Server-Timing y /metrics (solo con DASH_PROFILING=1).
+register_startup_hooks(app)  # Tiempo hasta la primera respuesta.
+register_metrics_source('arranque', startup_stats)
+register_warmup('direcciones', warm_up_routes)  # Datos y figuras de las direcciones (DASH_WARMUP=1).
+
+# Construcción única de las partes estáticas (barra de navegación, login y páginas sin datos).
+build_static_layouts()
 
 # Creación del layout de la aplicación, es decir, la estructura de la interfaz de usuario.
 app.layout = html.Div([  # Se crea un contenedor principal con una estructura HTML.
     dcc.Location(id='url', refresh=False),  # Componente para manejar la URL y determinar la página actual.
     dcc.Store(id='auth-store', data={'authenticated': False}),  # Componente para almacenar el estado de autenticación.
-    html.Div(id='page-content')  # Componente donde se renderizará el contenido de la página según la ruta.
+    dcc.Store(id='route-store'),  # Ruta a renderizar en el servidor (vacía sin sesión).
+    html.Div(get_login_layout(), id='login-container'),  # Tarjeta de inicio de sesión, se envía una sola vez.
+    html.Div([
+        get_navbar(),  # Barra de navegación, se envía una sola vez.
+        html.Div(id='page-content')  # Componente donde se renderizará el contenido de la página según la ruta.
+    ], id='app-container', style={'display': 'none'}),  # Solo se muestra con sesión iniciada.
 ], style={'backgroundColor': COLORS['background'], 'minHeight': '100vh'})  # Estilos para el fondo y altura mínima.
 
 # Registro de los callbacks relacionados con la autenticación
 register_auth_callbacks(app)  # Se registra la función para manejar la autenticación de los usuarios.
+register_table_callbacks(app, authorize=is_authenticated)  # Se registra el callback que entrega las páginas de las tablas (las privadas, con sesión).
+register_affiliate_callbacks(app)  # Se registra la búsqueda de afiliados.
+
+# Callback del lado del cliente: la ruta solo se envía al servidor si hay sesión y cambió.
+clientside_callback(
+    """
+    function(pathname, auth_data, current) {
+        const route = (auth_data && auth_data.authenticated) ? (pathname || '/') : '';
+        return route === current ? window.dash_clientside.no_update : route;
+    }
+    """,
+    Output('route-store', 'data'),  # Ruta que debe renderizar el servidor.
+    [Input('url', 'pathname'),  # El input es la URL actual.
+     Input('auth-store', 'data')],  # El input es también el estado de autenticación.
+    State('route-store', 'data')  # Ruta enviada la última vez.
+)
 
-# Callback para cambiar el contenido de la página según la URL y el estado de autenticación.
+# Callback para cambiar el contenido de la página según la ruta (solo con sesión iniciada).
 @app.callback(
     Output('page-content', 'children'),  # El contenido de la página será actualizado en 'page-content'.
-    [Input('url', 'pathname'),  # El input es la URL actual.
-     Input('auth-store', 'data')]  # El input es también el estado de autenticación.
+    Input('route-store', 'data'),  # El input es la ruta ya filtrada en el navegador.
 )
-def display_page(pathname, auth_data):  # Función que actualiza la página según la ruta y el estado de autenticación.
-    authenticated = auth_data.get('authenticated', False) if auth_data else False  # Se obtiene el estado de autenticación.
-    
-    # Si no está autenticado, se muestra la tarjeta de inicio de sesión.
-    if not authenticated:
-        return dbc.Container(
-            dbc.Row(
-                dbc.Col(create_login_card(), md=6, lg=4),  # Se crea la tarjeta de login en una columna centrada.
-                justify="center",  # Justifica la columna al centro.
-                align="center",  # Alinea el contenido al centro.
-                style={"minHeight": "100vh"}  # Se asegura de que la altura mínima sea completa en la pantalla.
-            )
-        )
-    
-    # Si está autenticado, se genera el contenido de la página según la ruta.
-    content = html.Div([  # Se crea un contenedor para el contenido.
-        create_navbar(),  # Se incluye la barra de navegación.
-        html.Div([  # Se genera el contenido según la URL.
-            create_home_content() if pathname == '/' else  # Página de inicio.
-            create_direction_content('juridica', 'Oficina Asesora Jurídica') if pathname == '/juridica' else  # Oficina Jurídica.
-            create_direction_content('control', 'Oficina de Control Interno') if pathname == '/control-interno' else  # Oficina de Control Interno.
-            create_direction_content('administrativa', 'Dirección Administrativa y Financiera') if pathname == '/administrativa' else  # Dirección Administrativa.
-            create_direction_content('salud', 'Dirección de Salud Pública') if pathname == '/salud-publica' else  # Dirección de Salud Pública.
-            create_direction_content('seguridad', 'Dirección de Seguridad Social') if pathname == '/seguridad-social' else  # Dirección de Seguridad Social.
-            create_direction_content('aseguramiento', 'Dirección de Aseguramiento') if pathname == '/aseguramiento' else  # Dirección de Aseguramiento.
-            create_home_content()  # Si no se encuentra una ruta válida, se muestra la página de inicio.
-        ], className="mt-4 mb-4")  # Se aplica margen superior e inferior al contenido.
-    ])
-    
-    return content  # Se devuelve el contenido generado según la ruta y el estado de autenticación.
+def display_page(pathname):  # Función que actualiza la página según la ruta y el estado de autenticación.
+    authenticated = is_authenticated()  # Sesión del servidor; 'auth-store' lo controla el navegador.
+
+    # Sin sesión o sin ruta no se construye contenido (el login ya está en el layout).
+    if not authenticated or not pathname:
+        return []
+
+    # Si está autenticado, se busca la ruta en la tabla de rutas y se devuelve su contenido.
+    return html.Div(render_route(pathname), className="mt-4 mb-4")  # Se aplica margen superior e inferior al contenido.
+
+
+mark_imported('src.app')  # Tiempo de importación de la aplicación.
@@ -1,27 +1,52 @@
 # -----------------------------------------------------------------------------
 # Descripción del Código:
 # Este código maneja los callbacks de autenticación para una aplicación Dash.
-# Se definen dos callbacks:
-# 1. Un callback para el inicio de sesión (login) que verifica las credenciales del usuario.
-# 2. Un callback para el cierre de sesión (logout) que actualiza el estado de autenticación.
+# Se definen tres callbacks:
+# 1. Un callback para el inicio de sesión (login) que verifica las credenciales del usuario
+#    en el servidor y marca la sesión de Flask (cookie firmada con SECRET_KEY).
+# 2. Un callback para el cierre de sesión (logout) que borra esa marca en el servidor.
+# 3. Un callback del lado del cliente que muestra la tarjeta de login o la aplicación
+#    según el estado de autenticación.
+#
+# 'auth-store' solo decide qué se ve en el navegador: el cliente puede cambiar su valor.
+# Los callbacks y rutas que entregan datos comprueban la sesión del servidor con
+# `is_authenticated()`.
 #
 # Fuentes de Información:
-# - El usuario proporciona las credenciales (nombre de usuario y contraseña) a través 
+# - El usuario proporciona las credenciales (nombre de usuario y contraseña) a través
 #   de los campos de entrada 'username' y 'password'.
 # - Se compara el nombre de usuario y la contraseña con valores predefinidos (VALID_USERNAME y VALID_PASSWORD).
 #
 # Información Enviada:
 # - El estado de autenticación actualizado (True o False) se almacena en el componente 'auth-store'.
 # - En caso de error en el inicio de sesión, se muestra un mensaje de alerta con 'Credenciales incorrectas'.
+# - La visibilidad de 'login-container' y 'app-container' se cambia en el navegador.
 #
 # -----------------------------------------------------------------------------
 
-from dash import Input, Output, State, callback, no_update  # Se importan los componentes necesarios de Dash para manejar entradas, salidas y estados.
+import hmac  # Comparación de credenciales en tiempo constante.
+
+from dash import Input, Output, State, callback, clientside_callback, no_update  # Se importan los componentes necesarios de Dash para manejar entradas, salidas y estados.
 import dash_bootstrap_components as dbc  # Se importan componentes de diseño de Bootstrap para mostrar alertas.
+from flask import has_request_context, session  # Sesión firmada de Flask (estado de autenticación en el servidor).
 from config.settings import VALID_USERNAME, VALID_PASSWORD  # Se importan las credenciales válidas desde la configuración.
 
+SESSION_KEY = 'authenticated'  # Marca de la sesión iniciada en la cookie de Flask.
+
+
+def is_authenticated():
+    # Sesión iniciada según la cookie firmada del servidor (no según 'auth-store').
+    return has_request_context() and session.get(SESSION_KEY) is True
+
+
+def valid_credentials(username, password):
+    # Compara usuario y contraseña con los de la configuración.
+    return (isinstance(username, str) and isinstance(password, str)
+            and hmac.compare_digest(username, VALID_USERNAME) and hmac.compare_digest(password, VALID_PASSWORD))
+
+
 def register_auth_callbacks(app):  # Función que registra los callbacks de autenticación en la aplicación Dash.
-    # Callback para el inicio de sesión (login)
+    # Callback para el inicio de sesión (login): la verificación de credenciales se hace en el servidor.
     @callback(
         [Output('auth-store', 'data'),  # Se actualiza el estado de autenticación en 'auth-store'.
          Output('login-output', 'children')],  # Se muestra un mensaje si las credenciales son incorrectas.
@@ -33,17 +58,38 @@ def register_auth_callbacks(app):  # Función que registra los callbacks de aute
     def login(n_clicks, username, password):  # Función que maneja el proceso de inicio de sesión.
         if not n_clicks:  # Si no ha habido clics en el botón de login, no se hace ninguna actualización.
             return no_update, no_update
-        if username == VALID_USERNAME and password == VALID_PASSWORD:  # Verificación de credenciales.
+        if valid_credentials(username, password):  # Verificación de credenciales.
+            session.clear()
+            session[SESSION_KEY] = True  # La sesión queda marcada en la cookie firmada.
             return {'authenticated': True}, None  # Si las credenciales son correctas, se marca como autenticado.
         return {'authenticated': False}, dbc.Alert('Credenciales incorrectas', color='danger')  # Si son incorrectas, se muestra una alerta.
 
-    # Callback para el cierre de sesión (logout)
+    # Callback para el cierre de sesión (logout): borra la sesión en el servidor.
+    # También limpia el campo de contraseña de la tarjeta de login.
     @callback(
-        Output('auth-store', 'data', allow_duplicate=True),  # Se actualiza el estado de autenticación en 'auth-store'.
+        [Output('auth-store', 'data', allow_duplicate=True),  # Se actualiza el estado de autenticación en 'auth-store'.
+         Output('password', 'value')],  # Se limpia la contraseña ingresada.
         Input('logout-button', 'n_clicks'),  # Input: clic en el botón de logout.
         prevent_initial_call=True  # Evita que el callback se dispare al inicio sin interacción del usuario.
     )
-    def logout(n_clicks):  # Función que maneja el proceso de cierre de sesión.
-        if n_clicks:  # Si el botón de logout ha sido presionado.
-            return {'authenticated': False}  # Se actualiza el estado de autenticación a 'False' (desconectado).
-        return no_update  # Si no se ha hecho clic, no se actualiza nada.
+    def logout(n_clicks):
+        if not n_clicks:
+            return no_update, no_update
+        session.clear()
+        return {'authenticated': False}, ''
+
+    # Callback que muestra la tarjeta de login o la aplicación (barra y contenido), en el navegador.
+    clientside_callback(
+        """
+        function(auth_data) {
+            const authenticated = Boolean(auth_data && auth_data.authenticated);
+            return [
+                authenticated ? {'display': 'none'} : {},
+                authenticated ? {} : {'display': 'none'}
+            ];
+        }
+        """,
+        [Output('login-container', 'style'),  # Visibilidad de la tarjeta de login.
+         Output('app-container', 'style')],  # Visibilidad de la barra de navegación y el contenido.
+        Input('auth-store', 'data')  # Input: estado de autenticación.
+    )
@@ -0,0 +1,192 @@
+# -----------------------------------------------------------------------------
+# Descripción del Código:
+# Este módulo arma las figuras de Plotly del dashboard como diccionarios JSON y
+# se encarga de que las series grandes no saturen el navegador:
+#
+# - Líneas: si la serie tiene más de `MAX_POINTS` puntos dentro del rango visible,
+#   se reduce en el servidor con LTTB (Largest-Triangle-Three-Buckets), que conserva
+#   la forma de la curva (picos y valles). Por encima de `GL_THRESHOLD` puntos la
+#   traza se dibuja con WebGL (`scattergl`) en lugar de SVG.
+# - Zoom: `relayout_range` lee el rango del eje X de `relayoutData`; al volver a
+#   armar la figura solo con ese rango, el zoom trae más detalle del servidor.
+# - Histogramas: los intervalos se calculan en el servidor con `np.histogram` y se
+#   envían como barras (un valor por intervalo en lugar de todas las filas).
+#
+# Información Recibida:
+# - Arreglos o Series de X y Y (números o fechas), rangos de zoom y valores para
+#   los histogramas.
+#
+# Información Enviada:
+# - Trazas y figuras como diccionarios listos para `dcc.Graph`.
+# -----------------------------------------------------------------------------
+
+import numpy as np  # Reducción de puntos e intervalos vectorizados.
+import pandas as pd  # Conversión de fechas y valores.
+
+GL_THRESHOLD = 1000  # Puntos a partir de los cuales la línea se dibuja con WebGL.
+MAX_POINTS = 2000  # Puntos máximos que se envían por línea.
+MARGIN = dict(l=40, r=40, t=40, b=40)  # Márgenes de los gráficos.
+
+_template = None  # Plantilla 'plotly_white' en formato JSON.
+
+
+def template_json():
+    # Convierte la plantilla 'plotly_white' a JSON la primera vez que se necesita.
+    global _template
+    if _template is None:
+        import plotly.io as pio  # Se importa Plotly solo para leer la plantilla.
+        _template = pio.templates['plotly_white'].to_plotly_json()
+    return _template
+
+
+def _numeric(valores):
+    # Representación numérica de X para los cálculos: las fechas como enteros en ns y
+    # los ejes de categorías (texto) como su posición, igual que los rangos de Plotly.
+    valores = np.asarray(valores)
+    if np.issubdtype(valores.dtype, np.datetime64):
+        return valores.astype('datetime64[ns]').astype('int64').astype('float64')
+    if valores.dtype.kind in 'biuf':
+        return valores.astype('float64')
+    return np.arange(len(valores), dtype='float64')
+
+
+def lttb_indices(x, y, n_out):
+    # Posiciones de los puntos que conserva LTTB. `x` debe estar ordenado y sin nulos.
+    # Divide la serie en `n_out - 2` grupos y en cada uno elige el punto que forma el
+    # triángulo de mayor área con el punto elegido antes y el promedio del grupo siguiente.
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    bordes = np.linspace(1, n - 1, n_out - 1).astype(np.int64)  # Límites de los grupos internos.
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+    a = 0  # Punto elegido en el grupo anterior.
+    for i in range(n_out - 2):
+        inicio, fin = bordes[i], max(bordes[i + 1], bordes[i] + 1)
+        if i + 2 < len(bordes):
+            sig_inicio, sig_fin = bordes[i + 1], max(bordes[i + 2], bordes[i + 1] + 1)
+        else:
+            sig_inicio, sig_fin = n - 1, n  # El último grupo mira al punto final.
+        cx, cy = x[sig_inicio:sig_fin].mean(), y[sig_inicio:sig_fin].mean()
+        areas = np.abs((x[a] - cx) * (y[inicio:fin] - y[a]) - (x[a] - x[inicio:fin]) * (cy - y[a]))
+        a = inicio + int(np.argmax(areas))
+        indices[i + 1] = a
+    return np.unique(indices)
+
+
+def downsample(x, y, x_range=None, max_points=MAX_POINTS):
+    # Recorta la serie al rango visible y la reduce con LTTB si supera `max_points`.
+    # Devuelve (x, y) con los valores originales de los puntos conservados.
+    x = np.asarray(x)
+    y = pd.to_numeric(pd.Series(np.asarray(y)), errors='coerce').to_numpy(dtype='float64')
+    xn = _numeric(x)
+    validos = ~np.isnan(y) & ~np.isnan(xn)
+    x, y, xn = x[validos], y[validos], xn[validos]
+    if len(xn) and np.any(np.diff(xn) < 0):  # LTTB y el recorte por rango necesitan X ordenado.
+        orden = np.argsort(xn, kind='stable')
+        x, y, xn = x[orden], y[orden], xn[orden]
+    if x_range is not None:
+        limites = _numeric(np.asarray(x_range))
+        inicio = max(np.searchsorted(xn, limites[0], side='left') - 1, 0)  # Un punto extra a cada lado
+        fin = min(np.searchsorted(xn, limites[1], side='right') + 1, len(xn))  # para que la línea llegue al borde.
+        x, y, xn = x[inicio:fin], y[inicio:fin], xn[inicio:fin]
+    if max_points and len(xn) > max_points:
+        posiciones = lttb_indices(xn, y, max_points)
+        x, y = x[posiciones], y[posiciones]
+    return x, y
+
+
+def relayout_range(relayout, es_fecha=False):
+    # Rango del eje X de un evento de zoom (`relayoutData`).
+    # Devuelve (inicio, fin), None si se volvió a la vista completa, o False si el
+    # evento no cambia el eje X (por ejemplo, solo el eje Y o la leyenda).
+    if not relayout:
+        return False
+    if relayout.get('xaxis.autorange') or relayout.get('autosize'):
+        return None
+    if 'xaxis.range[0]' in relayout and 'xaxis.range[1]' in relayout:
+        rango = [relayout['xaxis.range[0]'], relayout['xaxis.range[1]']]
+    elif 'xaxis.range' in relayout:
+        rango = list(relayout['xaxis.range'])
+    else:
+        return False
+    if es_fecha:
+        return tuple(np.datetime64(pd.Timestamp(v), 'ns') for v in rango)
+    return tuple(float(v) for v in rango)
+
+
+def line_trace(x, y, name=None, x_range=None, max_points=MAX_POINTS, **props):
+    # Traza de línea: reducida en el servidor y con WebGL si tiene muchos puntos.
+    x, y = downsample(x, y, x_range, max_points)
+    traza = {
+        'type': 'scattergl' if len(x) > GL_THRESHOLD else 'scatter',
+        'mode': 'lines',
+        'x': x,
+        'y': y,
+    }
+    if name is not None:
+        traza['name'] = name
+    traza.update(props)
+    return traza
+
+
+def line_figure(x, y, title=None, x_range=None, max_points=MAX_POINTS, height=None, **props):
+    # Figura de una línea. Con `x_range` la figura conserva el zoom y muestra el detalle del rango.
+    layout = {
+        'title': {'text': title} if title else None,
+        'template': template_json(),
+        'margin': MARGIN,
+        'uirevision': 'zoom',  # Conserva el zoom del usuario al actualizar los datos.
+    }
+    if height:
+        layout['height'] = height
+    if x_range is not None:
+        layout['xaxis'] = {'range': [pd.Timestamp(v).isoformat() if isinstance(v, np.datetime64) else v for v in x_range]}
+    return {'data': [line_trace(x, y, x_range=x_range, max_points=max_points, **props)],
+            'layout': {k: v for k, v in layout.items() if v is not None}}
+
+
+def histogram_trace(valores, bins=50, weights=None, name=None, **props):
+    # Histograma calculado en el servidor: una barra por intervalo.
+    # Con `weights` cada barra es la suma de los pesos del intervalo (como histfunc='sum').
+    valores = pd.to_numeric(pd.Series(np.asarray(valores)), errors='coerce').to_numpy(dtype='float64')
+    pesos = None
+    if weights is not None:
+        pesos = pd.to_numeric(pd.Series(np.asarray(weights)), errors='coerce').to_numpy(dtype='float64')
+        validos = ~np.isnan(valores) & ~np.isnan(pesos)
+        pesos = pesos[validos]
+    else:
+        validos = ~np.isnan(valores)
+    valores = valores[validos]
+    if len(valores) == 0:
+        conteos, bordes = np.zeros(0), np.zeros(1)
+    else:
+        conteos, bordes = np.histogram(valores, bins=bins, weights=pesos)
+    traza = {
+        'type': 'bar',
+        'x': (bordes[:-1] + bordes[1:]) / 2,  # Centro de cada intervalo.
+        'y': conteos,
+        'width': np.diff(bordes),  # Las barras cubren todo el intervalo.
+        'customdata': np.column_stack([bordes[:-1], bordes[1:]]),
+        'hovertemplate': '[%{customdata[0]:.4g}, %{customdata[1]:.4g}): %{y}<extra></extra>',
+    }
+    if name is not None:
+        traza['name'] = name
+    traza.update(props)
+    return traza
+
+
+def histogram_figure(valores, bins=50, weights=None, title=None, x_title=None, y_title=None, height=None):
+    # Figura de un histograma precalculado en el servidor.
+    layout = {
+        'template': template_json(),
+        'margin': MARGIN,
+        'bargap': 0,
+        'xaxis': {'title': {'text': x_title}} if x_title else {},
+        'yaxis': {'title': {'text': y_title or ('sum' if weights is not None else 'count')}},
+    }
+    if title:
+        layout['title'] = {'text': title}
+    if height:
+        layout['height'] = height
+    return {'data': [histogram_trace(valores, bins, weights)], 'layout': layout}
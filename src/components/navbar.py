@@ -27,6 +27,9 @@ def create_navbar():
                     label="Direcciones",  # Título del menú desplegable
                     className="px-3",  # Estilo con espaciado horizontal
                 ),
+
+                # Enlace a la consulta de novedades y glosas de un afiliado
+                dbc.NavItem(dbc.NavLink("Afiliados", href="/afiliados", className="px-3")),
                 
                 # Botón para cerrar sesión
                 dbc.NavItem(dbc.Button("Cerrar Sesión", id="logout-button", color="danger", size="sm", className="ms-2"))
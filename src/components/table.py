@@ -0,0 +1,136 @@
+# -----------------------------------------------------------------------------
+# Descripción del Código:
+# Este módulo define la tabla paginada en el servidor. La tabla se crea sin datos
+# (`page_action`, `filter_action` y `sort_action` en 'custom') y un único callback
+# le envía solo las filas de la página visible, ya filtradas y ordenadas por
+# `src.data.paging.FrameSource`.
+#
+# Cada tabla se identifica con un id de patrón {'type': 'paged-table', 'source', 'key'}:
+# `source` es el nombre de una fuente registrada con `register_table_source` y `key`
+# el argumento que recibe (por ejemplo, la dirección). Así un solo callback sirve a
+# todas las tablas de la aplicación. La fuente puede registrarse como texto
+# 'modulo:funcion': el módulo (y sus dependencias pesadas) se importa con la primera
+# página que se pide.
+#
+# Las fuentes registradas con `private=True` (por ejemplo, los registros de un afiliado)
+# solo entregan páginas si `register_table_callbacks` recibe `authorize` (la comprobación
+# de la sesión en el servidor, `src.auth.is_authenticated`) y esta la acepta.
+#
+# Con `search='columna'` la tabla muestra un buscador de frases sobre esa columna
+# (por ejemplo las descripciones de las glosas, `obs_glos`): varias frases separadas
+# por ';' que deben aparecer todas o alguna. Los controles existen en todas las
+# tablas (ocultos si no hay búsqueda) para que el callback único los reciba siempre.
+#
+# Información Recibida:
+# - Página actual, tamaño de página, filtro, orden y búsqueda de frases de la tabla. La
+#   página y el tamaño se acotan en el servidor (`src.data.paging.MAX_PAGE_SIZE`).
+#
+# Información Enviada:
+# - Las filas de la página, el número de páginas y el total de registros.
+# -----------------------------------------------------------------------------
+
+import importlib  # Importación diferida de las fuentes registradas como texto.
+import math  # Número de páginas.
+
+import dash_bootstrap_components as dbc  # Componentes de diseño de Bootstrap.
+from dash import Input, Output, State, MATCH, callback, ctx, dash_table, dcc, html, no_update  # Componentes y callbacks de Dash.
+
+PAGE_SIZE = 10  # Filas por página por defecto.
+
+_sources = {}  # Fuentes registradas: nombre -> función(key) que devuelve un FrameSource (o 'modulo:funcion').
+_private = set()  # Fuentes que exigen la sesión autenticada.
+
+
+def register_table_source(source, getter, private=False):
+    # Registra una fuente de datos para las tablas paginadas.
+    _sources[source] = getter
+    if private:
+        _private.add(source)
+    else:
+        _private.discard(source)
+
+
+def get_table_source(source):
+    # Función de la fuente; si se registró como 'modulo:funcion' se importa la primera vez.
+    getter = _sources[source]
+    if isinstance(getter, str):
+        modulo, nombre = getter.split(':')
+        getter = _sources[source] = getattr(importlib.import_module(modulo), nombre)
+    return getter
+
+
+def _search_controls(source, key, search):
+    # Buscador de frases de la tabla (oculto si la tabla no tiene búsqueda).
+    return dbc.Row([
+        dbc.Col(dcc.Input(  # Frases separadas por ';'; se busca al dejar de escribir.
+            id={'type': 'paged-table-search', 'source': source, 'key': key},
+            type='text', value='', debounce=True, className="form-control",
+            placeholder=f"Buscar en {search} (frases separadas por ';')",
+        ), md=9),
+        dbc.Col(dcc.RadioItems(  # Todas las frases o alguna.
+            id={'type': 'paged-table-search-mode', 'source': source, 'key': key},
+            options=[{'label': 'Todas', 'value': 'all'}, {'label': 'Alguna', 'value': 'any'}],
+            value='all', inline=True, inputStyle={'marginRight': '4px', 'marginLeft': '10px'},
+        ), md=3, className="d-flex align-items-center"),
+        dcc.Store(id={'type': 'paged-table-search-column', 'source': source, 'key': key}, data=search),
+    ], className="g-2 mb-2", style=None if search else {'display': 'none'})
+
+
+def create_paged_table(source, key, columns, page_size=PAGE_SIZE, search=None):
+    # Tabla sin datos; las filas llegan desde el servidor página por página.
+    # `search`: columna de texto en la que se buscan frases (None = sin buscador).
+    return html.Div([
+        _search_controls(source, key, search),
+        dash_table.DataTable(
+            id={'type': 'paged-table', 'source': source, 'key': key},
+            columns=columns,  # Columnas de la fuente (nombre, id y tipo).
+            data=[],
+            page_current=0,
+            page_size=page_size,
+            page_action='custom',  # La paginación se hace en el servidor.
+            filter_action='custom',  # Los filtros se aplican en el servidor.
+            filter_query='',
+            sort_action='custom',  # El orden se aplica en el servidor.
+            sort_mode='multi',
+            sort_by=[],
+            style_table={'overflowX': 'auto'},  # Desplazamiento horizontal en pantallas pequeñas.
+            style_cell={'textAlign': 'left', 'padding': '6px', 'fontSize': '14px'},
+            style_header={'fontWeight': 'bold'},
+        ),
+        html.Small(id={'type': 'paged-table-total', 'source': source, 'key': key}, className="text-muted"),  # Total de registros.
+    ])
+
+
+def register_table_callbacks(app, authorize=None):
+    # Callback único para todas las tablas paginadas. Con `authorize` (función sin
+    # argumentos que comprueba la sesión en el servidor) las fuentes privadas exigen la
+    # sesión iniciada; sin ella no se entregan nunca.
+    @callback(
+        [Output({'type': 'paged-table', 'source': MATCH, 'key': MATCH}, 'data'),  # Filas de la página.
+         Output({'type': 'paged-table', 'source': MATCH, 'key': MATCH}, 'page_count'),  # Número de páginas.
+         Output({'type': 'paged-table', 'source': MATCH, 'key': MATCH}, 'page_current'),  # Primera página al buscar.
+         Output({'type': 'paged-table-total', 'source': MATCH, 'key': MATCH}, 'children')],  # Total de registros.
+        [Input({'type': 'paged-table', 'source': MATCH, 'key': MATCH}, 'page_current'),
+         Input({'type': 'paged-table', 'source': MATCH, 'key': MATCH}, 'page_size'),
+         Input({'type': 'paged-table', 'source': MATCH, 'key': MATCH}, 'filter_query'),
+         Input({'type': 'paged-table', 'source': MATCH, 'key': MATCH}, 'sort_by'),
+         Input({'type': 'paged-table-search', 'source': MATCH, 'key': MATCH}, 'value'),
+         Input({'type': 'paged-table-search-mode', 'source': MATCH, 'key': MATCH}, 'value')],
+        [State({'type': 'paged-table-search-column', 'source': MATCH, 'key': MATCH}, 'data'),
+         State({'type': 'paged-table', 'source': MATCH, 'key': MATCH}, 'id')]
+    )
+    def update_paged_table(page_current, page_size, filter_query, sort_by, texto, modo, columna, table_id):
+        if table_id['source'] in _private and not (authorize is not None and authorize()):
+            return [], 1, no_update, "Inicie sesión para ver estos registros."
+        from src.data.glosa_search import split_phrases  # Con la primera página (importa NumPy y pandas).
+        from src.data.paging import page_bounds
+        fuente = get_table_source(table_id['source'])(table_id['key'])
+        page_current, page_size = page_bounds(page_current, page_size)  # Valores del navegador: no se confía en ellos.
+        # Una búsqueda nueva vuelve a la primera página.
+        buscando = isinstance(ctx.triggered_id, dict) and ctx.triggered_id.get('type', '').startswith('paged-table-search')
+        if buscando:
+            page_current = 0
+        busqueda = (columna, split_phrases(texto), modo or 'all') if columna else None
+        filas, total = fuente.page(page_current, page_size, filter_query, sort_by, busqueda)
+        return (filas, max(1, math.ceil(total / page_size)), 0 if buscando else no_update,
+                f"{total:,} registros".replace(',', '.'))
@@ -0,0 +1,108 @@
+# -----------------------------------------------------------------------------
+# Descripción del Código:
+# Este módulo construye y consulta el índice de afiliados del consolidado: para
+# cada afiliado (tipo y número de documento) las filas de la instantánea
+# (src/data/snapshot.py) con todas sus novedades y glosas. Sin el índice, buscar
+# una persona en `mer_sub_neg_2018_2024` recorre todo el consolidado con una
+# máscara.
+#
+# El índice se guarda en la carpeta de cada versión de la instantánea, antes de
+# publicarla, como arreglos ordenados en archivos `.npy`:
+# - `affiliate_keys.npy`: clave de cada afiliado, ordenada (código del tipo de
+#   documento en los bits altos y número de documento en los 48 bits bajos).
+# - `affiliate_starts.npy`: inicio de las filas de cada afiliado en el arreglo de
+#   filas (el afiliado i ocupa starts[i]:starts[i + 1]).
+# - `affiliate_rows.npy`: posiciones de las filas en la instantánea, agrupadas por afiliado.
+#
+# La consulta abre los arreglos mapeados en memoria (compartidos entre workers) y
+# hace una búsqueda binaria (`np.searchsorted`): solo se leen unas pocas páginas del
+# archivo y la respuesta toma microsegundos.
+#
+# Información Recibida:
+# - Una instantánea del dataset (para construir o consultar) y el tipo y número de documento.
+#
+# Información Enviada:
+# - Archivos del índice en disco y las posiciones o registros del afiliado.
+# -----------------------------------------------------------------------------
+
+import os  # Rutas de los archivos del índice.
+
+import numpy as np  # Arreglos ordenados y búsqueda binaria.
+
+INDEX_FILES = {'keys': 'affiliate_keys.npy', 'starts': 'affiliate_starts.npy', 'rows': 'affiliate_rows.npy'}
+DOC_BITS = 48  # Bits del número de documento dentro de la clave (hasta 2.8e14).
+
+# Columnas que se muestran en la consulta de un afiliado.
+AFFILIATE_COLUMNS = ['tip_doc', 'doc', 'fecha_rep', 'nov', 'fech_nov', 'dep', 'mun', 'No_Glosas',
+                     'observaciones_split', 'obs_glos']
+
+
+def _keys(codigos, documentos):
+    # Clave de cada fila y máscara de las filas con tipo y número de documento válidos.
+    if hasattr(documentos, 'to_numpy'):  # Int64 de pandas (con nulos): los nulos quedan en NaN.
+        documentos = documentos.to_numpy(dtype='float64', na_value=np.nan)
+    documentos = np.asarray(documentos)
+    validos = (codigos >= 0) & np.isfinite(documentos) & (documentos >= 0) & (documentos < 2 ** DOC_BITS)
+    claves = (codigos.astype(np.int64) << DOC_BITS) | np.where(validos, documentos, 0).astype(np.int64)
+    return claves, validos
+
+
+def build_affiliate_index(snapshot):
+    # Construye el índice en la carpeta de la instantánea (se llama antes de publicarla).
+    # Devuelve el número de afiliados (0 si la instantánea no tiene tipo y número de documento).
+    if not {'tip_doc', 'doc'} <= set(snapshot.columns):
+        return 0
+    claves, validos = _keys(np.asarray(snapshot.column('tip_doc').codes), snapshot.column('doc'))
+    filas = np.flatnonzero(validos)
+    orden = np.argsort(claves[filas], kind='stable')  # Estable: las filas de un afiliado quedan en orden del dataset.
+    filas, claves = filas[orden], claves[filas][orden]
+    unicas, inicios = np.unique(claves, return_index=True)
+    arreglos = {
+        'keys': unicas,
+        'starts': np.append(inicios, len(claves)).astype(np.int64),
+        'rows': filas.astype(np.int32 if snapshot.rows < 2 ** 31 else np.int64),
+    }
+    for nombre, arreglo in arreglos.items():
+        np.save(os.path.join(snapshot.path, INDEX_FILES[nombre]), arreglo, allow_pickle=False)
+    return len(unicas)
+
+
+def has_affiliate_index(snapshot):
+    # Indica si la instantánea tiene índice de afiliados.
+    return all(os.path.exists(os.path.join(snapshot.path, f)) for f in INDEX_FILES.values())
+
+
+class AffiliateIndex:
+    # Índice de afiliados de una instantánea, mapeado en memoria.
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self.version = snapshot.version
+        for nombre, archivo in INDEX_FILES.items():
+            setattr(self, nombre, np.load(os.path.join(snapshot.path, archivo), mmap_mode='r', allow_pickle=False))
+        self._tipos = {tipo: codigo for codigo, tipo in enumerate(snapshot.column('tip_doc').categories)}
+
+    def __len__(self):
+        return len(self.keys)
+
+    def doc_types(self):
+        # Tipos de documento presentes en el consolidado.
+        return list(self._tipos)
+
+    def positions(self, tip_doc, doc):
+        # Filas del afiliado en la instantánea. Sin `tip_doc` se buscan todos los tipos de documento.
+        tipos = [tip_doc] if tip_doc else list(self._tipos)
+        partes = []
+        for tipo in tipos:
+            codigo = self._tipos.get(tipo)
+            if codigo is None or not 0 <= int(doc) < 2 ** DOC_BITS:
+                continue
+            clave = (codigo << DOC_BITS) | int(doc)
+            i = int(np.searchsorted(self.keys, clave))
+            if i < len(self.keys) and self.keys[i] == clave:
+                partes.append(self.rows[self.starts[i]:self.starts[i + 1]])
+        return np.concatenate(partes) if partes else np.array([], dtype=np.int64)
+
+    def records(self, tip_doc, doc, columns=None):
+        # Registros del afiliado con las columnas pedidas (solo se leen sus filas).
+        return self.snapshot.frame(columns or AFFILIATE_COLUMNS).iloc[self.positions(tip_doc, doc)].reset_index(drop=True)
@@ -0,0 +1,218 @@
+# -----------------------------------------------------------------------------
+# Descripción del Código:
+# Este módulo define la caché de datos compartida por todo el proceso del
+# servidor. Guarda los resultados de los proveedores de datos con un tiempo de
+# vida (TTL) y un tamaño máximo: cuando se llena, se descarta la entrada usada
+# hace más tiempo (LRU). Se apoya en `cachetools.TTLCache`.
+#
+# La caché es segura entre hilos y lleva contadores de aciertos (hits) y fallos
+# (misses) para poder medir su efecto.
+#
+# Con varios procesos (workers de gunicorn) cada uno tiene su propia memoria. Si
+# se configura `SHARED_CACHE_DIR`, la caché usa además `DiskCache`: los valores
+# se guardan en disco (pickle) y un bloqueo por clave hace que solo un proceso los
+# cargue; los demás leen el resultado del disco en lugar de recalcularlo.
+#
+# Información Recibida:
+# - Una clave (tupla) y una función que carga el valor cuando no está en caché.
+#
+# Información Enviada:
+# - El valor guardado o recién cargado, y las estadísticas de uso.
+# -----------------------------------------------------------------------------
+
+import hashlib  # Nombre de archivo a partir de la clave.
+import os  # Archivos de la caché en disco.
+import pickle  # Serialización de los valores en disco.
+import tempfile  # Escritura atómica de los archivos.
+import threading  # Bloqueo para el acceso concurrente desde varios hilos.
+import time  # Vencimiento de las entradas en disco.
+
+from cachetools import TTLCache  # Caché con tiempo de vida y desalojo LRU.
+
+from config.settings import SHARED_CACHE_DIR  # Carpeta de la caché compartida entre procesos.
+
+_MISSING = object()  # Marca de valor ausente en la caché en disco.
+
+
+class DiskCache:
+    # Caché en disco compartida por los procesos de la misma máquina.
+    # Cada entrada es un archivo `<hash de la clave>.pkl` con (vencimiento, valor).
+
+    def __init__(self, directory, ttl, lock_timeout=120, prune_every=200):
+        self.directory = directory
+        self.ttl = ttl
+        self.lock_timeout = lock_timeout  # Segundos tras los que un bloqueo se considera abandonado.
+        self.prune_every = prune_every  # Cada cuántas escrituras se borran las entradas vencidas.
+        self._writes = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha1(repr(key).encode('utf-8')).hexdigest() + '.pkl')
+
+    def get(self, key):
+        # Valor guardado o `_MISSING` si no existe o ya venció.
+        try:
+            with open(self._path(key), 'rb') as f:
+                vence, valor = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return _MISSING
+        return valor if vence > time.time() else _MISSING
+
+    def set(self, key, valor):
+        # Guarda el valor (se escribe en un temporal y se reemplaza).
+        descriptor, temporal = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(descriptor, 'wb') as f:
+            pickle.dump((time.time() + self.ttl, valor), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporal, self._path(key))
+        self._writes += 1
+        if self._writes % self.prune_every == 0:
+            self.prune()
+
+    def lock(self, key):
+        # Bloqueo entre procesos para cargar una clave: True si se obtuvo.
+        ruta = self._path(key) + '.lock'
+        try:
+            os.close(os.open(ruta, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return True
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(ruta) > self.lock_timeout:
+                    os.remove(ruta)  # Bloqueo abandonado por un proceso que terminó.
+            except OSError:
+                pass
+            return False
+
+    def unlock(self, key):
+        try:
+            os.remove(self._path(key) + '.lock')
+        except OSError:
+            pass
+
+    def renew(self, key):
+        # Renueva un bloqueo que se mantiene tomado (por ejemplo, el del proceso que lee una
+        # hoja para todos): False si ya no existe porque otro proceso lo dio por abandonado.
+        try:
+            os.utime(self._path(key) + '.lock')
+            return True
+        except OSError:
+            return False
+
+    def modified(self, key):
+        # Fecha de la última escritura de la clave (None si no existe), para no leerla sin cambios.
+        try:
+            return os.stat(self._path(key)).st_mtime_ns
+        except OSError:
+            return None
+
+    def wait_for(self, key, timeout):
+        # Espera a que otro proceso guarde la clave; `_MISSING` si no llega a tiempo.
+        limite = time.time() + timeout
+        while time.time() < limite:
+            valor = self.get(key)
+            if valor is not _MISSING or not os.path.exists(self._path(key) + '.lock'):
+                return valor
+            time.sleep(0.05)
+        return _MISSING
+
+    def prune(self):
+        # Borra las entradas vencidas y los temporales huérfanos.
+        ahora = time.time()
+        for nombre in os.listdir(self.directory):
+            ruta = os.path.join(self.directory, nombre)
+            try:
+                if nombre.endswith('.tmp') and ahora - os.path.getmtime(ruta) > self.lock_timeout:
+                    os.remove(ruta)
+                elif nombre.endswith('.pkl') and ahora - os.path.getmtime(ruta) > self.ttl:
+                    os.remove(ruta)
+            except OSError:
+                pass
+
+    def clear(self):
+        for nombre in os.listdir(self.directory):
+            if nombre.endswith('.pkl'):
+                try:
+                    os.remove(os.path.join(self.directory, nombre))
+                except OSError:
+                    pass
+
+
+def shared_store(name, ttl):
+    # Caché en disco de `name` dentro de SHARED_CACHE_DIR; None si no está configurada.
+    if not SHARED_CACHE_DIR:
+        return None
+    return DiskCache(os.path.join(SHARED_CACHE_DIR, name), ttl)
+
+
+class DataCache:
+    # Caché TTL + LRU con contadores de aciertos y fallos.
+    # Con `shared` (DiskCache) los fallos en memoria se buscan primero en disco.
+
+    def __init__(self, maxsize, ttl, shared=None):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.RLock()
+        self.shared = shared
+        self.hits = 0
+        self.misses = 0
+        self.shared_hits = 0
+
+    def get_or_load(self, key, loader):
+        # Devuelve el valor de `key`; si no está, lo carga con `loader()` y lo guarda.
+        with self._lock:
+            try:
+                valor = self._cache[key]
+                self.hits += 1
+                return valor
+            except KeyError:
+                self.misses += 1
+        valor = self._load(key, loader)  # La carga se hace fuera del bloqueo para no frenar a otros hilos.
+        with self._lock:
+            self._cache[key] = valor
+        return valor
+
+    def _load(self, key, loader):
+        # Carga el valor desde la caché en disco (si hay) o con `loader()`.
+        if self.shared is None:
+            return loader()
+        valor = self.shared.get(key)
+        if valor is _MISSING:
+            if self.shared.lock(key):
+                try:
+                    valor = self.shared.get(key)  # Otro proceso pudo guardarlo mientras tanto.
+                    if valor is _MISSING:
+                        valor = loader()
+                        self.shared.set(key, valor)
+                        return valor
+                finally:
+                    self.shared.unlock(key)
+            else:
+                # Otro proceso lo está cargando: se espera su resultado.
+                valor = self.shared.wait_for(key, self.shared.lock_timeout)
+                if valor is _MISSING:
+                    return loader()
+        with self._lock:
+            self.shared_hits += 1
+        return valor
+
+    def clear(self):
+        # Vacía la caché del proceso y reinicia los contadores. La caché en disco no se
+        # vacía: sus claves incluyen la versión de los datos y las entradas viejas vencen solas.
+        with self._lock:
+            self._cache.clear()
+            self.hits = 0
+            self.misses = 0
+            self.shared_hits = 0
+
+    def stats(self):
+        # Estadísticas de uso de la caché.
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / total if total else 0.0,
+                'size': len(self._cache),
+                'maxsize': self._cache.maxsize,
+                'ttl': self._cache.ttl,
+                'shared': self.shared is not None,
+                'shared_hits': self.shared_hits,
+            }
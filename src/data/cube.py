@@ -0,0 +1,217 @@
+# -----------------------------------------------------------------------------
+# Descripción del Código:
+# Este módulo construye y consulta el cubo de indicadores del consolidado: los
+# conteos de registros (Casos) y de registros con glosa (Pendientes) agregados por
+# mes de reporte × departamento × municipio × novedad × código de glosa.
+#
+# El consolidado tiene una fila por glosa, así que los registros se cuentan en su
+# primera fila (`record_starts`): `casos`/`pendientes` cuentan registros y
+# `filas`/`filas_pendientes` cuentan filas. Sin filtro de glosa se usan los
+# registros; con filtro de glosa, las filas de esa glosa (un registro no repite
+# una glosa). Los registros sin glosa también están en el consolidado (una fila
+# sin código de glosa) y son los Resueltos.
+#
+# El cubo se construye al terminar la consolidación (src/data/pipeline.py) y se
+# guarda junto al dataset en `_cube.npz`: cada dimensión es un arreglo de códigos
+# enteros con su lista de categorías, y cada medida un arreglo de enteros (solo se
+# guardan las combinaciones que existen). La dirección no es una dimensión propia:
+# se resuelve con sus códigos de novedad (`NOVEDADES_POR_DIRECCION`), así que cambiar
+# esa configuración no obliga a reconstruir el cubo. Una dirección sin códigos
+# configurados no filtra (`nov=[]` o None): ve todas las novedades.
+#
+# El periodo de los indicadores es el mes de reporte (`fecha_rep`, la fecha del
+# archivo .NEG en que llegó el registro), no la fecha de la novedad (`fech_nov`): un
+# mes cuenta lo que se reportó en él, y coincide con las particiones anio/mes del
+# dataset y con el filtro por año y mes de las páginas.
+#
+# Una consulta solo filtra los códigos con tablas de búsqueda y suma por mes con
+# `np.bincount`, sin leer ni agrupar el consolidado completo.
+#
+# Información Recibida:
+# - Carpeta del dataset Parquet (para construir) o ruta del cubo (para consultar).
+# - Filtros por dimensión: anio, mes, dep, mun, nov y glosa.
+#
+# Información Enviada:
+# - Indicadores mensuales (Mes, Casos, Resueltos, Pendientes).
+# -----------------------------------------------------------------------------
+
+import os  # Manejo de rutas y reemplazo atómico del archivo.
+
+import numpy as np  # Arreglos compactos del cubo.
+import pandas as pd  # Agregación y salida en DataFrame.
+import pyarrow.dataset as ds  # Lectura del dataset por archivos.
+
+from src.data.glosas import RECORD_KEY, record_starts  # Primera fila de cada registro.
+
+CUBE_NAME = '_cube.npz'  # Archivo del cubo dentro de la carpeta del dataset.
+
+# Dimensiones del cubo y columna del consolidado de la que salen.
+CUBE_DIMENSIONS = {
+    'periodo': 'fecha_rep',  # Mes de reporte (ordinal de pandas Period 'M').
+    'dep': 'dep',
+    'mun': 'mun',
+    'nov': 'nov',
+    'glosa': 'observaciones_split',
+}
+CUBE_MEASURES = ['casos', 'pendientes', 'filas', 'filas_pendientes']
+NAT_PERIOD = np.iinfo('int64').min  # Ordinal del periodo de las filas sin fecha de reporte (NaT).
+
+
+def cube_path(root):
+    # Ruta del cubo de un dataset.
+    return os.path.join(root, CUBE_NAME)
+
+
+def _aggregate(df):
+    # Registros y filas (con y sin glosa) por combinación de dimensiones de un bloque del consolidado.
+    # El bloque debe tener registros completos (todas sus filas).
+    primera = record_starts(df)
+    pendiente = (df['No_Glosas'] > 0).to_numpy()
+    bloque = pd.DataFrame({
+        'periodo': pd.to_datetime(df['fecha_rep']).dt.to_period('M').astype('int64'),
+        'dep': df['dep'], 'mun': df['mun'], 'nov': df['nov'], 'glosa': df['observaciones_split'],
+        'casos': primera.astype('int64'),
+        'pendientes': (primera & pendiente).astype('int64'),
+        'filas': 1,
+        'filas_pendientes': pendiente.astype('int64'),
+    })
+    # Las dimensiones se agrupan como texto para poder sumar bloques con categorías distintas.
+    for dim in ('dep', 'mun', 'nov', 'glosa'):
+        bloque[dim] = bloque[dim].astype(object)
+    return bloque.groupby(list(CUBE_DIMENSIONS), dropna=False, sort=False)[CUBE_MEASURES].sum().reset_index()
+
+
+class KpiCube:
+    # Cubo disperso: códigos por dimensión y medidas por combinación.
+
+    def __init__(self, codes, categories, measures):
+        self.codes = codes  # dimensión -> arreglo de códigos (-1 = nulo).
+        self.categories = categories  # dimensión -> arreglo de categorías.
+        self.measures = measures  # medida -> arreglo de enteros.
+
+    def __len__(self):
+        return len(self.measures['casos'])
+
+    @classmethod
+    def from_frame(cls, agregado):
+        # Cubo a partir de las combinaciones agregadas (una fila por combinación).
+        codes, categories = {}, {}
+        for dim in CUBE_DIMENSIONS:
+            if dim == 'periodo':
+                codigos, valores = pd.factorize(agregado[dim].astype('int64'), sort=True)
+                categories[dim] = np.asarray(valores, dtype='int64')
+            else:
+                codigos, valores = pd.factorize(agregado[dim], sort=True)
+                categories[dim] = np.asarray(valores, dtype=str)
+            codes[dim] = codigos.astype('int32')
+        measures = {m: agregado[m].to_numpy(dtype='int64') for m in CUBE_MEASURES}
+        return cls(codes, categories, measures)
+
+    @classmethod
+    def from_dataset(cls, root):
+        # Construye el cubo leyendo el dataset archivo por archivo con solo las columnas necesarias.
+        # Cada archivo tiene registros completos; un lote de filas podría partir un registro en dos.
+        columnas = list(dict.fromkeys(list(CUBE_DIMENSIONS.values()) + RECORD_KEY + ['No_Glosas']))
+        parciales = []
+        if os.path.exists(root):
+            dataset = ds.dataset(root, format='parquet', partitioning='hive')
+            for fragmento in dataset.get_fragments():
+                tabla = fragmento.to_table(columns=columnas)
+                if tabla.num_rows:
+                    parciales.append(_aggregate(tabla.to_pandas()))
+        if not parciales:
+            vacio = pd.DataFrame({c: pd.Series(dtype='int64' if c in ('periodo', *CUBE_MEASURES) else object)
+                                  for c in list(CUBE_DIMENSIONS) + CUBE_MEASURES})
+            return cls.from_frame(vacio)
+        agregado = pd.concat(parciales, ignore_index=True)
+        if len(parciales) > 1:
+            agregado = agregado.groupby(list(CUBE_DIMENSIONS), dropna=False, sort=False)[CUBE_MEASURES].sum().reset_index()
+        return cls.from_frame(agregado)
+
+    def save(self, path):
+        # Guarda el cubo en un .npz (se escribe en un temporal y se reemplaza).
+        arreglos = {}
+        for dim in CUBE_DIMENSIONS:
+            arreglos[f"codes_{dim}"] = self.codes[dim]
+            arreglos[f"categories_{dim}"] = self.categories[dim]
+        for medida in CUBE_MEASURES:
+            arreglos[f"measure_{medida}"] = self.measures[medida]
+        temporal = f"{path}.tmp.npz"
+        np.savez_compressed(temporal, **arreglos)
+        os.replace(temporal, path)
+
+    @classmethod
+    def load(cls, path):
+        # Carga un cubo guardado con `save`; None si es de una versión anterior sin todas las medidas
+        # (se usa la lectura del dataset hasta que la siguiente consolidación lo reconstruya).
+        with np.load(path, allow_pickle=False) as datos:
+            if any(f"measure_{m}" not in datos for m in CUBE_MEASURES):
+                return None
+            codes = {dim: datos[f"codes_{dim}"] for dim in CUBE_DIMENSIONS}
+            categories = {dim: datos[f"categories_{dim}"] for dim in CUBE_DIMENSIONS}
+            measures = {m: datos[f"measure_{m}"] for m in CUBE_MEASURES}
+        return cls(codes, categories, measures)
+
+    def _lookup(self, dim, valores):
+        # Tabla de búsqueda: True para las categorías pedidas (la última posición es el nulo).
+        if not isinstance(valores, (list, tuple, set, np.ndarray)):
+            valores = [valores]
+        categorias = self.categories[dim]
+        if dim != 'periodo':
+            valores = [str(v) for v in valores]
+        return np.append(np.isin(categorias, list(valores)), False)
+
+    def _period_lookup(self, anio=None, mes=None):
+        # Tabla de búsqueda de los meses de reporte que cumplen el año y el mes.
+        periodos = pd.PeriodIndex.from_ordinals(self.categories['periodo'], freq='M')
+        seleccion = np.ones(len(periodos), dtype=bool)
+        if anio is not None:
+            seleccion &= periodos.year == int(anio)
+        if mes is not None:
+            seleccion &= periodos.month == int(mes)
+        return np.append(seleccion, False)
+
+    def mask(self, anio=None, mes=None, **filtros):
+        # Combinaciones que cumplen los filtros (None si no hay filtros).
+        mascara = None
+        if anio is not None or mes is not None:
+            mascara = self._period_lookup(anio, mes)[self.codes['periodo']]
+        for dim, valores in filtros.items():
+            if dim not in CUBE_DIMENSIONS:
+                raise ValueError(f"Dimensión desconocida del cubo: {dim}")
+            if valores is None or (isinstance(valores, (list, tuple, set)) and not valores):
+                continue  # Sin valores: la dimensión no se filtra.
+            parcial = self._lookup(dim, valores)[self.codes[dim]]
+            mascara = parcial if mascara is None else mascara & parcial
+        return mascara
+
+    def monthly(self, **filtros):
+        # Indicadores por mes de reporte con los filtros dados.
+        mascara = self.mask(**filtros)
+        periodos = self.codes['periodo'] if mascara is None else self.codes['periodo'][mascara]
+        total = len(self.categories['periodo'])
+        # Con filtro de glosa se cuentan las filas de esa glosa (un registro por fila).
+        por_glosa = filtros.get('glosa') not in (None, [], (), set())
+        medidas = {'casos': 'filas', 'pendientes': 'filas_pendientes'} if por_glosa else {'casos': 'casos', 'pendientes': 'pendientes'}
+        sumas = {}
+        for nombre, medida in medidas.items():
+            pesos = self.measures[medida] if mascara is None else self.measures[medida][mascara]
+            sumas[nombre] = np.bincount(periodos, weights=pesos, minlength=total).astype('int64')
+        # Las filas sin fecha de reporte (partición anio=0) no tienen mes: no se muestran.
+        presentes = np.flatnonzero(sumas['casos'] * (self.categories['periodo'] != NAT_PERIOD))
+        meses = pd.PeriodIndex.from_ordinals(self.categories['periodo'][presentes], freq='M').astype(str)
+        casos, pendientes = sumas['casos'][presentes], sumas['pendientes'][presentes]
+        return pd.DataFrame({
+            'Mes': list(meses),
+            'Casos': casos,
+            'Resueltos': casos - pendientes,
+            'Pendientes': pendientes,
+        })
+
+
+def build_cube(root):
+    # Construye el cubo del dataset `root` y lo guarda junto a él.
+    cubo = KpiCube.from_dataset(root)
+    if os.path.exists(root):
+        cubo.save(cube_path(root))
+    return cubo
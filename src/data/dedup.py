@@ -0,0 +1,281 @@
+# -----------------------------------------------------------------------------
+# Descripción del Código:
+# Este módulo quita las novedades repetidas entre archivos. Los .NEG diarios se
+# traslapan: la misma novedad (`tip_doc`, `doc`, `nov`, `fech_nov`) se vuelve a
+# reportar en archivos posteriores, y al unir los archivos con `pd.concat` los
+# registros y todos los indicadores quedaban inflados.
+#
+# - `fingerprints` resume la clave de cada fila en una huella de 64 bits
+#   (`hash_pandas_object`) después de llevar las columnas a una forma única, así
+#   que una fila leída del .NEG y la misma fila leída del Parquet dan la misma huella.
+# - `FingerprintSet` guarda en disco (`<dataset>/_dedup/`) las huellas ya vistas y
+#   el archivo dueño de cada una, ordenadas y repartidas en 2**SHARD_BITS
+#   fragmentos. Las consultas abren los fragmentos mapeados en memoria
+#   (`np.searchsorted`); las huellas nuevas se acumulan en memoria hasta
+#   `PENDING_LIMIT` y se escriben fragmento por fragmento. La memoria no depende
+#   del tamaño del histórico.
+# - Política 'first': la novedad se queda en el archivo con la fecha de reporte más
+#   antigua; 'last': en el más reciente. Si el archivo que llega gana, las filas de
+#   la novedad se borran de las salidas del archivo anterior (`drop_superseded`).
+#
+# La deduplicación es entre archivos: las filas de un mismo archivo con la misma
+# clave (por ejemplo, las glosas de una novedad) se conservan. Las filas con algún
+# nulo en la clave (por ejemplo, sin `doc`) no se pueden distinguir entre afiliados
+# y se conservan siempre.
+#
+# Información Recibida:
+# - Carpeta del dataset, política y los bloques de cada archivo fuente.
+#
+# Información Enviada:
+# - Máscaras de las filas que se conservan de cada bloque y salidas de los archivos
+#   anteriores reescritas sin las filas reemplazadas.
+# -----------------------------------------------------------------------------
+
+import json  # Registro de archivos y política del conjunto.
+import os  # Rutas y reemplazo atómico de los fragmentos.
+import shutil  # Borrado del conjunto al reconstruirlo.
+
+import numpy as np  # Huellas ordenadas y búsqueda binaria.
+import pandas as pd  # Normalización y hash de las claves.
+import pyarrow as pa  # Filtrado de las salidas reescritas.
+import pyarrow.parquet as pq  # Lectura y escritura de las salidas.
+
+from src.data.ingest import report_date  # Fecha de reporte del nombre del archivo.
+
+KEY_COLUMNS = ['tip_doc', 'doc', 'nov', 'fech_nov']  # Clave de una novedad.
+DEDUP_POLICIES = ('first', 'last')
+DEDUP_DIR = '_dedup'  # Arrow ignora las carpetas que empiezan por '_' al leer el dataset.
+META_NAME = 'meta.json'
+SHARD_BITS = 6  # 64 fragmentos: al escribir solo se carga uno a la vez.
+PENDING_LIMIT = 5_000_000  # Huellas en memoria antes de escribirlas en los fragmentos.
+
+
+def _canonical(s, tipo):
+    # Forma única de una columna de la clave, sin importar cómo se leyó.
+    if tipo == 'category':
+        s = s if isinstance(s.dtype, pd.CategoricalDtype) else s.astype('category')
+        return s.cat.rename_categories(s.cat.categories.astype(str))
+    if tipo == 'number':
+        return pd.to_numeric(s, errors='coerce').astype('float64')
+    return pd.to_datetime(s, errors='coerce').astype('datetime64[ns]')
+
+
+def fingerprints(df):
+    # Huella de 64 bits de la clave de cada fila y máscara de las filas con la clave completa.
+    # Una clave con algún nulo (por ejemplo, sin `doc`) no identifica la novedad: todas esas
+    # filas darían la misma huella, así que no se deduplican.
+    tipos = {'tip_doc': 'category', 'doc': 'number', 'nov': 'category', 'fech_nov': 'date'}
+    claves = pd.DataFrame({c: _canonical(df[c], tipos[c]).reset_index(drop=True) for c in KEY_COLUMNS})
+    return pd.util.hash_pandas_object(claves, index=False).to_numpy(), claves.notna().all(axis=1).to_numpy()
+
+
+def order_key(file_path):
+    # Orden de los archivos para la política: fecha de reporte (YYYYMMDD) y nombre.
+    fecha = report_date(file_path)
+    partes = fecha.split('/')
+    if len(partes) == 3:
+        fecha = ''.join(reversed(partes))
+    return f"{fecha}|{os.path.basename(file_path)}"
+
+
+class _SortedMap:
+    # Huella -> dueño en memoria, en arreglos ordenados (las huellas nuevas se insertan en su posición).
+
+    def __init__(self):
+        self.keys = np.empty(0, dtype=np.uint64)
+        self.owners = np.empty(0, dtype=np.int32)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def lookup(self, huellas, duenos):
+        # Escribe en `duenos` el dueño de las huellas presentes.
+        if len(self.keys):
+            i = np.searchsorted(self.keys, huellas)
+            presentes = self.keys[np.minimum(i, len(self.keys) - 1)] == huellas
+            duenos[presentes] = self.owners[i[presentes]]
+
+    def put(self, huellas, duenos):
+        # Agrega o reemplaza (huellas únicas y ordenadas).
+        i = np.searchsorted(self.keys, huellas)
+        presentes = np.zeros(len(huellas), dtype=bool)
+        if len(self.keys):
+            presentes = self.keys[np.minimum(i, len(self.keys) - 1)] == huellas
+        self.owners[i[presentes]] = duenos[presentes]
+        nuevas = ~presentes
+        self.keys = np.insert(self.keys, i[nuevas], huellas[nuevas])
+        self.owners = np.insert(self.owners, i[nuevas], duenos[nuevas])
+
+
+class FingerprintSet:
+    # Huellas de las novedades del dataset y el archivo dueño de cada una.
+    # Flujo por archivo: `start` -> `keep` (por bloque) -> `commit` (o `abort` si falla).
+
+    def __init__(self, root, policy='first'):
+        if policy not in DEDUP_POLICIES:
+            raise ValueError(f"Política de deduplicación desconocida: {policy}")
+        self.path = os.path.join(root, DEDUP_DIR)
+        self.policy = policy
+        meta = self._load_meta()
+        self.stored_policy = meta.get('policy')
+        self.files = meta.get('files', {})  # clave del archivo -> {'id', 'order'}
+        self._next_id = max((f['id'] for f in self.files.values()), default=-1) + 1
+        self._pending = _SortedMap()  # Huellas de los archivos ya terminados, sin escribir.
+        self._staged = _SortedMap()  # Huellas del archivo en curso.
+        self._current = None
+        self._superseded = set()
+        self._shards = {}  # Fragmentos abiertos (mapeados en memoria).
+        self._rank()
+
+    def _load_meta(self):
+        try:
+            with open(os.path.join(self.path, META_NAME), encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def _rank(self):
+        # Posición de cada archivo (por id) según `order_key`.
+        self._ranks = np.zeros(self._next_id, dtype=np.int64)
+        for posicion, entrada in enumerate(sorted(self.files.values(), key=lambda f: f['order'])):
+            self._ranks[entrada['id']] = posicion
+
+    def matches(self, claves):
+        # Indica si el conjunto corresponde a los archivos `claves` con la misma política.
+        return self.stored_policy == self.policy and set(self.files) == set(claves)
+
+    def reset(self):
+        # Vacía el conjunto (en disco y en memoria).
+        shutil.rmtree(self.path, ignore_errors=True)
+        self.__init__(os.path.dirname(self.path), self.policy)
+
+    def file_name(self, file_id):
+        return next(k for k, f in self.files.items() if f['id'] == file_id)
+
+    def _shard_files(self, n):
+        return (os.path.join(self.path, f"keys_{n:02d}.npy"), os.path.join(self.path, f"owners_{n:02d}.npy"))
+
+    def _shard(self, n):
+        # Fragmento `n` mapeado en memoria (arreglos vacíos si no existe).
+        if n not in self._shards:
+            rutas = self._shard_files(n)
+            if os.path.exists(rutas[0]):
+                self._shards[n] = tuple(np.load(r, mmap_mode='r', allow_pickle=False) for r in rutas)
+            else:
+                self._shards[n] = (np.empty(0, dtype=np.uint64), np.empty(0, dtype=np.int32))
+        return self._shards[n]
+
+    def owners(self, huellas):
+        # Dueño de cada huella (-1 si no se ha visto). Las huellas deben estar ordenadas.
+        duenos = np.full(len(huellas), -1, dtype=np.int32)
+        fragmentos = huellas >> np.uint64(64 - SHARD_BITS)
+        limites = np.searchsorted(fragmentos, np.arange((1 << SHARD_BITS) + 1, dtype=np.uint64))
+        for n in np.flatnonzero(np.diff(limites)):
+            claves, propios = self._shard(n)
+            if len(claves):
+                parte = slice(limites[n], limites[n + 1])
+                i = np.searchsorted(claves, huellas[parte])
+                presentes = claves[np.minimum(i, len(claves) - 1)] == huellas[parte]
+                duenos[parte][presentes] = propios[i[presentes]]
+        self._pending.lookup(huellas, duenos)
+        self._staged.lookup(huellas, duenos)
+        return duenos
+
+    def start(self, file_path, key):
+        # Registra el archivo que se va a procesar y devuelve su id.
+        previo = self.files.get(key)
+        file_id = previo['id'] if previo else self._next_id
+        if not previo:
+            self._next_id += 1
+        self.files[key] = {'id': file_id, 'order': order_key(file_path)}
+        self._rank()
+        self._current, self._superseded = file_id, set()
+        return file_id
+
+    def keep(self, df):
+        # Máscara de las filas del bloque que se conservan: las de novedades nuevas, las que ya
+        # pertenecen a este archivo y las que este archivo le gana a otro según la política.
+        conservar = np.ones(len(df), dtype=bool)  # Las filas con la clave incompleta siempre se conservan.
+        todas, completas = fingerprints(df)
+        if not completas.any():
+            return conservar
+        huellas, filas = np.unique(todas[completas], return_inverse=True)
+        duenos = self.owners(huellas)
+        otros = (duenos >= 0) & (duenos != self._current)
+        gana = np.ones(len(huellas), dtype=bool)
+        if otros.any():
+            propio, ajeno = self._ranks[self._current], self._ranks[duenos[otros]]
+            gana[otros] = propio < ajeno if self.policy == 'first' else propio > ajeno
+            self._superseded.update(np.unique(duenos[otros][gana[otros]]).tolist())
+        self._staged.put(huellas[gana], np.full(int(gana.sum()), self._current, dtype=np.int32))
+        conservar[completas] = gana[filas.ravel()]
+        return conservar
+
+    def commit(self):
+        # Termina el archivo en curso; devuelve los ids de los archivos que perdieron novedades.
+        self._pending.put(self._staged.keys, self._staged.owners)
+        self._staged = _SortedMap()
+        desplazados, self._current, self._superseded = self._superseded, None, set()
+        if len(self._pending) >= PENDING_LIMIT:
+            self.flush()
+        return sorted(desplazados)
+
+    def abort(self, key):
+        # Descarta las huellas del archivo en curso (por ejemplo, si falló su lectura).
+        self._staged = _SortedMap()
+        self._current, self._superseded = None, set()
+        self.files.pop(key, None)
+
+    def flush(self):
+        # Escribe las huellas pendientes, un fragmento a la vez, y luego el registro de archivos.
+        os.makedirs(self.path, exist_ok=True)
+        pendientes = self._pending
+        fragmentos = pendientes.keys >> np.uint64(64 - SHARD_BITS)
+        limites = np.searchsorted(fragmentos, np.arange((1 << SHARD_BITS) + 1, dtype=np.uint64))
+        self._shards = {}  # Se sueltan los mapas antes de reemplazar los archivos.
+        for n in np.flatnonzero(np.diff(limites)):
+            fragmento = _SortedMap()
+            rutas = self._shard_files(n)
+            if os.path.exists(rutas[0]):
+                fragmento.keys, fragmento.owners = (np.load(r, allow_pickle=False) for r in rutas)
+            parte = slice(limites[n], limites[n + 1])
+            fragmento.put(pendientes.keys[parte], pendientes.owners[parte])
+            for ruta, arreglo in zip(rutas, (fragmento.keys, fragmento.owners)):
+                with open(f"{ruta}.tmp", 'wb') as f:
+                    np.save(f, arreglo, allow_pickle=False)
+                os.replace(f"{ruta}.tmp", ruta)
+        self._pending = _SortedMap()
+        temporal = os.path.join(self.path, f"{META_NAME}.tmp")
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump({'policy': self.policy, 'files': self.files}, f, indent=1, ensure_ascii=False)
+        os.replace(temporal, os.path.join(self.path, META_NAME))
+        self.stored_policy = self.policy
+
+
+def drop_superseded(root, entry, file_id, conjunto):
+    # Reescribe las salidas de un archivo sin las filas cuya novedad ahora pertenece a otro.
+    # Actualiza `entry` (outputs, rows y duplicates) y devuelve las filas borradas.
+    borradas = 0
+    for relativo in list(entry.get('outputs', [])):
+        ruta = os.path.join(root, relativo)
+        if not os.path.exists(ruta):
+            continue
+        tabla = pq.ParquetFile(ruta).read()  # Solo el archivo, sin las columnas de partición de la ruta.
+        huellas, completas = fingerprints(tabla.select(KEY_COLUMNS).to_pandas())
+        orden = np.argsort(huellas, kind='stable')
+        conservar = np.empty(len(huellas), dtype=bool)
+        conservar[orden] = conjunto.owners(huellas[orden]) == file_id
+        conservar |= ~completas  # Sin clave completa no tienen huella en el conjunto.
+        if conservar.all():
+            continue
+        borradas += int((~conservar).sum())
+        if conservar.any():
+            temporal = os.path.join(os.path.dirname(ruta), f".{os.path.basename(ruta)}.tmp")  # Arrow ignora los '.'.
+            pq.write_table(tabla.filter(pa.array(conservar)), temporal)
+            os.replace(temporal, ruta)
+        else:
+            os.remove(ruta)
+            entry['outputs'].remove(relativo)
+    entry['rows'] = entry.get('rows', 0) - borradas
+    entry['duplicates'] = entry.get('duplicates', 0) + borradas
+    return borradas
@@ -0,0 +1,233 @@
+# -----------------------------------------------------------------------------
+# Descripción del Código:
+# Este módulo genera las exportaciones de los datasets del almacén en CSV, CSV
+# comprimido (gzip) o Parquet, como una secuencia de bloques de bytes. Reemplaza
+# la entrega de un `.xlsx` grande escrito con `to_excel` desde los notebooks.
+#
+# - Los filtros (año, mes, dirección, departamento, municipio, novedad y código
+#   de glosa) se traducen a una expresión de Arrow: año y mes descartan
+#   particiones completas y el resto se evalúa al leer cada archivo.
+# - El dataset se lee por lotes (`EXPORT_BATCH_SIZE` filas) y cada lote se
+#   convierte y entrega enseguida, así que la memoria no depende del tamaño de la
+#   exportación.
+# - `tee_to_file` guarda en disco lo que se va enviando; cuando la exportación
+#   termina, el archivo queda disponible para servir las descargas reanudadas
+#   (solicitudes con `Range`) sin volver a generarla.
+#
+# Información Recibida:
+# - Carpeta del dataset, filtros, columnas y formato de salida.
+#
+# Información Enviada:
+# - Bloques de bytes del archivo exportado y la clave (huella) de la exportación.
+# -----------------------------------------------------------------------------
+
+import hashlib  # Clave de cada exportación.
+import io  # Búfer de escritura de los bloques.
+import json  # Serialización de la clave.
+import os  # Rutas, metadatos y reemplazo atómico.
+import tempfile  # Archivos temporales de las exportaciones en curso.
+import time  # Vencimiento de los archivos guardados.
+import zlib  # Compresión gzip por bloques.
+
+import pyarrow as pa  # Tablas y tipos de Arrow.
+import pyarrow.csv as pacsv  # Escritura de CSV.
+import pyarrow.dataset as ds  # Lectura del dataset por lotes con filtros.
+import pyarrow.parquet as pq  # Escritura de Parquet.
+
+from config.settings import EXPORT_BATCH_SIZE, NOVEDADES_POR_DIRECCION  # Parámetros de la exportación.
+from src.data.manifest import MANIFEST_NAME  # El manifiesto cambia con cada actualización del dataset.
+from src.data.store import PARTITION_COLUMNS  # Columnas de partición (no se exportan por defecto).
+
+# Formatos de salida y su tipo de contenido.
+EXPORT_FORMATS = {
+    'csv': 'text/csv',  # Flask agrega charset=utf-8.
+    'csv.gz': 'application/gzip',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+# Filtros de texto: parámetro -> columna del dataset.
+FILTER_COLUMNS = {
+    'dep': 'dep',
+    'mun': 'mun',
+    'nov': 'nov',
+    'glosa': 'observaciones_split',
+}
+
+
+def split_values(texto):
+    # Valores de un parámetro separados por coma ('N01,N02' -> ['N01', 'N02']).
+    return [v.strip() for v in str(texto).split(',') if v.strip()]
+
+
+def parse_filters(args):
+    # Filtros de la exportación a partir de los parámetros de la URL.
+    # Año y mes deben ser enteros (ValueError si no lo son). La dirección se traduce a sus novedades.
+    filtros = {}
+    for nombre in ('anio', 'mes'):
+        if args.get(nombre):
+            filtros[nombre] = sorted({int(v) for v in split_values(args[nombre])})
+    for nombre in FILTER_COLUMNS:
+        if args.get(nombre):
+            filtros[nombre] = sorted(set(split_values(args[nombre])))
+    if args.get('direccion'):
+        novedades = set()
+        for direccion in split_values(args['direccion']):
+            if direccion not in NOVEDADES_POR_DIRECCION:
+                raise ValueError(f"Dirección desconocida: {direccion}")
+            novedades.update(NOVEDADES_POR_DIRECCION[direccion])
+        if novedades:  # Una dirección sin novedades configuradas ve todas.
+            filtros['nov'] = sorted(novedades & set(filtros['nov'])) if 'nov' in filtros else sorted(novedades)
+    return filtros
+
+
+def filter_expression(filtros):
+    # Expresión de Arrow con todos los filtros (None si no hay filtros).
+    expresion = None
+    for nombre, valores in filtros.items():
+        campo = ds.field(FILTER_COLUMNS.get(nombre, nombre))
+        parcial = campo.isin(valores)
+        expresion = parcial if expresion is None else expresion & parcial
+    return expresion
+
+
+def dataset_version(root):
+    # Versión del dataset: fecha de modificación del manifiesto (o de la carpeta).
+    ruta = os.path.join(root, MANIFEST_NAME)
+    return os.stat(ruta if os.path.exists(ruta) else root).st_mtime_ns
+
+
+def export_columns(root, columnas=None):
+    # Columnas que se exportan: las pedidas (en el orden del dataset) o todas menos las de partición.
+    esquema = ds.dataset(root, format='parquet', partitioning='hive').schema
+    disponibles = [c for c in esquema.names if c not in PARTITION_COLUMNS]
+    if not columnas:
+        return disponibles
+    desconocidas = set(columnas) - set(esquema.names)
+    if desconocidas:
+        raise ValueError(f"Columnas desconocidas: {', '.join(sorted(desconocidas))}")
+    return [c for c in esquema.names if c in columnas]
+
+
+def export_key(root, fmt, filtros, columnas):
+    # Huella de una exportación: cambia con el dataset, el formato, los filtros o las columnas.
+    datos = [os.path.abspath(root), dataset_version(root), fmt, sorted(filtros.items()), columnas]
+    return hashlib.sha1(json.dumps(datos, default=str).encode('utf-8')).hexdigest()
+
+
+def iter_batches(root, filtros, columnas, batch_size=EXPORT_BATCH_SIZE):
+    # Lotes del dataset con los filtros y columnas pedidos.
+    dataset = ds.dataset(root, format='parquet', partitioning='hive')
+    for lote in dataset.to_batches(columns=columnas, filter=filter_expression(filtros), batch_size=batch_size):
+        if lote.num_rows:
+            yield lote
+
+
+def _csv_batch(lote):
+    # Lote listo para CSV: las fechas sin hora (AAAA-MM-DD) y las categorías como texto.
+    columnas = []
+    for columna in lote.columns:
+        if pa.types.is_timestamp(columna.type):
+            columna = columna.cast(pa.date32(), safe=False)
+        elif pa.types.is_dictionary(columna.type):
+            columna = columna.cast(columna.type.value_type)
+        columnas.append(columna)
+    return pa.RecordBatch.from_arrays(columnas, names=lote.schema.names)
+
+
+def iter_csv(lotes, columnas):
+    # Bloques de bytes del CSV: el encabezado y luego un bloque por lote.
+    yield (','.join(f'"{c}"' for c in columnas) + '\n').encode('utf-8')
+    opciones = pacsv.WriteOptions(include_header=False)
+    for lote in lotes:
+        bufer = io.BytesIO()
+        pacsv.write_csv(_csv_batch(lote), bufer, write_options=opciones)
+        yield bufer.getvalue()
+
+
+def iter_gzip(bloques, level=6):
+    # Comprime los bloques en formato gzip sin juntar el archivo completo.
+    compresor = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31 = encabezado gzip.
+    for bloque in bloques:
+        comprimido = compresor.compress(bloque)
+        if comprimido:
+            yield comprimido
+    yield compresor.flush()
+
+
+class _ChunkSink(io.RawIOBase):
+    # Destino de escritura que acumula los bytes hasta que se retiran con `drain`.
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        datos, self._chunks = b''.join(self._chunks), []
+        return datos
+
+
+def iter_parquet(lotes, root, columnas):
+    # Bloques de bytes del Parquet: un grupo de filas por lote y al final el pie del archivo.
+    esquema = ds.dataset(root, format='parquet', partitioning='hive').schema
+    esquema = pa.schema([esquema.field(c) for c in columnas])
+    destino = _ChunkSink()
+    with pq.ParquetWriter(pa.PythonFile(destino, mode='w'), esquema, compression='snappy') as escritor:
+        for lote in lotes:
+            escritor.write_batch(lote)
+            datos = destino.drain()
+            if datos:
+                yield datos
+    yield destino.drain()
+
+
+def iter_export(root, fmt, filtros, columnas):
+    # Bloques de bytes de la exportación en el formato pedido.
+    lotes = iter_batches(root, filtros, columnas)
+    if fmt == 'parquet':
+        return iter_parquet(lotes, root, columnas)
+    bloques = iter_csv(lotes, columnas)
+    return iter_gzip(bloques) if fmt == 'csv.gz' else bloques
+
+
+def tee_to_file(bloques, path):
+    # Entrega los bloques y a la vez los guarda en `path`. El archivo solo aparece
+    # completo (se escribe en un temporal y se reemplaza); si la exportación se
+    # interrumpe, el temporal se borra.
+    carpeta = os.path.dirname(path)
+    os.makedirs(carpeta, exist_ok=True)
+    descriptor, temporal = tempfile.mkstemp(dir=carpeta, suffix='.tmp')
+    try:
+        with os.fdopen(descriptor, 'wb') as f:
+            for bloque in bloques:
+                f.write(bloque)
+                yield bloque
+        os.replace(temporal, path)
+    finally:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+
+
+def write_file(bloques, path):
+    # Genera la exportación completa en `path` sin enviarla.
+    for _ in tee_to_file(bloques, path):
+        pass
+
+
+def prune_exports(directory, max_age):
+    # Borra las exportaciones guardadas hace más de `max_age` segundos.
+    if not os.path.isdir(directory):
+        return
+    limite = time.time() - max_age
+    for nombre in os.listdir(directory):
+        ruta = os.path.join(directory, nombre)
+        try:
+            if os.stat(ruta).st_mtime < limite:
+                os.remove(ruta)
+        except OSError:
+            pass
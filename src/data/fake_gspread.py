@@ -0,0 +1,172 @@
+# -----------------------------------------------------------------------------
+# Descripción del Código:
+# Este módulo imita, en memoria, la parte del cliente de `gspread` que usa el
+# dashboard: `open_by_key`, `worksheet`, `get_lastUpdateTime`, `batch_get`,
+# `get_all_values` y `get_all_records`. Sirve para ejecutar la aplicación de
+# ejemplo y las mediciones sin credenciales ni acceso a Google.
+#
+# Cada hoja guarda sus valores como lista de filas (la primera es el encabezado)
+# y una fecha de última modificación que cambia con `update_values`, igual que la
+# fecha de modificación de Drive. El cliente cuenta las llamadas y puede simular
+# la latencia de la API.
+#
+# Información Recibida:
+# - Diccionario {(id de la hoja de cálculo, nombre de la hoja): filas}.
+# - `latency`: segundos de espera por cada llamada (opcional).
+# - `default`: filas para las hojas que no estén registradas (opcional); si se
+#   indica, cualquier hoja pedida se crea con esos valores.
+#
+# Información Enviada:
+# - Objetos con la misma interfaz que `gspread.Client`, `Spreadsheet` y `Worksheet`.
+# -----------------------------------------------------------------------------
+
+import re  # Lectura de rangos en notación A1.
+import threading  # Bloqueo para modificar la hoja desde otro hilo.
+import time  # Latencia simulada y fechas de modificación.
+from collections import Counter  # Conteo de llamadas por método.
+from datetime import datetime, timezone  # Fecha de última modificación en formato RFC 3339.
+
+import numpy as np  # Valores de ejemplo.
+
+RANGO_A1 = re.compile(r'^([A-Z]+)(\d*)(?::([A-Z]+)(\d*))?$')  # A1, A:Z, A2:D10...
+
+
+def _column_index(letras):
+    # Índice (base 0) de una columna en notación A1: 'A' -> 0, 'AA' -> 26.
+    indice = 0
+    for letra in letras:
+        indice = indice * 26 + (ord(letra) - 64)
+    return indice - 1
+
+
+def _slice_range(filas, rango):
+    # Recorta las filas según un rango A1 (sin nombre de hoja) como lo hace la API.
+    rango = rango.split('!')[-1].upper()
+    coincidencia = RANGO_A1.match(rango)
+    if not coincidencia:
+        raise ValueError(f"Rango no soportado: {rango}")
+    col_ini, fila_ini, col_fin, fila_fin = coincidencia.groups()
+    col_fin = col_fin or col_ini
+    c0, c1 = _column_index(col_ini), _column_index(col_fin) + 1
+    f0 = int(fila_ini) - 1 if fila_ini else 0
+    f1 = int(fila_fin) if fila_fin else len(filas)
+    recorte = [fila[c0:c1] for fila in filas[f0:f1]]
+    # La API no devuelve las celdas vacías del final de cada fila.
+    return [fila[:len(fila) - next((i for i, v in enumerate(reversed(fila)) if v != ''), len(fila))] for fila in recorte]
+
+
+def sample_values(filas=500, seed=0):
+    # Filas de ejemplo con las columnas de la hoja 'dataset_limpio' de example_app_sheet.py.
+    rng = np.random.default_rng(seed)
+    fechas = np.datetime64('2020-01-01') + np.arange(filas)
+    gas = np.round(2.5 + np.cumsum(rng.normal(0, 0.05, filas)), 3)
+    crudo = np.round(60 + np.cumsum(rng.normal(0, 0.8, filas)), 2)
+    oro = np.round(1500 + np.cumsum(rng.normal(0, 6, filas)), 2)
+    valores = [['Date', 'Natural_Gas_Price', 'Crude_oil_Price', 'Gold_Price']]
+    valores += [[str(f), float(g), float(c), float(o)] for f, g, c, o in zip(fechas, gas, crudo, oro)]
+    return valores
+
+
+def kpi_values():
+    # Indicadores mensuales de ejemplo con las columnas que lee `SheetsProvider`.
+    return [
+        ['Mes', 'Casos', 'Resueltos', 'Pendientes'],
+        ['Ene', 120, 100, 20],
+        ['Feb', 150, 130, 20],
+        ['Mar', 140, 120, 20],
+        ['Abr', 170, 150, 20],
+        ['May', 190, 170, 20],
+    ]
+
+
+class FakeWorksheet:
+    # Hoja en memoria con la interfaz de `gspread.Worksheet` que usa el dashboard.
+
+    def __init__(self, spreadsheet, title, values):
+        self.spreadsheet = spreadsheet
+        self.title = title
+        self._values = [list(fila) for fila in values]
+
+    def batch_get(self, ranges, **kwargs):
+        # Lista de rangos leídos en una sola llamada.
+        self.spreadsheet.client._call('batch_get')
+        with self.spreadsheet.client._lock:
+            return [_slice_range(self._values, rango) for rango in ranges]
+
+    def get_all_values(self, **kwargs):
+        self.spreadsheet.client._call('get_all_values')
+        with self.spreadsheet.client._lock:
+            return [list(fila) for fila in self._values]
+
+    def get_all_records(self, **kwargs):
+        self.spreadsheet.client._call('get_all_records')
+        with self.spreadsheet.client._lock:
+            encabezado, filas = self._values[0], self._values[1:]
+            return [dict(zip(encabezado, fila)) for fila in filas]
+
+    def update_values(self, values):
+        # Reemplaza el contenido de la hoja y marca la hoja de cálculo como modificada.
+        with self.spreadsheet.client._lock:
+            self._values = [list(fila) for fila in values]
+            self.spreadsheet._touch()
+
+
+class FakeSpreadsheet:
+    # Hoja de cálculo en memoria con la interfaz de `gspread.Spreadsheet`.
+
+    def __init__(self, client, key):
+        self.client = client
+        self.id = key
+        self._worksheets = {}
+        self._modified = time.time()
+
+    def _touch(self):
+        # Nueva fecha de modificación (siempre posterior a la anterior).
+        self._modified = max(time.time(), self._modified + 0.001)
+
+    def worksheet(self, title):
+        self.client._call('worksheet')
+        if title not in self._worksheets and self.client.default is not None:
+            self._worksheets[title] = FakeWorksheet(self, title, self.client.default)
+        if title not in self._worksheets:
+            raise KeyError(f"Hoja no encontrada: {title}")
+        return self._worksheets[title]
+
+    def get_lastUpdateTime(self):
+        # Fecha de última modificación, como la que entrega Drive (modifiedTime).
+        self.client._call('get_lastUpdateTime')
+        return datetime.fromtimestamp(self._modified, timezone.utc).isoformat(timespec='milliseconds')
+
+
+class FakeClient:
+    # Cliente en memoria con la interfaz de `gspread.Client`.
+
+    def __init__(self, sheets=None, latency=0.0, default=None):
+        self.latency = latency
+        self.default = default
+        self.calls = Counter()  # Llamadas a la "API" por método.
+        self._lock = threading.Lock()
+        self._spreadsheets = {}
+        for (key, title), values in (sheets or {}).items():
+            self.add_worksheet(key, title, values)
+
+    def _call(self, metodo):
+        # Registra la llamada y simula la latencia de la red.
+        self.calls[metodo] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def add_worksheet(self, key, title, values):
+        # Crea (o reemplaza) una hoja con sus valores.
+        spreadsheet = self._spreadsheets.setdefault(key, FakeSpreadsheet(self, key))
+        spreadsheet._worksheets[title] = FakeWorksheet(spreadsheet, title, values)
+        spreadsheet._touch()
+        return spreadsheet._worksheets[title]
+
+    def open_by_key(self, key):
+        self._call('open_by_key')
+        if key not in self._spreadsheets and self.default is not None:
+            self._spreadsheets[key] = FakeSpreadsheet(self, key)
+        if key not in self._spreadsheets:
+            raise KeyError(f"Hoja de cálculo no encontrada: {key}")
+        return self._spreadsheets[key]
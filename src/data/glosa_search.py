@@ -0,0 +1,135 @@
+# -----------------------------------------------------------------------------
+# Descripción del Código:
+# Este módulo busca varias frases a la vez en las descripciones de las glosas
+# (`obs_glos`, que sale de la separación de glosas de src/data/glosas.py). Antes
+# cada frase era una pasada de `str.contains` sobre todas las filas.
+#
+# Los textos distintos son muchos menos que las filas, así que la búsqueda se hace
+# sobre los textos distintos y el resultado se lleva a las filas con sus códigos
+# (como las categorías de una columna categórica):
+#
+# 1. `GlosaIndex` arma un índice invertido: cada palabra (token) de los textos
+#    distintos apunta a los textos que la contienen.
+# 2. Para cada frase, sus palabras reducen los textos candidatos: las palabras del
+#    medio deben estar completas en el texto y las de los extremos pueden ser parte
+#    de una palabra (se buscan en el vocabulario).
+# 3. Solo en los candidatos se confirma la frase completa (`frase in texto`), con
+#    el mismo resultado que `str.contains(frase, case=False, regex=False)`.
+#
+# Las frases se combinan con 'any' (alguna frase) o 'all' (todas las frases).
+#
+# Información Recibida:
+# - Una columna de textos (categórica o de texto) y una lista de frases.
+#
+# Información Enviada:
+# - Máscaras por texto distinto y por fila con los textos que cumplen la búsqueda.
+# -----------------------------------------------------------------------------
+
+import re  # Separación de los textos en palabras.
+import threading  # Caché de candidatos por palabra entre hilos.
+
+import numpy as np  # Listas de textos por palabra y máscaras.
+import pandas as pd  # Códigos de los textos distintos.
+from cachetools import LRUCache  # Palabras parciales recientes, con tamaño máximo.
+
+TOKEN = re.compile(r'\w+')  # Palabra: letras, dígitos o guion bajo.
+PARTIAL_CACHE_SIZE = 1024  # Palabras parciales cuyos candidatos se conservan por índice.
+SEARCH_MODES = ('any', 'all')  # Alguna frase o todas las frases.
+
+
+def split_phrases(texto):
+    # Frases de una búsqueda separadas por punto y coma (el separador de glosas, no aparece en obs_glos).
+    return [f.strip() for f in str(texto or '').split(';') if f.strip()]
+
+
+class GlosaIndex:
+    # Índice invertido de palabras sobre los textos distintos.
+
+    def __init__(self, textos):
+        # Textos en mayúsculas, como compara `str.contains(case=False)`.
+        # Se guardan como lista de `str`: `in` es más rápido que `np.strings.find` sobre
+        # StringDType y no reserva el ancho del texto más largo como un arreglo '<U'.
+        self.texts = [str(t).upper() for t in textos]
+        listas = {}
+        for i, texto in enumerate(self.texts):
+            for palabra in set(TOKEN.findall(texto)):
+                listas.setdefault(palabra, []).append(i)
+        self._postings = {p: np.array(ids, dtype=np.int32) for p, ids in listas.items()}
+        self._vocabulary = list(self._postings)
+        self._partial = LRUCache(maxsize=PARTIAL_CACHE_SIZE)  # Palabra parcial -> textos candidatos (se repiten entre búsquedas).
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.texts)
+
+    def _containing(self, palabra):
+        # Textos con alguna palabra que contiene `palabra` (para las palabras de los extremos de la frase).
+        # Se guardan las PARTIAL_CACHE_SIZE palabras usadas más recientemente: cada búsqueda
+        # escrita a mano trae palabras nuevas y la caché no debe crecer sin límite.
+        with self._lock:
+            candidatos = self._partial.get(palabra)
+            if candidatos is None:
+                ids = [self._postings[p] for p in self._vocabulary if palabra in p]
+                candidatos = np.unique(np.concatenate(ids)) if ids else np.array([], dtype=np.int32)
+                self._partial[palabra] = candidatos
+            return candidatos
+
+    def candidates(self, frase):
+        # Textos que pueden contener la frase (None si la frase no tiene palabras: hay que revisar todos).
+        palabras = TOKEN.findall(frase)
+        candidatos = None
+        for j, palabra in enumerate(palabras):
+            interior = 0 < j < len(palabras) - 1
+            ids = self._postings.get(palabra, np.array([], dtype=np.int32)) if interior else self._containing(palabra)
+            candidatos = ids if candidatos is None else np.intersect1d(candidatos, ids, assume_unique=True)
+            if not len(candidatos):
+                break
+        return candidatos
+
+    def match(self, frase, within=None):
+        # Máscara de los textos distintos que contienen la frase (sin distinguir mayúsculas).
+        # Con `within` (máscara) solo se revisan esos textos; los demás quedan en False.
+        frase = frase.upper()
+        mascara = np.zeros(len(self.texts), dtype=bool)
+        candidatos = self.candidates(frase)
+        if candidatos is None:
+            candidatos = np.arange(len(self.texts))
+        if within is not None:
+            candidatos = candidatos[within[candidatos]]
+        textos = self.texts
+        mascara[candidatos] = np.fromiter((frase in textos[i] for i in candidatos.tolist()), dtype=bool, count=len(candidatos))
+        return mascara
+
+    def search(self, frases, mode='any'):
+        # Máscara de los textos distintos que contienen alguna ('any') o todas ('all') las frases.
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Modo de búsqueda desconocido: {mode}")
+        # Cada frase solo revisa los textos que todavía pueden cambiar el resultado:
+        # con 'any' los que no cumplen ninguna frase y con 'all' los que cumplen todas.
+        mascara = None
+        for frase in frases:
+            if mascara is None:
+                mascara = self.match(frase)
+            elif mode == 'any':
+                mascara |= self.match(frase, ~mascara)
+            else:
+                mascara = self.match(frase, mascara)
+            if mascara.all() if mode == 'any' else not mascara.any():
+                break  # El resultado ya no puede cambiar.
+        return np.ones(len(self.texts), dtype=bool) if mascara is None else mascara
+
+
+class GlosaSearch:
+    # Búsqueda sobre una columna: el índice se arma sobre los textos distintos y
+    # el resultado se reparte a las filas con los códigos de cada texto.
+
+    def __init__(self, s):
+        if isinstance(s.dtype, pd.CategoricalDtype):
+            self.codes, textos = s.cat.codes.to_numpy(), s.cat.categories
+        else:
+            self.codes, textos = pd.factorize(s)
+        self.index = GlosaIndex(textos)
+
+    def mask(self, frases, mode='any'):
+        # Máscara de las filas cuyo texto cumple la búsqueda; las filas sin texto no la cumplen.
+        return np.append(self.index.search(frases, mode), False)[self.codes]
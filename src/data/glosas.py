@@ -0,0 +1,103 @@
+# -----------------------------------------------------------------------------
+# Descripción del Código:
+# Este módulo separa las glosas del campo `observs` del consolidado de novedades.
+# Reemplaza los pasos 4.7 a 4.7.2 del notebook `1.conasolidado_ano.ipynb`
+# (count_glosas con `.apply`, split + explode y `separar_gn_glosa` dentro de un
+# ciclo `iterrows`) por operaciones vectorizadas de pandas/NumPy.
+#
+# Pasos que realiza `parse_glosas`:
+# 1. Cuenta los códigos GN#### de cada registro (`No_Glosas`) con `str.count`.
+# 2. Divide `observs` por punto y coma y crea una fila por cada glosa.
+# 3. Descarta las partes vacías (NaN o solo espacios).
+# 4. Separa el código GN (`observaciones_split`) de su descripción (`obs_glos`)
+#    con `str.extract`.
+# Con `keep_empty=True` (lo que usa la consolidación) los registros sin glosa no se
+# descartan: quedan con una fila con `observaciones_split` y `obs_glos` nulos y
+# No_Glosas 0, para que los indicadores cuenten también los registros sin glosa.
+# Las operaciones de texto se evalúan una sola vez por observación distinta y el
+# resultado se reparte a todas las filas que la comparten.
+#
+# `record_starts` marca la primera fila de cada registro: los indicadores cuentan
+# registros (no glosas) con esas filas.
+#
+# Información Recibida:
+# - Un DataFrame con la columna `observs` (por ejemplo, el consolidado de ingest).
+#
+# Información Enviada:
+# - Un DataFrame nuevo con una fila por glosa, las columnas originales y las
+#   columnas `No_Glosas`, `observaciones_split` (categórica) y `obs_glos`.
+# -----------------------------------------------------------------------------
+
+import numpy as np  # Operaciones vectorizadas sobre posiciones de filas.
+import pandas as pd  # Manejo de DataFrames y operaciones de texto vectorizadas.
+
+GN_PATTERN = r'GN\d{4}'  # Código de glosa: GN seguido de exactamente 4 dígitos.
+_GN_SPLIT = r'^(GN\d{4})(.*)'  # Código GN al inicio y el resto es la descripción.
+RECORD_KEY = ['tip_doc', 'doc', 'nov', 'fech_nov', 'fecha_rep']  # Columnas que identifican un registro reportado.
+
+
+def count_glosas(observs):
+    # Cuenta los códigos GN#### de una Serie de observaciones; los valores no texto cuentan 0.
+    return observs.str.count(GN_PATTERN).fillna(0).astype('int64')
+
+
+def split_gn(items):
+    # Separa cada texto en (código GN, descripción). Si no empieza por GN#### se
+    # conserva el texto original como código y la descripción queda vacía.
+    # Devuelve los códigos GN como Categorical y las descripciones como arreglo.
+    items = pd.Series(items, dtype=object)
+    partes = items.str.strip().str.extract(_GN_SPLIT)
+    gn = partes[0].where(partes[0].notna(), items)
+    glosa = partes[1].str.strip().fillna('')
+    return pd.Categorical(gn), glosa.to_numpy()
+
+
+def parse_glosas(df, column='observs', keep_empty=False):
+    # Genera una fila por glosa con su código GN y su descripción (ver encabezado).
+    # Con `keep_empty` los registros sin partes válidas conservan una fila sin glosa.
+    # Todas las operaciones de texto se hacen sobre los valores distintos de `observs`
+    # (muchos registros comparten la misma observación) y luego se reparten por posición.
+    codigos, observs = pd.factorize(df[column])  # NaN recibe el código -1.
+    observs = pd.Series(observs, dtype=object)
+    no_glosas = count_glosas(observs).to_numpy()
+
+    # División por ';' de cada observación distinta, descartando las partes vacías.
+    partes = observs.str.split(';').explode()
+    validas = partes.notna() & partes.str.strip().ne('')
+    partes = partes[validas]
+    n_partes = np.bincount(partes.index.to_numpy(), minlength=len(observs))  # Partes válidas por observación.
+    inicio_partes = np.cumsum(n_partes) - n_partes  # Posición de la primera parte de cada observación.
+    gn, glosa = split_gn(partes.to_numpy())
+
+    # Se repite cada registro tantas veces como partes válidas tenga su observación.
+    # El código -1 (sin observación) toma la última posición agregada: 0 partes y 0 glosas.
+    filas = np.arange(len(df)) if keep_empty else np.flatnonzero(codigos >= 0)
+    codigos = codigos[filas]
+    repeticiones = np.append(n_partes, 0)[codigos]
+    sin_glosa = repeticiones == 0
+    if keep_empty:
+        repeticiones = np.maximum(repeticiones, 1)  # Una fila sin glosa para los registros sin partes.
+    posiciones = np.repeat(filas, repeticiones)
+    desplazamiento = np.arange(repeticiones.sum()) - np.repeat(np.cumsum(repeticiones) - repeticiones, repeticiones)
+    parte = np.repeat(np.append(inicio_partes, 0)[codigos], repeticiones) + desplazamiento  # Parte que le toca a cada fila nueva.
+    parte[np.repeat(sin_glosa, repeticiones)] = len(glosa)  # Filas sin glosa: posición nula agregada.
+
+    resultado = df.iloc[posiciones].reset_index(drop=True)
+    resultado['No_Glosas'] = np.append(no_glosas, 0)[np.repeat(codigos, repeticiones)]
+    resultado['observaciones_split'] = pd.Categorical.from_codes(np.append(gn.codes, -1)[parte], dtype=gn.dtype)
+    resultado['obs_glos'] = np.append(glosa, None)[parte]
+    return resultado
+
+
+def record_starts(df):
+    # Máscara de la primera fila de cada registro. `parse_glosas` deja seguidas las filas
+    # de un registro, así que un registro empieza donde cambia alguna columna de RECORD_KEY.
+    # Los nulos se comparan como iguales (código -1 de factorize).
+    if not len(df):
+        return np.zeros(0, dtype=bool)
+    inicio = np.zeros(len(df), dtype=bool)
+    inicio[0] = True
+    for columna in RECORD_KEY:
+        codigos = pd.factorize(df[columna])[0]
+        inicio[1:] |= codigos[1:] != codigos[:-1]
+    return inicio
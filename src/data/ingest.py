@@ -0,0 +1,189 @@
+# -----------------------------------------------------------------------------
+# Descripción del Código:
+# Este módulo lee los archivos de novedades `.NEG` y `.VAL` (NSEPS025DDMMYYYY)
+# de una carpeta y los entrega como un flujo de bloques (chunks) de DataFrames
+# ya alineados a las columnas del consolidado. Reemplaza la función
+# `cargar_archivos_a_dataframe` del notebook `1.conasolidado_ano.ipynb`, que
+# cargaba todos los archivos en un diccionario y luego los unía en memoria.
+#
+# La lectura se reparte entre varios procesos (uno por núcleo) y solo se leen
+# las columnas necesarias (`usecols`) con tipos fijos, por lo que no se hace
+# inferencia de tipos. Como máximo se mantienen en memoria unos pocos archivos
+# a la vez, de modo que el consumo de memoria no crece con el tamaño del año.
+#
+# Información Recibida:
+# - `folder_path`: Carpeta con los archivos de novedades del año.
+# - `extensiones`, `sep`, `encoding`: Parámetros de lectura (los mismos del notebook).
+# - `workers`: Número de procesos de lectura (por defecto, uno por núcleo).
+# - `coerce`: Si es True, cada proceso aplica también el esquema de tipos de
+#   `src.data.schema` (fechas, categorías e identificadores).
+#
+# Información Enviada:
+# - Tuplas `(ruta_archivo, DataFrame)` con las columnas de `NEG_COLUMNS`, en el
+#   mismo orden en que se listan los archivos.
+# -----------------------------------------------------------------------------
+
+import os  # Manejo de rutas y listado de carpetas.
+import re  # Expresiones regulares para extraer la fecha del nombre del archivo.
+from collections import deque  # Cola para limitar los archivos en proceso.
+from concurrent.futures import ProcessPoolExecutor  # Pool de procesos para leer en paralelo.
+
+import pandas as pd  # Lectura de los archivos planos en DataFrames.
+
+from src.data.schema import coerce_neg, concat_chunks  # Conversión de tipos del consolidado.
+
+# Posición (base 0) de cada columna del consolidado dentro de los archivos .NEG/.VAL.
+# Corresponde a las columnas col_2, col_3, col_4, col_9, col_10, col_11, col_12,
+# col_13 y col_21 que el notebook seleccionaba después de unir todo el año.
+NEG_POSITIONS = {
+    'cod_reg': 1,
+    'tip_doc': 2,
+    'doc': 3,
+    'fech_nac': 8,
+    'dep': 9,
+    'mun': 10,
+    'nov': 11,
+    'fech_nov': 12,
+    'observs': 20,
+}
+
+# Orden final de las columnas del consolidado (fecha_rep sale del nombre del archivo).
+NEG_COLUMNS = ['cod_reg', 'tip_doc', 'doc', 'fech_nac', 'dep', 'mun', 'nov', 'fech_nov', 'fecha_rep', 'observs']
+
+# Prefijo de los archivos de la EPS, se elimina para obtener la fecha del reporte.
+PREFIJO_ARCHIVO = 'NSEPS025'
+
+_FECHA_ARCHIVO = re.compile(r'^(\d{2})(\d{2})(\d{4})$')  # DDMMYYYY en el nombre del archivo.
+
+
+def list_source_files(folder_path, extensiones=('.NEG', '.VAL')):
+    # Lista los archivos de la carpeta con las extensiones dadas, ordenados por nombre.
+    if not os.path.exists(folder_path):
+        print(f"La ruta {folder_path} no es válida.")
+        return []
+    archivos = []
+    for ext in extensiones:  # Se respeta el orden de las extensiones, como en el notebook.
+        archivos.extend(sorted(
+            os.path.join(folder_path, filename)
+            for filename in os.listdir(folder_path)
+            if filename.endswith(ext)
+        ))
+    return archivos
+
+
+def report_date(file_path):
+    # Obtiene la fecha de reporte (DD/MM/YYYY) a partir del nombre NSEPS025DDMMYYYY.ext.
+    nombre_base = os.path.splitext(os.path.basename(file_path))[0].replace(PREFIJO_ARCHIVO, '')
+    match = _FECHA_ARCHIVO.match(nombre_base)
+    if match:
+        return f"{match.group(1)}/{match.group(2)}/{match.group(3)}"
+    return nombre_base  # Si el nombre no trae fecha se deja el nombre base, como hacía el notebook.
+
+
+def _align(df, fecha_rep, coerce=False):
+    # Renombra las posiciones leídas, completa las columnas faltantes y agrega fecha_rep.
+    df = df.rename(columns={pos: name for name, pos in NEG_POSITIONS.items()})
+    df['fecha_rep'] = fecha_rep
+    df = df.reindex(columns=NEG_COLUMNS)  # Columnas ausentes en archivos cortos quedan en NaN.
+    return coerce_neg(df) if coerce else df
+
+
+def read_neg_file(file_path, sep=",", encoding="latin-1", chunksize=None, coerce=False):
+    # Lee un archivo .NEG/.VAL con solo las columnas necesarias y todo como texto.
+    # Con `chunksize` devuelve un iterador de bloques en lugar de un único DataFrame.
+    # Tipos fijos (texto): la conversión de tipos se hace después con el esquema.
+    opciones = dict(sep=sep, encoding=encoding, header=None, dtype=str, chunksize=chunksize)
+    try:
+        lector = pd.read_csv(file_path, usecols=sorted(NEG_POSITIONS.values()), **opciones)
+    except ValueError:
+        # Archivos con menos columnas: se leen completos y se conservan las posiciones existentes.
+        lector = pd.read_csv(file_path, **opciones)
+        if chunksize is None:
+            lector = lector[[pos for pos in lector.columns if pos in NEG_POSITIONS.values()]]
+        else:
+            lector = (chunk[[pos for pos in chunk.columns if pos in NEG_POSITIONS.values()]] for chunk in lector)
+    fecha_rep = report_date(file_path)
+    if chunksize is None:
+        return _align(lector, fecha_rep, coerce)
+    return (_align(chunk, fecha_rep, coerce) for chunk in lector)
+
+
+def _read_file_task(file_path, sep, encoding, coerce):
+    # Tarea que ejecuta cada proceso del pool: lee (y convierte) un archivo completo.
+    # Los errores se devuelven en lugar de lanzarse para no detener el resto de la carga.
+    try:
+        return read_neg_file(file_path, sep=sep, encoding=encoding, coerce=coerce), None
+    except Exception as e:
+        return None, e
+
+
+def iter_neg_chunks(folder_path, extensiones=('.NEG', '.VAL'), **kwargs):
+    # Genera tuplas (ruta_archivo, DataFrame) para todos los archivos de la carpeta.
+    return iter_neg_files(list_source_files(folder_path, extensiones), **kwargs)
+
+
+def iter_neg_files(archivos, sep=",", encoding="latin-1", workers=None, chunksize=None,
+                   max_pending=None, coerce=False):
+    # Genera tuplas (ruta_archivo, DataFrame) para la lista de archivos dada.
+    # - Con workers=1 se lee en el proceso actual; si se indica `chunksize`, cada
+    #   archivo se entrega en bloques de ese número de filas.
+    # - Con varios workers cada proceso lee un archivo y como máximo hay
+    #   `max_pending` archivos en vuelo (por defecto el doble de procesos).
+    archivos = list(archivos)
+    if not archivos:
+        return
+    workers = workers or os.cpu_count() or 1
+    workers = min(workers, len(archivos))
+
+    if workers == 1:
+        for file_path in archivos:
+            try:
+                if chunksize is None:
+                    yield file_path, read_neg_file(file_path, sep=sep, encoding=encoding, coerce=coerce)
+                else:
+                    for chunk in read_neg_file(file_path, sep=sep, encoding=encoding, chunksize=chunksize,
+                                               coerce=coerce):
+                        yield file_path, chunk
+            except Exception as e:
+                print(f"No se pudo leer el archivo {os.path.basename(file_path)}: {e}")
+        return
+
+    max_pending = max_pending or workers * 2
+    pendientes = deque()  # Futuros en el mismo orden de los archivos.
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        restantes = iter(archivos)
+        for file_path in restantes:  # Se llena la cola inicial.
+            pendientes.append((file_path, executor.submit(_read_file_task, file_path, sep, encoding, coerce)))
+            if len(pendientes) >= max_pending:
+                break
+        while pendientes:
+            file_path, futuro = pendientes.popleft()
+            df, error = futuro.result()
+            siguiente = next(restantes, None)  # Se repone la cola antes de entregar el bloque.
+            if siguiente is not None:
+                pendientes.append((siguiente, executor.submit(_read_file_task, siguiente, sep, encoding, coerce)))
+            if error is not None:
+                print(f"No se pudo leer el archivo {os.path.basename(file_path)}: {error}")
+                continue
+            if chunksize is None:
+                yield file_path, df
+            else:
+                for inicio in range(0, len(df), chunksize):
+                    yield file_path, df.iloc[inicio:inicio + chunksize]
+
+
+def load_neg_folder(folder_path, **kwargs):
+    # Atajo que consume el flujo completo y devuelve el consolidado en un solo DataFrame.
+    # Imprime las filas leídas por archivo, como el reporte de tamaños del notebook.
+    bloques = []
+    filas_por_archivo = {}
+    for file_path, chunk in iter_neg_chunks(folder_path, **kwargs):
+        nombre = os.path.basename(file_path)
+        filas_por_archivo[nombre] = filas_por_archivo.get(nombre, 0) + len(chunk)
+        bloques.append(chunk)
+    for nombre, filas in filas_por_archivo.items():
+        print(f"{nombre}: {filas}")
+    print(f"\nTotal de registros en todos los archivos: {sum(filas_por_archivo.values())}")
+    if not bloques:
+        return pd.DataFrame(columns=NEG_COLUMNS)
+    return concat_chunks(bloques)  # Conserva las columnas categóricas entre archivos.
@@ -0,0 +1,106 @@
+# -----------------------------------------------------------------------------
+# Descripción del Código:
+# Este módulo maneja el manifiesto de un dataset del almacén: un archivo JSON
+# (`_manifest.json`, dentro de la carpeta del dataset) que registra, por cada
+# fuente procesada, su ruta, tamaño, fecha de modificación, hash del contenido
+# y los archivos de salida (particiones) que generó.
+#
+# Con el manifiesto, `src.data.pipeline` decide qué fuentes son nuevas, cuáles
+# cambiaron y cuáles desaparecieron, y solo vuelve a procesar esas.
+#
+# Información Recibida:
+# - `root`: Carpeta del dataset donde se guarda el manifiesto.
+# - Rutas de los archivos fuente.
+#
+# Información Enviada:
+# - El manifiesto como diccionario y el plan de cambios (nuevos, cambiados,
+#   sin cambios y eliminados).
+# -----------------------------------------------------------------------------
+
+import hashlib  # Hash del contenido de los archivos.
+import json  # Lectura y escritura del manifiesto.
+import os  # Manejo de rutas y metadatos de archivos.
+
+MANIFEST_NAME = '_manifest.json'  # Arrow ignora los archivos que empiezan por '_' al leer el dataset.
+MANIFEST_VERSION = 1
+
+
+def file_hash(file_path, block_size=1 << 20):
+    # Hash SHA-256 del contenido, leído por bloques de 1 MB.
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for bloque in iter(lambda: f.read(block_size), b''):
+            digest.update(bloque)
+    return digest.hexdigest()
+
+
+def source_key(file_path):
+    # Clave de una fuente en el manifiesto: el nombre del archivo. Los nombres
+    # NSEPS025DDMMYYYY.ext son únicos, así que mover la carpeta no obliga a reprocesar.
+    return os.path.basename(file_path)
+
+
+def load_manifest(root):
+    # Carga el manifiesto del dataset; si no existe devuelve uno vacío.
+    ruta = os.path.join(root, MANIFEST_NAME)
+    if not os.path.exists(ruta):
+        return {'version': MANIFEST_VERSION, 'files': {}}
+    with open(ruta, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_manifest(root, manifest):
+    # Guarda el manifiesto de forma atómica (archivo temporal + reemplazo).
+    os.makedirs(root, exist_ok=True)
+    ruta = os.path.join(root, MANIFEST_NAME)
+    temporal = ruta + '.tmp'
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1, ensure_ascii=False)
+    os.replace(temporal, ruta)
+
+
+def describe_file(file_path, content_hash=None):
+    # Entrada del manifiesto para un archivo fuente (sin las salidas).
+    info = os.stat(file_path)
+    return {
+        'path': os.path.abspath(file_path),
+        'size': info.st_size,
+        'mtime': info.st_mtime,
+        'sha256': content_hash or file_hash(file_path),
+    }
+
+
+def plan_changes(file_paths, manifest):
+    # Compara los archivos actuales con el manifiesto. Si el tamaño y la fecha de
+    # modificación no cambiaron se asume que el archivo es el mismo; si cambiaron,
+    # se compara el hash para no reprocesar archivos solo "tocados".
+    # Devuelve un diccionario con las listas 'nuevos', 'cambiados', 'sin_cambios'
+    # (rutas) y 'eliminados' (claves del manifiesto).
+    registrados = manifest.get('files', {})
+    plan = {'nuevos': [], 'cambiados': [], 'sin_cambios': [], 'eliminados': []}
+    vistos = set()
+    for file_path in file_paths:
+        clave = source_key(file_path)
+        vistos.add(clave)
+        previo = registrados.get(clave)
+        if previo is None:
+            plan['nuevos'].append(file_path)
+            continue
+        info = os.stat(file_path)
+        if info.st_size == previo['size'] and info.st_mtime == previo['mtime']:
+            plan['sin_cambios'].append(file_path)
+        elif file_hash(file_path) == previo['sha256']:
+            previo.update(describe_file(file_path, previo['sha256']))  # Solo cambió la fecha o la ruta.
+            plan['sin_cambios'].append(file_path)
+        else:
+            plan['cambiados'].append(file_path)
+    plan['eliminados'] = [clave for clave in registrados if clave not in vistos]
+    return plan
+
+
+def remove_outputs(root, entry):
+    # Borra los archivos de salida registrados para una fuente.
+    for relativo in entry.get('outputs', []):
+        ruta = os.path.join(root, relativo)
+        if os.path.exists(ruta):
+            os.remove(ruta)
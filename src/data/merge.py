@@ -0,0 +1,172 @@
+# -----------------------------------------------------------------------------
+# Descripción del Código:
+# Este módulo lee por bloques las fuentes de la unión multianual del notebook
+# `2.final_merged.ipynb` y las lleva al esquema del consolidado (13 columnas,
+# `CONSOLIDATED_SCHEMA`). Reemplaza la carga de todos los archivos en un
+# diccionario, el recorte a 13 columnas y el `pd.concat` final, que necesitaban
+# varias veces el tamaño del resultado en memoria.
+#
+# Fuentes admitidas:
+# - `.NEG` / `.VAL`: archivos de novedades; se leen con src/data/ingest.py y se
+#   separan las glosas con src/data/glosas.py.
+# - `.csv`: consolidados exportados (con encabezado), leídos con `chunksize`.
+# - `.xlsx`: consolidados exportados a Excel, leídos fila a fila con openpyxl en
+#   modo `read_only` (todas las hojas, por ejemplo datos_1, datos_2, ...).
+#
+# Si el bloque trae las 13 columnas por nombre se toman esas; si no, se toman las
+# 13 primeras por posición, como hacía el notebook.
+#
+# `MergeProfile` acumula, bloque a bloque, las filas, los tipos leídos, los nulos y
+# los valores que no se pudieron convertir de cada fuente: es el reporte de tipos y
+# de porcentaje de nulos del notebook sin tener los DataFrames completos en memoria.
+#
+# Información Recibida:
+# - Rutas de los archivos fuente y el número de filas por bloque (o la carpeta de
+#   un dataset del almacén para `profile_dataset`).
+#
+# Información Enviada:
+# - Bloques (DataFrames) con las columnas y tipos del consolidado, y el perfil
+#   de nulos y tipos por fuente.
+# -----------------------------------------------------------------------------
+
+import os  # Extensión y nombre de los archivos.
+
+import pandas as pd  # Bloques de datos y reportes.
+import pyarrow.dataset as ds  # Lectura por lotes de un dataset ya unido.
+
+from src.data.glosas import parse_glosas  # Separación de glosas de los archivos de novedades.
+from src.data.ingest import read_neg_file  # Lectura por bloques de los .NEG/.VAL.
+from src.data.schema import CONSOLIDATED_COLUMNS, CONSOLIDATED_SCHEMA, coerce_neg  # Esquema del consolidado.
+
+MERGE_EXTENSIONS = ('.NEG', '.csv', '.xlsx')  # Las extensiones que leía el notebook.
+# Ancho de los códigos DIVIPOLA: Excel y los CSV leídos con inferencia los guardaban como números (5 -> '05').
+CODE_WIDTHS = {'dep': 2, 'mun': 3}
+
+
+def select_columns(df):
+    # Las 13 columnas del consolidado, por nombre o (si no están todas) por posición.
+    if set(CONSOLIDATED_COLUMNS) <= set(df.columns):
+        return df[CONSOLIDATED_COLUMNS]
+    df = df.iloc[:, :len(CONSOLIDATED_COLUMNS)]
+    return df.set_axis(CONSOLIDATED_COLUMNS[:df.shape[1]], axis=1).reindex(columns=CONSOLIDATED_COLUMNS)
+
+
+def harmonize(df):
+    # Lleva un bloque (ya con las columnas de `select_columns`) a los tipos del consolidado.
+    df = df.copy()
+    for columna, tipo in CONSOLIDATED_SCHEMA.items():
+        # Los códigos y textos que Excel guardó como números pasan a texto antes de convertir.
+        if tipo in ('category', 'text') and not isinstance(df[columna].dtype, pd.CategoricalDtype):
+            df[columna] = df[columna].where(df[columna].isna(), df[columna].astype(str))
+    for columna, ancho in CODE_WIDTHS.items():
+        if df[columna].dtype == object:
+            df[columna] = df[columna].str.replace(r'\.0$', '', regex=True).str.zfill(ancho)
+    return coerce_neg(df, CONSOLIDATED_SCHEMA).reset_index(drop=True)
+
+
+def iter_xlsx_chunks(file_path, chunksize):
+    # Bloques de un .xlsx leído fila a fila (openpyxl en modo de solo lectura).
+    # La primera fila de cada hoja es el encabezado.
+    from openpyxl import load_workbook  # Solo se necesita para los .xlsx.
+    libro = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        for hoja in libro.worksheets:
+            filas = hoja.iter_rows(values_only=True)
+            encabezado = next(filas, None)
+            if encabezado is None:
+                continue
+            columnas = [str(c) if c is not None else f"col_{i + 1}" for i, c in enumerate(encabezado)]
+            bloque = []
+            for fila in filas:
+                bloque.append(fila)
+                if len(bloque) >= chunksize:
+                    yield pd.DataFrame.from_records(bloque, columns=columnas)
+                    bloque = []
+            if bloque:
+                yield pd.DataFrame.from_records(bloque, columns=columnas)
+    finally:
+        libro.close()
+
+
+def iter_source_chunks(file_path, chunksize):
+    # Bloques de un archivo fuente como pares (bloque leído, bloque con el esquema del consolidado).
+    ext = os.path.splitext(file_path)[1]
+    if ext in ('.NEG', '.VAL'):
+        bloques = (parse_glosas(chunk, keep_empty=True) for chunk in read_neg_file(file_path, chunksize=chunksize, coerce=True))
+    elif ext == '.csv':
+        bloques = pd.read_csv(file_path, encoding='utf-8', dtype=str, chunksize=chunksize)
+    elif ext == '.xlsx':
+        bloques = iter_xlsx_chunks(file_path, chunksize)
+    else:
+        raise ValueError(f"Extensión no admitida: {ext}")
+    for bloque in bloques:
+        if len(bloque):
+            crudo = select_columns(bloque)
+            yield crudo, harmonize(crudo)
+
+
+class MergeProfile:
+    # Perfil de cada fuente, acumulado bloque a bloque:
+    # - rows: filas escritas.
+    # - dtypes: tipo leído de cada columna (antes de aplicar el esquema).
+    # - nulls: nulos de cada columna en el resultado.
+    # - invalid: valores leídos que no se pudieron convertir (quedaron nulos).
+
+    def __init__(self):
+        self.sources = {}  # nombre -> perfil de la fuente.
+
+    def update(self, nombre, crudo, df):
+        # Suma un bloque (leído y convertido) al perfil de la fuente `nombre`.
+        perfil = self.sources.setdefault(nombre, {'rows': 0, 'dtypes': {}, 'nulls': {}, 'invalid': {}})
+        perfil['rows'] += len(df)
+        nulos = df.isna()
+        invalidos = nulos.to_numpy() & crudo.notna().to_numpy()
+        for i, columna in enumerate(df.columns):
+            perfil['dtypes'].setdefault(columna, str(crudo[columna].dtype))
+            perfil['nulls'][columna] = perfil['nulls'].get(columna, 0) + int(nulos[columna].sum())
+            perfil['invalid'][columna] = perfil['invalid'].get(columna, 0) + int(invalidos[:, i].sum())
+
+    def add(self, nombre, perfil):
+        # Agrega el perfil ya calculado de una fuente (por ejemplo, guardado en el manifiesto).
+        if perfil:
+            self.sources[nombre] = perfil
+
+    def source(self, nombre):
+        return self.sources.get(nombre)
+
+    @property
+    def rows(self):
+        # Filas por fuente.
+        return pd.Series({nombre: p['rows'] for nombre, p in self.sources.items()}, dtype='int64')
+
+    def null_report(self):
+        # Porcentaje de nulos por columna (filas) y fuente (columnas), con el total de todas las fuentes.
+        nulos = pd.DataFrame({nombre: p['nulls'] for nombre, p in self.sources.items()}).reindex(CONSOLIDATED_COLUMNS)
+        filas = self.rows
+        reporte = nulos.div(filas.where(filas > 0), axis=1) * 100
+        reporte['total'] = nulos.sum(axis=1) / max(filas.sum(), 1) * 100
+        return reporte.round(2)
+
+    def dtype_report(self):
+        # Tipo leído de cada columna (filas) en cada fuente (columnas).
+        return pd.DataFrame({nombre: p['dtypes'] for nombre, p in self.sources.items()}).reindex(CONSOLIDATED_COLUMNS)
+
+    def invalid_report(self):
+        # Valores que no se pudieron convertir por columna (filas) y fuente (columnas).
+        invalidos = pd.DataFrame({nombre: p['invalid'] for nombre, p in self.sources.items()})
+        return invalidos.reindex(CONSOLIDATED_COLUMNS).fillna(0).astype('int64')
+
+
+def profile_dataset(root, batch_size=1_000_000):
+    # Perfil por año (una "fuente" por año) de un dataset del almacén, leído por lotes.
+    perfil = MergeProfile()
+    if not os.path.exists(root):
+        return perfil
+    dataset = ds.dataset(root, format='parquet', partitioning='hive')
+    columnas = [c for c in CONSOLIDATED_COLUMNS if c in dataset.schema.names]
+    for lote in dataset.to_batches(columns=columnas + ['anio'], batch_size=batch_size):
+        df = lote.to_pandas()
+        for anio, parte in df.groupby('anio', sort=True, observed=True):
+            parte = parte[columnas]
+            perfil.update(f"anio={anio}", parte, parte)
+    return perfil
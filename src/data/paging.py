@@ -0,0 +1,252 @@
+# -----------------------------------------------------------------------------
+# Descripción del Código:
+# Este módulo responde las consultas de las tablas paginadas en el servidor
+# (`page_action='custom'`, `filter_action='custom'`, `sort_action='custom'` de
+# `dash_table.DataTable`). La tabla solo recibe las filas de la página pedida, así
+# que el tamaño de la respuesta depende del tamaño de página y no del dataset.
+#
+# `FrameSource` envuelve un DataFrame (en memoria o leído del almacén Parquet):
+# - Los filtros de la tabla (`filter_query`) se traducen a máscaras vectorizadas.
+#   En las columnas categóricas las comparaciones se hacen sobre las categorías
+#   (pocos valores) y se llevan a las filas con los códigos.
+# - El orden por una columna se calcula una sola vez (índice de posiciones) y se
+#   reutiliza en todas las páginas y filtros.
+# - La búsqueda de varias frases en una columna de texto (por ejemplo `obs_glos`)
+#   usa el índice de src/data/glosa_search.py, armado una vez por columna.
+#
+# Información Recibida:
+# - DataFrame a paginar.
+# - Página actual, tamaño de página (como mucho MAX_PAGE_SIZE filas), `filter_query`
+#   y `sort_by` de la tabla, y la búsqueda de frases (columna, frases y modo) si la
+#   tabla la tiene.
+#
+# Información Enviada:
+# - Las filas de la página como lista de diccionarios y el total de filas que
+#   cumplen el filtro.
+# -----------------------------------------------------------------------------
+
+import re  # Lectura de las expresiones de filtro de la tabla.
+import threading  # Bloqueo para los índices de orden.
+
+import numpy as np  # Máscaras y órdenes vectorizados.
+import pandas as pd  # Manejo de DataFrames.
+
+from src.data.glosa_search import GlosaSearch  # Búsqueda de varias frases en textos.
+from src.data.schema import DATE_FORMAT  # Formato de las fechas que se muestran.
+
+# Operadores de `filter_query` (sintaxis de DataTable) y su equivalente.
+OPERATORS = {
+    '>=': 'ge', '<=': 'le', '<': 'lt', '>': 'gt', '!=': 'ne', '=': 'eq',
+    'ge': 'ge', 'le': 'le', 'lt': 'lt', 'gt': 'gt', 'ne': 'ne', 'eq': 'eq',
+    'contains': 'contains', 'datestartswith': 'datestartswith',
+}
+
+# Filas por página: por defecto y máximo que se entrega (el tamaño lo envía el navegador).
+PAGE_SIZE = 10
+MAX_PAGE_SIZE = 100
+
+# {columna} operador valor; el valor puede ir entre comillas.
+FILTER_PART = re.compile(
+    r'^\s*\{(?P<col>[^}]+)\}\s*(?:s)?(?P<op>>=|<=|!=|<|>|=|ge|le|lt|gt|ne|eq|contains|datestartswith)\s*(?P<val>.*?)\s*$'
+)
+
+
+def parse_filter_query(filter_query):
+    # Convierte "{col} op valor && {col2} op valor2" en [(col, op, valor), ...].
+    filtros = []
+    for parte in (filter_query or '').split(' && '):
+        coincidencia = FILTER_PART.match(parte)
+        if not coincidencia:
+            continue
+        valor = coincidencia.group('val')
+        if len(valor) >= 2 and valor[0] == valor[-1] and valor[0] in '"\'`':
+            valor = valor[1:-1].replace('\\' + valor[0], valor[0])
+        filtros.append((coincidencia.group('col'), OPERATORS[coincidencia.group('op')], valor))
+    return filtros
+
+
+def page_bounds(page_current, page_size):
+    # Página y tamaño enviados por el navegador como enteros válidos: página >= 0 y
+    # tamaño entre 1 y MAX_PAGE_SIZE (un valor que no es número toma el de por defecto).
+    try:
+        page_current = int(page_current or 0)
+    except (TypeError, ValueError):
+        page_current = 0
+    try:
+        page_size = int(page_size or PAGE_SIZE)
+    except (TypeError, ValueError):
+        page_size = PAGE_SIZE
+    return max(0, page_current), max(1, min(page_size, MAX_PAGE_SIZE))
+
+
+def _compare(valores, op, valor):
+    # Máscara de una comparación sobre un arreglo o serie ya convertido.
+    if op == 'eq':
+        return valores == valor
+    if op == 'ne':
+        return valores != valor
+    if op == 'lt':
+        return valores < valor
+    if op == 'le':
+        return valores <= valor
+    if op == 'gt':
+        return valores > valor
+    return valores >= valor
+
+
+def _text_mask(textos, op, valor):
+    # Máscara sobre valores de texto; los nulos no cumplen ningún filtro.
+    presentes = textos.notna().to_numpy()
+    textos = textos.astype(str)
+    if op == 'contains':
+        return textos.str.contains(valor, case=False, regex=False).to_numpy() & presentes
+    if op == 'datestartswith':
+        return textos.str.startswith(valor).to_numpy() & presentes
+    return np.asarray(_compare(textos, op, valor)) & presentes
+
+
+def _date_mask(s, op, valor):
+    # Máscara sobre una columna de fechas. El valor puede ser parcial (2024, 2024-03, 2024-03-05):
+    # 'datestartswith' y '=' cubren todo el periodo indicado.
+    try:
+        periodo = pd.Period(valor)
+    except (ValueError, TypeError):
+        return np.zeros(len(s), dtype=bool)
+    inicio, fin = periodo.start_time, periodo.end_time
+    if op in ('datestartswith', 'contains', 'eq'):
+        return ((s >= inicio) & (s <= fin)).to_numpy()
+    if op == 'ne':
+        return ~((s >= inicio) & (s <= fin)).to_numpy() & s.notna().to_numpy()
+    limite = inicio if op in ('lt', 'ge') else fin
+    return _compare(s, op, limite).to_numpy()
+
+
+def column_mask(s, op, valor):
+    # Máscara de un filtro sobre una columna según su tipo.
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        # Se evalúa sobre las categorías y se lleva a las filas con los códigos (-1 = nulo).
+        categorias = pd.Series(s.cat.categories)
+        por_categoria = column_mask(categorias, op, valor)
+        codigos = s.cat.codes.to_numpy()
+        return np.append(por_categoria, False)[codigos]
+    if pd.api.types.is_datetime64_any_dtype(s):
+        return _date_mask(s, op, valor)
+    if pd.api.types.is_numeric_dtype(s) and op not in ('contains', 'datestartswith'):
+        try:
+            numero = float(valor)
+        except ValueError:
+            return np.zeros(len(s), dtype=bool)
+        return np.asarray(_compare(s, op, numero).fillna(False), dtype=bool)
+    return _text_mask(s, op, valor)
+
+
+def _sort_key(s):
+    # Clave numérica para ordenar una columna; los nulos van al final.
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        # Las categorías se ordenan alfabéticamente y cada fila toma la posición de su categoría.
+        rango = np.argsort(np.argsort(s.cat.categories.astype(str), kind='stable'))
+        codigos = s.cat.codes.to_numpy()
+        return np.where(codigos >= 0, rango[codigos], len(rango)), codigos < 0
+    if pd.api.types.is_datetime64_any_dtype(s) or pd.api.types.is_numeric_dtype(s):
+        return s.rank(method='dense').fillna(0).to_numpy(), s.isna().to_numpy()
+    valores = s.astype(str).to_numpy()
+    return pd.factorize(valores, sort=True)[0], s.isna().to_numpy()
+
+
+def format_records(df):
+    # Filas de la página listas para la tabla (fechas como DD/MM/YYYY, nulos vacíos).
+    salida = df.copy()
+    for columna in salida.columns:
+        if pd.api.types.is_datetime64_any_dtype(salida[columna]):
+            salida[columna] = salida[columna].dt.strftime(DATE_FORMAT)
+        elif isinstance(salida[columna].dtype, pd.CategoricalDtype) or salida[columna].dtype.name in ('Int64', 'string'):
+            salida[columna] = salida[columna].astype(object)
+    return salida.astype(object).where(salida.notna(), None).to_dict('records')
+
+
+class FrameSource:
+    # Fuente de una tabla paginada a partir de un DataFrame.
+    # El DataFrame es compartido: no se modifica.
+
+    def __init__(self, df):
+        # Solo se reinicia el índice si hace falta (reset_index copia las columnas,
+        # y el DataFrame puede estar mapeado desde una instantánea).
+        if not isinstance(df.index, pd.RangeIndex) or df.index.start != 0 or df.index.step != 1:
+            df = df.reset_index(drop=True)
+        self.df = df
+        self._orders = {}  # Índices de orden: (columna, descendente) -> (clave, posiciones).
+        self._searches = {}  # Índices de búsqueda de frases: columna -> GlosaSearch.
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.df)
+
+    def columns(self):
+        # Definición de las columnas para la tabla.
+        tipos = []
+        for nombre in self.df.columns:
+            s = self.df[nombre]
+            if pd.api.types.is_datetime64_any_dtype(s):
+                tipo = 'datetime'
+            elif pd.api.types.is_numeric_dtype(s) and not isinstance(s.dtype, pd.CategoricalDtype):
+                tipo = 'numeric'
+            else:
+                tipo = 'text'
+            tipos.append({'name': nombre, 'id': nombre, 'type': tipo})
+        return tipos
+
+    def _order(self, columna, desc=False):
+        # Clave de orden (nulos al final) y posiciones ordenadas de una columna.
+        # Se calculan una sola vez por columna y sentido.
+        with self._lock:
+            if (columna, desc) not in self._orders:
+                clave, nulos = _sort_key(self.df[columna])
+                clave = clave.astype(np.float64)
+                clave = np.where(nulos, np.inf, -clave if desc else clave)
+                self._orders[(columna, desc)] = (clave, np.argsort(clave, kind='stable'))
+            return self._orders[(columna, desc)]
+
+    def _search(self, columna):
+        # Índice de búsqueda de frases de una columna (se arma una sola vez).
+        with self._lock:
+            if columna not in self._searches:
+                self._searches[columna] = GlosaSearch(self.df[columna])
+            return self._searches[columna]
+
+    def mask(self, filter_query, search=None):
+        # Máscara de las filas que cumplen todos los filtros y la búsqueda (None si no hay ninguno).
+        # `search` es (columna, frases, modo), con modo 'any' (alguna frase) o 'all' (todas).
+        mascara = None
+        for columna, op, valor in parse_filter_query(filter_query):
+            if columna not in self.df.columns:
+                continue
+            parcial = column_mask(self.df[columna], op, valor)
+            mascara = parcial if mascara is None else mascara & parcial
+        if search and search[1] and search[0] in self.df.columns:
+            columna, frases, modo = search
+            parcial = self._search(columna).mask(frases, modo)
+            mascara = parcial if mascara is None else mascara & parcial
+        return mascara
+
+    def positions(self, filter_query='', sort_by=None, search=None):
+        # Posiciones de las filas filtradas en el orden pedido.
+        sort_by = [s for s in (sort_by or []) if s.get('column_id') in self.df.columns]
+        mascara = self.mask(filter_query, search)
+        if not sort_by:
+            return np.arange(len(self.df)) if mascara is None else np.flatnonzero(mascara)
+        if len(sort_by) == 1:
+            # Orden por una sola columna: se reutiliza el índice ya calculado.
+            _, orden = self._order(sort_by[0]['column_id'], sort_by[0].get('direction') == 'desc')
+            return orden if mascara is None else orden[mascara[orden]]
+        # Varias columnas: la primera del `sort_by` es la de mayor prioridad.
+        claves = [self._order(s['column_id'], s.get('direction') == 'desc')[0] for s in reversed(sort_by)]
+        posiciones = np.arange(len(self.df)) if mascara is None else np.flatnonzero(mascara)
+        return posiciones[np.lexsort([c[posiciones] for c in claves])]
+
+    def page(self, page_current=0, page_size=10, filter_query='', sort_by=None, search=None):
+        # Filas de la página pedida y total de filas que cumplen el filtro.
+        page_current, page_size = page_bounds(page_current, page_size)
+        posiciones = self.positions(filter_query, sort_by, search)
+        inicio = page_current * page_size
+        pagina = self.df.iloc[posiciones[inicio:inicio + page_size]]
+        return format_records(pagina), len(posiciones)
@@ -0,0 +1,316 @@
+# -----------------------------------------------------------------------------
+# Descripción del Código:
+# Este módulo une las etapas del procesamiento de novedades en ejecuciones
+# incrementales sobre el almacén Parquet:
+#
+# - `consolidate_folder` (notebook 1.conasolidado_ano.ipynb): lee los archivos
+#   .NEG/.VAL de una carpeta, aplica el esquema de tipos y separa las glosas
+#   (los registros sin glosa se conservan con una fila sin código de glosa, para
+#   contar los Resueltos), y escribe un archivo Parquet por cada archivo fuente. Con el manifiesto del
+#   dataset solo procesa los archivos nuevos o modificados; los archivos que ya
+#   no están en la carpeta se retiran del dataset.
+# - `sync_partitions` (notebook 2.final_merged.ipynb): copia al dataset
+#   multianual solo las particiones año/mes del consolidado que cambiaron desde
+#   la última ejecución.
+# - `merge_folder` (notebook 2.final_merged.ipynb): une en el dataset multianual
+#   los archivos .NEG, .csv y .xlsx de una carpeta. Cada archivo se lee por
+#   bloques (src/data/merge.py), cada bloque se lleva a las 13 columnas del
+#   consolidado y se escribe enseguida en sus particiones, y el perfil de nulos y
+#   tipos se acumula al paso; la memoria depende del tamaño del bloque y no del
+#   total de años. Como `consolidate_folder`, solo procesa los archivos nuevos o
+#   modificados según el manifiesto.
+#
+# Así la actualización diaria depende del tamaño de los archivos nuevos y no del
+# total del histórico.
+#
+# En `consolidate_folder` y `merge_folder` las novedades repetidas entre archivos
+# (misma `tip_doc`, `doc`, `nov` y `fech_nov`) se descartan al paso con el conjunto
+# de huellas del dataset (src/data/dedup.py), según la política DEDUP_POLICY
+# ('first' o 'last'). El manifiesto registra por archivo las filas descartadas
+# (`duplicates`). Si un archivo cambia o se elimina, o si cambia la política, las
+# filas que ya se descartaron no se pueden recuperar y se reprocesa toda la carpeta.
+#
+# Al final de cada ejecución con cambios se reconstruye el cubo de indicadores del
+# dataset (src/data/cube.py), que es lo que consultan las páginas del dashboard, y
+# se publica una nueva instantánea de solo lectura (src/data/snapshot.py) que los
+# workers mapean en memoria en lugar de cargar cada uno su copia, con su índice de
+# afiliados por tipo y número de documento (src/data/affiliates.py).
+#
+# Información Recibida:
+# - Carpeta de archivos fuente y carpetas de los datasets de origen y destino.
+#
+# Información Enviada:
+# - Datasets actualizados en disco, su manifiesto, su cubo de indicadores, su
+#   instantánea y el plan de cambios aplicado.
+# -----------------------------------------------------------------------------
+
+import os  # Manejo de rutas.
+
+import pyarrow.parquet as pq  # Lectura de particiones individuales.
+
+from config.settings import DEDUP_POLICY, MERGE_CHUNKSIZE, SNAPSHOTS  # Deduplicación, filas por bloque e instantáneas.
+from src.data.affiliates import build_affiliate_index  # Índice de afiliados de la instantánea.
+from src.data.cube import build_cube, cube_path  # Cubo de indicadores del dataset.
+from src.data.dedup import FingerprintSet, drop_superseded  # Novedades repetidas entre archivos.
+from src.data.glosas import parse_glosas  # Separación vectorizada de glosas.
+from src.data.ingest import iter_neg_files, list_source_files  # Lectura en paralelo de los archivos.
+from src.data.merge import MERGE_EXTENSIONS, MergeProfile, iter_source_chunks  # Lectura por bloques de la unión.
+from src.data.manifest import (  # Manifiesto de fuentes procesadas.
+    MANIFEST_VERSION, describe_file, load_manifest, plan_changes, remove_outputs, save_manifest, source_key,
+)
+from src.data.snapshot import current_version, publish_snapshot  # Instantáneas para los workers.
+from src.data.store import PARTITION_COLUMNS, write_dataset  # Escritura particionada.
+
+
+def output_basename(file_path):
+    # Nombre base de la salida de un archivo fuente: NSEPS02501012023.NEG -> NSEPS02501012023_NEG.
+    stem, ext = os.path.splitext(os.path.basename(file_path))
+    return f"{stem}_{ext.lstrip('.')}"
+
+
+def _outputs(particiones, basename):
+    # Rutas relativas de los archivos que write_dataset escribió para cada partición.
+    return [f"anio={anio}/mes={mes}/{basename}-0.parquet" for anio, mes in particiones]
+
+
+def _refresh_cube(root, hubo_cambios):
+    # Reconstruye el cubo de indicadores si el dataset cambió o si todavía no existe.
+    if hubo_cambios or not os.path.exists(cube_path(root)):
+        cubo = build_cube(root)
+        print(f"Cubo de indicadores actualizado: {len(cubo)} combinaciones")
+
+
+def _refresh_snapshot(root, hubo_cambios):
+    # Publica una instantánea nueva si el dataset cambió o si todavía no tiene ninguna.
+    if SNAPSHOTS and os.path.exists(root) and (hubo_cambios or current_version(root) is None):
+        version = publish_snapshot(root, builders=[build_affiliate_index])
+        print(f"Instantánea publicada: {version}")
+
+
+def _reset_outputs(root, manifest):
+    # Borra las salidas de todas las fuentes del manifiesto y devuelve un manifiesto vacío.
+    for entrada in manifest['files'].values():
+        remove_outputs(root, entrada)
+    return {'version': MANIFEST_VERSION, 'files': {}}
+
+
+def _open_dedup(root, manifest, plan, dedup):
+    # Conjunto de huellas del dataset (None con dedup='off') e indicación de si hay que
+    # reprocesar toda la carpeta: un archivo cambió o se eliminó, cambió la política o el
+    # conjunto no corresponde al manifiesto (por ejemplo, una ejecución interrumpida).
+    if dedup == 'off':
+        return None, False
+    conjunto = FingerprintSet(root, dedup)
+    if not manifest['files']:
+        conjunto.reset()
+        return conjunto, False
+    return conjunto, bool(plan['cambiados'] or plan['eliminados']) or not conjunto.matches(manifest['files'])
+
+
+def _plan(folder_path, root, extensiones, full, dedup):
+    # Manifiesto, conjunto de huellas y plan de cambios de una ejecución.
+    manifest = load_manifest(root)
+    archivos = list_source_files(folder_path, extensiones)
+    plan = plan_changes(archivos, manifest)
+    conjunto, reprocesar = _open_dedup(root, manifest, plan, dedup)
+    if full or reprocesar:
+        if reprocesar and not full:
+            print("La deduplicación necesita reprocesar toda la carpeta (archivos modificados o eliminados, "
+                  "o cambio de política).")
+        manifest = _reset_outputs(root, manifest)
+        if conjunto is not None:
+            conjunto.reset()
+        plan = plan_changes(archivos, manifest)
+    plan['duplicados'] = {}  # Filas descartadas por archivo en esta ejecución.
+    return manifest, conjunto, plan
+
+
+def _commit_dedup(root, manifest, conjunto, clave, plan):
+    # Cierra el archivo `clave` en el conjunto y borra de los archivos anteriores las
+    # novedades que ahora le pertenecen.
+    for file_id in conjunto.commit():
+        anterior = conjunto.file_name(file_id)
+        borradas = drop_superseded(root, manifest['files'][anterior], file_id, conjunto)
+        plan['duplicados'][anterior] = plan['duplicados'].get(anterior, 0) + borradas
+        print(f"Archivo {anterior}: {borradas} filas reemplazadas por {clave}")
+
+
+def _close_dedup(conjunto, plan):
+    # Guarda el conjunto de huellas e imprime el total de filas descartadas.
+    if conjunto is not None and (plan['nuevos'] or plan['cambiados']):
+        conjunto.flush()
+        print(f"Duplicados descartados: {sum(plan['duplicados'].values())} filas")
+
+
+def consolidate_folder(folder_path, root, extensiones=('.NEG', '.VAL'), workers=None, full=False,
+                       dedup=DEDUP_POLICY):
+    # Actualiza el dataset `root` con los archivos de `folder_path`.
+    # Con full=True se descarta el manifiesto y se reprocesa toda la carpeta.
+    # `dedup`: 'first', 'last' u 'off' (ver encabezado).
+    manifest, conjunto, plan = _plan(folder_path, root, extensiones, full, dedup)
+
+    # Se retiran las salidas de los archivos eliminados y de los que cambiaron.
+    for clave in plan['eliminados']:
+        remove_outputs(root, manifest['files'].pop(clave))
+    for file_path in plan['cambiados']:
+        remove_outputs(root, manifest['files'][source_key(file_path)])
+    save_manifest(root, manifest)
+
+    # Solo se leen y procesan los archivos nuevos o modificados.
+    for file_path, chunk in iter_neg_files(plan['nuevos'] + plan['cambiados'], workers=workers, coerce=True):
+        df = parse_glosas(chunk, keep_empty=True)
+        clave = source_key(file_path)
+        descartadas = 0
+        if conjunto is not None:
+            conjunto.start(file_path, clave)
+            conservar = conjunto.keep(df)
+            descartadas = int(len(df) - conservar.sum())
+            df = df[conservar] if descartadas else df
+        basename = output_basename(file_path)
+        particiones = write_dataset(df, root, basename=basename) if len(df) else []
+        entrada = describe_file(file_path)
+        entrada.update(outputs=_outputs(particiones, basename), rows=len(df), duplicates=descartadas)
+        manifest['files'][clave] = entrada
+        plan['duplicados'][clave] = descartadas
+        if conjunto is not None:
+            _commit_dedup(root, manifest, conjunto, clave, plan)
+        save_manifest(root, manifest)  # Se guarda después de cada archivo para poder reanudar.
+        print(f"Archivo {os.path.basename(file_path)} procesado: {len(df)} filas ({descartadas} duplicadas descartadas)")
+    _close_dedup(conjunto, plan)
+
+    print(f"\nNuevos: {len(plan['nuevos'])}, modificados: {len(plan['cambiados'])}, "
+          f"sin cambios: {len(plan['sin_cambios'])}, eliminados: {len(plan['eliminados'])}")
+    _refresh_cube(root, plan['nuevos'] or plan['cambiados'] or plan['eliminados'])
+    _refresh_snapshot(root, plan['nuevos'] or plan['cambiados'] or plan['eliminados'])
+    return plan
+
+
+
+def _write_source(file_path, root, chunksize, perfil, conjunto=None):
+    # Escribe los bloques de un archivo fuente en el dataset (un archivo por bloque y partición)
+    # y acumula su perfil. Con `conjunto` se descartan las novedades que pertenecen a otro archivo.
+    # Si la lectura falla a mitad del archivo se borra lo ya escrito.
+    nombre, base = os.path.basename(file_path), output_basename(file_path)
+    entrada = {'outputs': [], 'rows': 0, 'duplicates': 0}
+    if conjunto is not None:
+        conjunto.start(file_path, source_key(file_path))
+    try:
+        for n, (crudo, chunk) in enumerate(iter_source_chunks(file_path, chunksize)):
+            if conjunto is not None:
+                conservar = conjunto.keep(chunk)
+                entrada['duplicates'] += int(len(chunk) - conservar.sum())
+                crudo, chunk = crudo[conservar], chunk[conservar]
+            basename = f"{base}_{n:05d}"
+            if len(chunk):
+                entrada['outputs'] += _outputs(write_dataset(chunk, root, basename=basename), basename)
+            entrada['rows'] += len(chunk)
+            perfil.update(nombre, crudo, chunk)
+    except Exception:
+        remove_outputs(root, entrada)
+        perfil.sources.pop(nombre, None)
+        if conjunto is not None:
+            conjunto.abort(source_key(file_path))
+        raise
+    return entrada
+
+
+def merge_folder(folder_path, root, extensiones=MERGE_EXTENSIONS, chunksize=MERGE_CHUNKSIZE, full=False,
+                 dedup=DEDUP_POLICY):
+    # Une los archivos de `folder_path` en el dataset `root` leyendo por bloques.
+    # Con full=True se descarta el manifiesto y se vuelve a unir toda la carpeta.
+    # `dedup`: 'first', 'last' u 'off' (ver encabezado).
+    # Devuelve el plan de cambios (con las filas duplicadas descartadas por archivo) y el
+    # perfil (MergeProfile) de todas las fuentes.
+    manifest, conjunto, plan = _plan(folder_path, root, extensiones, full, dedup)
+    for clave in plan['eliminados']:
+        remove_outputs(root, manifest['files'].pop(clave))
+    for file_path in plan['cambiados']:
+        remove_outputs(root, manifest['files'].pop(source_key(file_path)))
+    save_manifest(root, manifest)
+
+    perfil = MergeProfile()
+    for file_path in plan['nuevos'] + plan['cambiados']:
+        try:
+            entrada = _write_source(file_path, root, chunksize, perfil, conjunto)
+        except Exception as e:
+            print(f"No se pudo unir el archivo {os.path.basename(file_path)}: {e}")
+            continue
+        clave = source_key(file_path)
+        entrada.update(describe_file(file_path), profile=perfil.source(os.path.basename(file_path)))
+        manifest['files'][clave] = entrada
+        plan['duplicados'][clave] = entrada['duplicates']
+        if conjunto is not None:
+            _commit_dedup(root, manifest, conjunto, clave, plan)
+        save_manifest(root, manifest)  # Se guarda después de cada archivo para poder reanudar.
+        print(f"Archivo {os.path.basename(file_path)} unido: {entrada['rows']} filas "
+              f"({entrada['duplicates']} duplicadas descartadas)")
+    _close_dedup(conjunto, plan)
+    # Las fuentes sin cambios conservan el perfil calculado cuando se unieron.
+    for file_path in plan['sin_cambios']:
+        perfil.add(os.path.basename(file_path), manifest['files'][source_key(file_path)].get('profile'))
+    save_manifest(root, manifest)
+
+    print(f"\nNuevos: {len(plan['nuevos'])}, modificados: {len(plan['cambiados'])}, "
+          f"sin cambios: {len(plan['sin_cambios'])}, eliminados: {len(plan['eliminados'])}")
+    _refresh_cube(root, plan['nuevos'] or plan['cambiados'] or plan['eliminados'])
+    _refresh_snapshot(root, plan['nuevos'] or plan['cambiados'] or plan['eliminados'])
+    return plan, perfil
+
+
+def _partition_signatures(root):
+    # Firma de cada partición 'anio=YYYY/mes=M': nombre, tamaño y fecha de sus archivos Parquet.
+    firmas = {}
+    if not os.path.exists(root):
+        return firmas
+    for carpeta, _, archivos in os.walk(root):
+        relativo = os.path.relpath(carpeta, root).replace(os.sep, '/')
+        if relativo.count('/') != len(PARTITION_COLUMNS) - 1:
+            continue
+        parquet = sorted(a for a in archivos if a.endswith('.parquet'))
+        if parquet:
+            firmas[relativo] = [[a, os.path.getsize(os.path.join(carpeta, a)), os.path.getmtime(os.path.join(carpeta, a))]
+                                for a in parquet]
+    return firmas
+
+
+def _partition_year(relativo):
+    # Año de una partición 'anio=YYYY/mes=M'.
+    return int(relativo.split('/')[0].split('=')[1])
+
+
+def sync_partitions(src_root, dst_root, columns=None, basename='part', anios=None):
+    # Copia a `dst_root` las particiones de `src_root` que cambiaron desde la última
+    # sincronización (según el manifiesto de `dst_root`). Con `anios` se limitan los
+    # años incluidos. Devuelve las listas de particiones actualizadas y eliminadas.
+    manifest = load_manifest(dst_root)
+    firmas = _partition_signatures(src_root)
+    if anios is not None:
+        anios = set(anios)
+        firmas = {part: firma for part, firma in firmas.items() if _partition_year(part) in anios}
+
+    actualizadas = [part for part, firma in sorted(firmas.items())
+                    if manifest['files'].get(part, {}).get('signature') != firma]
+    eliminadas = [part for part in manifest['files'] if part not in firmas]
+
+    for part in eliminadas:
+        remove_outputs(dst_root, manifest['files'].pop(part))
+    for part in actualizadas:
+        df = pq.read_table(os.path.join(src_root, part), columns=columns).to_pandas()
+        if part in manifest['files']:
+            remove_outputs(dst_root, manifest['files'][part])
+        particiones = write_dataset(df, dst_root, basename=basename) if len(df) else []
+        manifest['files'][part] = {
+            'path': os.path.join(os.path.abspath(src_root), part),
+            'signature': firmas[part],
+            'outputs': _outputs(particiones, basename),
+            'rows': len(df),
+        }
+        save_manifest(dst_root, manifest)
+        print(f"Partición {part} actualizada: {len(df)} filas")
+    save_manifest(dst_root, manifest)
+
+    print(f"\nParticiones actualizadas: {len(actualizadas)}, eliminadas: {len(eliminadas)}, "
+          f"sin cambios: {len(firmas) - len(actualizadas)}")
+    _refresh_cube(dst_root, actualizadas or eliminadas)
+    _refresh_snapshot(dst_root, actualizadas or eliminadas)
+    return {'actualizadas': actualizadas, 'eliminadas': eliminadas}
@@ -0,0 +1,312 @@
+# -----------------------------------------------------------------------------
+# Descripción del Código:
+# Este módulo define la capa de proveedores de datos del dashboard. Cada
+# proveedor entrega los indicadores mensuales (Mes, Casos, Resueltos, Pendientes)
+# de una dirección y una versión de sus datos, que cambia cuando los datos cambian.
+#
+# Proveedores disponibles:
+# - `SampleProvider`: los datos de ejemplo fijos.
+# - `StoreProvider`: el consolidado en el almacén Parquet o en un CSV exportado.
+#   Con Parquet los indicadores salen del cubo del dataset (src/data/cube.py) si existe,
+#   y los registros de la instantánea mapeada en memoria (src/data/snapshot.py), que
+#   comparten todos los workers, si el pipeline la publicó. Las consultas de un
+#   afiliado usan el índice por tipo y número de documento de esa instantánea.
+# - `SheetsProvider`: una hoja de Google Sheets con los indicadores ya calculados,
+#   leída en segundo plano por src/data/sheets.py.
+#
+# `create_provider` elige el proveedor según `DATA_PROVIDER` en config/settings.py.
+#
+# Información Recibida:
+# - `direction`: Clave de la dirección (juridica, control, ...).
+# - Filtros opcionales por palabra clave: `anio` y `mes`.
+#
+# Información Enviada:
+# - Un DataFrame con las columnas Mes, Casos, Resueltos y Pendientes.
+# -----------------------------------------------------------------------------
+
+import os  # Manejo de rutas y metadatos de archivos.
+
+import pandas as pd  # Manejo de DataFrames.
+
+from config.settings import (  # Configuración de las fuentes de datos.
+    DATA_CSV_PATH, DATA_PROVIDER, DATASET_CONSOLIDADO, NOVEDADES_POR_DIRECCION,
+    SHEETS_SPREADSHEET_ID, SHEETS_WORKSHEET,
+)
+from src.data.affiliates import AFFILIATE_COLUMNS, AffiliateIndex, has_affiliate_index  # Índice de afiliados.
+from src.data.cube import KpiCube, cube_path  # Cubo de indicadores precalculado.
+from src.data.glosas import RECORD_KEY, record_starts  # Llave y primera fila de cada registro.
+from src.data.manifest import MANIFEST_NAME  # El manifiesto cambia cada vez que se actualiza el dataset.
+from src.data.snapshot import SnapshotReader  # Instantánea de solo lectura compartida entre workers.
+from src.data.store import dataset_path, read_dataset  # Lectura del almacén Parquet.
+
+KPI_COLUMNS = ['Mes', 'Casos', 'Resueltos', 'Pendientes']  # Columnas que consumen los layouts.
+# Columnas del consolidado que se muestran en la tabla de registros de cada dirección.
+RECORD_COLUMNS = ['fecha_rep', 'tip_doc', 'doc', 'dep', 'mun', 'nov', 'fech_nov', 'No_Glosas', 'obs_glos']
+# Columnas del consolidado para calcular los indicadores sin cubo (la llave del registro y las glosas).
+KPI_SOURCE_COLUMNS = RECORD_KEY + ['No_Glosas']
+
+
+def monthly_kpis(df):
+    # Indicadores por mes de reporte a partir del consolidado (una fila por glosa):
+    # - Casos: registros reportados en el mes.
+    # - Pendientes: registros con al menos una glosa GN (deben corregirse).
+    # - Resueltos: registros sin glosa.
+    # Cada registro se cuenta en su primera fila (las demás son sus otras glosas), como en el cubo.
+    if df.empty:
+        return pd.DataFrame(columns=KPI_COLUMNS)
+    df = df[record_starts(df)]
+    fechas = pd.to_datetime(df['fecha_rep'])
+    pendientes = df['No_Glosas'] > 0
+    kpis = pd.DataFrame({'mes': fechas.dt.to_period('M'), 'pendiente': pendientes}).groupby('mes', sort=True)
+    resultado = pd.DataFrame({
+        'Casos': kpis.size(),
+        'Pendientes': kpis['pendiente'].sum().astype('int64'),
+    })
+    resultado['Resueltos'] = resultado['Casos'] - resultado['Pendientes']
+    resultado.insert(0, 'Mes', resultado.index.astype(str))
+    return resultado[KPI_COLUMNS].reset_index(drop=True)
+
+
+class DataProvider:
+    # Interfaz común de los proveedores de datos.
+    name = 'base'
+
+    def load(self, direction, **filtros):
+        # Indicadores mensuales de la dirección con los filtros dados.
+        raise NotImplementedError
+
+    def version(self):
+        # Identificador de la versión de los datos; cambia cuando los datos cambian.
+        return '0'
+
+    def records(self, direction, **filtros):
+        # Registros del consolidado de la dirección (None si el proveedor no los tiene).
+        return None
+
+    def shares_records(self):
+        # Indica si los registros están mapeados desde una instantánea compartida
+        # (no hace falta guardarlos en la caché del proceso ni en la de disco).
+        return False
+
+    def snapshot_stats(self):
+        # Instantánea abierta por el proceso (None si el proveedor no usa instantáneas).
+        return None
+
+    def affiliate(self, tip_doc, doc):
+        # Novedades y glosas de un afiliado (None si el proveedor no tiene registros).
+        # Sin `tip_doc` se buscan todos los tipos de documento.
+        return None
+
+    def doc_types(self):
+        # Tipos de documento que se pueden consultar.
+        return []
+
+
+class SampleProvider(DataProvider):
+    # Datos de ejemplo fijos (los mismos para todas las direcciones).
+    name = 'sample'
+
+    def load(self, direction, **filtros):
+        # Datos de ejemplo personalizados para cada dirección
+        # La función devuelve un DataFrame con los siguientes datos fijos:
+        return pd.DataFrame({
+            'Mes': ['Ene', 'Feb', 'Mar', 'Abr', 'May'],  # Meses de los datos
+            'Casos': [120, 150, 140, 170, 190],  # Casos totales por mes
+            'Resueltos': [100, 130, 120, 150, 170],  # Casos resueltos por mes
+            'Pendientes': [20, 20, 20, 20, 20]  # Casos pendientes por mes
+        })
+
+
+class StoreProvider(DataProvider):
+    # Consolidado de novedades en Parquet (almacén particionado) o en un CSV exportado.
+    # Del Parquet solo se leen las columnas necesarias y los filtros se aplican al leer.
+    # Si el dataset tiene cubo de indicadores, los indicadores se calculan sobre el cubo.
+
+    def __init__(self, path, fmt='parquet'):
+        self.path = path
+        self.fmt = fmt
+        self.name = fmt
+        self._cube = None
+        self._cube_mtime = None
+        self._snapshots = SnapshotReader(path) if fmt == 'parquet' else None
+        self._affiliates = None
+
+    def cube(self):
+        # Cubo del dataset (se vuelve a cargar si el archivo cambió); None si no existe.
+        ruta = cube_path(self.path)
+        if self.fmt != 'parquet' or not os.path.exists(ruta):
+            return None
+        mtime = os.stat(ruta).st_mtime_ns
+        if mtime != self._cube_mtime:
+            self._cube, self._cube_mtime = KpiCube.load(ruta), mtime
+        return self._cube
+
+    def snapshot(self):
+        # Instantánea vigente del dataset si tiene las columnas de los registros; None si no.
+        snapshot = self._snapshots.get() if self._snapshots is not None else None
+        if snapshot is None or not set(RECORD_COLUMNS) <= set(snapshot.columns):
+            return None
+        return snapshot
+
+    def shares_records(self):
+        return self.snapshot() is not None
+
+    def snapshot_stats(self):
+        return self._snapshots.stats() if self._snapshots is not None else None
+
+    def affiliate_index(self):
+        # Índice de afiliados de la instantánea vigente (se vuelve a abrir si cambió la versión); None si no hay.
+        snapshot = self._snapshots.get() if self._snapshots is not None else None
+        if snapshot is None or not has_affiliate_index(snapshot):
+            return None
+        if self._affiliates is None or self._affiliates.version != snapshot.version:
+            self._affiliates = AffiliateIndex(snapshot)
+        return self._affiliates
+
+    def affiliate(self, tip_doc, doc):
+        indice = self.affiliate_index()
+        if indice is not None:
+            return indice.records(tip_doc, doc)
+        # Sin índice se filtra al leer el Parquet (o el CSV), recorriendo el dataset.
+        if self.fmt == 'csv':
+            df = self._read_csv(None, columns=AFFILIATE_COLUMNS)
+            mascara = (df['doc'] == int(doc)) & ((df['tip_doc'] == tip_doc) if tip_doc else True)
+            return df[mascara][AFFILIATE_COLUMNS].reset_index(drop=True)
+        filtros = [('doc', '=', int(doc))] + ([('tip_doc', '=', tip_doc)] if tip_doc else [])
+        return read_dataset(self.path, columns=AFFILIATE_COLUMNS, filters=filtros)
+
+    def doc_types(self):
+        indice = self.affiliate_index()
+        if indice is not None:
+            return indice.doc_types()
+        if self.fmt == 'csv':
+            return sorted(self._read_csv(None, columns=['tip_doc'])['tip_doc'].dropna().unique().tolist())
+        return sorted(read_dataset(self.path, columns=['tip_doc'])['tip_doc'].dropna().unique().tolist())
+
+    def _filters(self, direction, anio=None, mes=None):
+        # Filtros de pyarrow: año y mes sobre las particiones y novedades de la dirección.
+        filtros = []
+        if anio is not None:
+            filtros.append(('anio', '=', int(anio)))
+        if mes is not None:
+            filtros.append(('mes', '=', int(mes)))
+        novedades = NOVEDADES_POR_DIRECCION.get(direction)
+        if novedades:
+            filtros.append(('nov', 'in', list(novedades)))
+        return filtros or None
+
+    def _read_csv(self, direction, anio=None, mes=None, columns=None):
+        # Lectura del CSV con solo las columnas necesarias; los filtros se aplican en memoria.
+        columnas = list(dict.fromkeys(['fecha_rep', 'nov'] + (columns or KPI_SOURCE_COLUMNS)))
+        categorias = {c: 'category' for c in ('tip_doc', 'dep', 'mun', 'nov') if c in columnas}
+        df = pd.read_csv(self.path, usecols=columnas, dtype=categorias)
+        for columna in ('fecha_rep', 'fech_nov'):
+            if columna in df.columns:
+                df[columna] = pd.to_datetime(df[columna], dayfirst=True)
+        if anio is not None:
+            df = df[df['fecha_rep'].dt.year == int(anio)]
+        if mes is not None:
+            df = df[df['fecha_rep'].dt.month == int(mes)]
+        novedades = NOVEDADES_POR_DIRECCION.get(direction)
+        if novedades:
+            df = df[df['nov'].isin(novedades)]
+        return df[columnas]
+
+    def load(self, direction, **filtros):
+        cubo = self.cube()
+        if cubo is not None:
+            return cubo.monthly(nov=NOVEDADES_POR_DIRECCION.get(direction), **filtros)
+        if self.fmt == 'csv':
+            df = self._read_csv(direction, **filtros)
+        else:
+            df = read_dataset(self.path, columns=KPI_SOURCE_COLUMNS, filters=self._filters(direction, **filtros))
+        return monthly_kpis(df)
+
+    def records(self, direction, **filtros):
+        # Registros de la dirección con las columnas de la tabla de registros.
+        if self.fmt == 'csv':
+            return self._read_csv(direction, columns=RECORD_COLUMNS, **filtros)[RECORD_COLUMNS]
+        snapshot = self.snapshot()
+        if snapshot is not None:
+            return self._snapshot_records(snapshot, direction, **filtros)
+        return read_dataset(self.path, columns=RECORD_COLUMNS, filters=self._filters(direction, **filtros))
+
+    def _snapshot_records(self, snapshot, direction, anio=None, mes=None):
+        # Registros sobre las columnas mapeadas. Sin filtros no se copia nada; con filtros
+        # solo se copian las filas seleccionadas (el año y el mes salen de fecha_rep, como las particiones).
+        df = snapshot.frame(RECORD_COLUMNS)
+        mascara = None
+        if anio is not None:
+            mascara = df['fecha_rep'].dt.year.to_numpy() == int(anio)
+        if mes is not None:
+            parcial = df['fecha_rep'].dt.month.to_numpy() == int(mes)
+            mascara = parcial if mascara is None else mascara & parcial
+        novedades = NOVEDADES_POR_DIRECCION.get(direction)
+        if novedades:
+            parcial = df['nov'].isin(novedades).to_numpy()
+            mascara = parcial if mascara is None else mascara & parcial
+        return df if mascara is None else df[mascara].reset_index(drop=True)
+
+    def version(self):
+        # La fecha de modificación del manifiesto y del cubo y la instantánea vigente (Parquet)
+        # o la fecha del archivo (CSV).
+        if self.fmt == 'csv':
+            rutas = [self.path]
+        else:
+            rutas = [os.path.join(self.path, MANIFEST_NAME), cube_path(self.path)]
+            if not os.path.exists(rutas[0]):
+                rutas[0] = self.path
+        version = '-'.join(str(os.stat(r).st_mtime_ns) if os.path.exists(r) else '0' for r in rutas)
+        if self._snapshots is not None:
+            version += f"-{self._snapshots.version()}"
+        return version
+
+
+class SheetsProvider(DataProvider):
+    # Hoja de Google Sheets con los indicadores mensuales ya calculados.
+    # Si la hoja tiene la columna 'Direccion', se filtran las filas de la dirección pedida.
+    # La hoja se lee en segundo plano; `load` usa el último DataFrame leído.
+    name = 'sheets'
+
+    def __init__(self, spreadsheet_id, worksheet, client_factory=None):
+        self.spreadsheet_id = spreadsheet_id
+        self.worksheet = worksheet
+        self.client_factory = client_factory
+        self._refresher = None
+
+    def refresher(self):
+        # Actualizador en segundo plano de la hoja (se inicia la primera vez que se usa).
+        # `get_refresher` vuelve a iniciar el hilo si el proceso es un worker creado con fork.
+        from src.data.sheets import get_refresher
+        primera = self._refresher is None
+        self._refresher = get_refresher(self.spreadsheet_id, self.worksheet, client_factory=self.client_factory)
+        if primera:
+            self._refresher.wait(timeout=30)  # Solo la primera vez se espera la lectura inicial.
+        return self._refresher
+
+    def load(self, direction, **filtros):
+        df = self.refresher().get()
+        if 'Direccion' in df.columns:
+            df = df[df['Direccion'] == direction]
+        return df.reindex(columns=KPI_COLUMNS).reset_index(drop=True)
+
+    def version(self):
+        # Huella de los valores leídos; cambia cuando cambia el contenido de la hoja.
+        return self.refresher().version
+
+
+def create_provider(kind=None):
+    # Crea el proveedor configurado en DATA_PROVIDER.
+    kind = kind or DATA_PROVIDER
+    ruta_parquet = dataset_path(DATASET_CONSOLIDADO)
+    if kind == 'auto':
+        kind = 'parquet' if os.path.exists(ruta_parquet) else 'sample'
+    if kind == 'parquet':
+        return StoreProvider(ruta_parquet, 'parquet')
+    if kind == 'csv':
+        return StoreProvider(DATA_CSV_PATH, 'csv')
+    if kind == 'sheets':
+        return SheetsProvider(SHEETS_SPREADSHEET_ID, SHEETS_WORKSHEET)
+    if kind == 'sample':
+        return SampleProvider()
+    raise ValueError(f"Proveedor de datos desconocido: {kind}")
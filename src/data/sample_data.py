@@ -1,27 +1,143 @@
 # -----------------------------------------------------------------------------
 # Descripción del Código:
-# Esta función genera un DataFrame de pandas con datos de ejemplo relacionados 
-# con casos, resueltos y pendientes, según el mes. Los datos son fijos y 
-# personalizados para cada dirección. 
+# Esta función entrega el DataFrame de indicadores mensuales (casos, resueltos y
+# pendientes) que usan los gráficos y tablas de cada dirección. Los datos vienen
+# del proveedor configurado en `DATA_PROVIDER` (ver src/data/providers.py) y se
+# guardan en una caché del proceso con tiempo de vida y tamaño máximo, de modo
+# que navegar entre direcciones no vuelve a cargar ni agregar los datos.
+#
+# La clave de la caché incluye la dirección, los filtros y la versión de los
+# datos del proveedor: cuando los datos cambian, las entradas viejas dejan de usarse.
+# Con `SHARED_CACHE_DIR` los resultados se comparten en disco entre los workers.
+# Los registros que vienen de una instantánea mapeada en memoria (src/data/snapshot.py)
+# no pasan por la caché: ya están compartidos entre los workers y abrirlos no lee datos.
 #
 # Información Recibida:
-# - `direction`: Un parámetro que especifica la dirección de los datos, aunque
-#   actualmente no afecta el contenido de los datos.
+# - `direction`: Clave de la dirección de los datos.
+# - Filtros opcionales por palabra clave (`anio`, `mes`).
 #
 # Información Enviada:
 # - Un DataFrame de pandas que contiene los datos de los casos para ser utilizado
-#   en la aplicación, en particular para mostrar gráficos y tablas en la interfaz 
+#   en la aplicación, en particular para mostrar gráficos y tablas en la interfaz
 #   de usuario.
+# - Fuentes de las tablas paginadas (`FrameSource`) de indicadores, de registros y
+#   de la consulta de un afiliado.
+# - `cache_stats()`: aciertos y fallos de la caché.
 # -----------------------------------------------------------------------------
 
-import pandas as pd  # Importa la librería pandas para manejar datos en formato de DataFrame.
-
-def get_sample_data(direction):
-    # Datos de ejemplo personalizados para cada dirección
-    # La función devuelve un DataFrame con los siguientes datos fijos:
-    return pd.DataFrame({
-        'Mes': ['Ene', 'Feb', 'Mar', 'Abr', 'May'],  # Meses de los datos
-        'Casos': [120, 150, 140, 170, 190],  # Casos totales por mes
-        'Resueltos': [100, 130, 120, 150, 170],  # Casos resueltos por mes
-        'Pendientes': [20, 20, 20, 20, 20]  # Casos pendientes por mes
-    })
+import threading  # Creación única del proveedor entre hilos.
+
+import pandas as pd  # Fuente vacía para claves mal formadas.
+
+from config.settings import CACHE_MAXSIZE, CACHE_TTL  # Parámetros de la caché.
+from src.data.cache import DataCache, shared_store  # Caché TTL + LRU con contadores.
+from src.data.paging import FrameSource  # Fuente de las tablas paginadas.
+from src.data.providers import DataProvider, create_provider  # Proveedor de datos configurado.
+from src.profiling import register_metrics_source, stage  # Instrumentación opcional.
+
+_cache = DataCache(maxsize=CACHE_MAXSIZE, ttl=CACHE_TTL, shared=shared_store('datos', CACHE_TTL))  # Caché del proceso (y en disco si se comparte).
+_sources = DataCache(maxsize=CACHE_MAXSIZE, ttl=CACHE_TTL)  # Fuentes de las tablas paginadas.
+_provider = None
+_provider_lock = threading.Lock()
+
+
+def get_provider():
+    # Proveedor de datos del proceso (se crea una sola vez).
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            _provider = create_provider()
+        return _provider
+
+
+def set_provider(provider):
+    # Reemplaza el proveedor (por ejemplo, para usar otra fuente) y vacía la caché.
+    global _provider
+    with _provider_lock:
+        _provider = provider
+    _cache.clear()
+    _sources.clear()
+
+
+def get_data_version():
+    # Versión de los datos del proveedor actual.
+    return get_provider().version()
+
+
+def get_sample_data(direction, **filtros):
+    # Indicadores mensuales de la dirección, desde la caché o desde el proveedor.
+    # El DataFrame devuelto es compartido: quien lo use no debe modificarlo.
+    provider = get_provider()
+    clave = (provider.name, direction, tuple(sorted(filtros.items())), provider.version())
+    with stage('data'):
+        return _cache.get_or_load(clave, lambda: provider.load(direction, **filtros))
+
+
+def get_kpi_source(direction):
+    # Tabla paginada de los indicadores mensuales de la dirección.
+    provider = get_provider()
+    clave = (provider.name, 'kpi', direction, provider.version())
+    return _sources.get_or_load(clave, lambda: FrameSource(get_sample_data(direction)))
+
+
+def has_records():
+    # Indica si el proveedor actual entrega los registros del consolidado.
+    return type(get_provider()).records is not DataProvider.records
+
+
+def get_records(direction):
+    # Registros del consolidado de la dirección, desde la caché o desde el proveedor.
+    provider = get_provider()
+    clave = (provider.name, 'records', direction, provider.version())
+    with stage('data'):
+        if provider.shares_records():
+            return provider.records(direction)
+        return _cache.get_or_load(clave, lambda: provider.records(direction))
+
+
+def get_records_source(direction):
+    # Tabla paginada de los registros del consolidado de la dirección.
+    # Los registros se leen una vez por versión de los datos; cada página solo recorta posiciones.
+    provider = get_provider()
+    clave = (provider.name, 'records', direction, provider.version())
+    return _sources.get_or_load(clave, lambda: FrameSource(get_records(direction)))
+
+
+def has_affiliates():
+    # Indica si el proveedor actual permite consultar afiliados.
+    return type(get_provider()).affiliate is not DataProvider.affiliate
+
+
+def get_doc_types():
+    # Tipos de documento del consolidado (para el buscador de afiliados).
+    provider = get_provider()
+    clave = (provider.name, 'doc_types', provider.version())
+    return _cache.get_or_load(clave, provider.doc_types)
+
+
+def affiliate_key(tip_doc, doc):
+    # Clave de la tabla de un afiliado: 'CC|123' ('|123' busca en todos los tipos de documento).
+    return f"{tip_doc or ''}|{int(doc)}"
+
+
+def get_affiliate_source(key):
+    # Tabla paginada con las novedades y glosas del afiliado de la clave `affiliate_key`.
+    # Una clave mal formada o que no es texto (por ejemplo, enviada a mano al callback de la tabla) no tiene registros.
+    try:
+        tip_doc, doc = key.split('|')
+        doc = int(doc)
+    except (ValueError, AttributeError):
+        return FrameSource(pd.DataFrame())
+    provider = get_provider()
+    clave = (provider.name, 'afiliado', f"{tip_doc}|{doc}", provider.version())
+    with stage('data'):
+        return _sources.get_or_load(clave, lambda: FrameSource(provider.affiliate(tip_doc or None, doc)))
+
+
+def cache_stats():
+    # Aciertos, fallos y tamaño de la caché de datos.
+    return _cache.stats()
+
+
+register_metrics_source('datos', cache_stats)  # Visible en /metrics (DASH_PROFILING=1).
+register_metrics_source('instantanea', lambda: get_provider().snapshot_stats())
@@ -0,0 +1,135 @@
+# -----------------------------------------------------------------------------
+# Descripción del Código:
+# Este módulo declara el esquema de tipos del consolidado de novedades (.NEG/.VAL)
+# y convierte las columnas de texto leídas por `src.data.ingest` a sus tipos
+# finales con operaciones vectorizadas. Reemplaza las celdas 4.4 a 4.6 del notebook
+# `1.conasolidado_ano.ipynb`, que probaban cada columna con `.apply` e intentaban
+# `pd.to_datetime` dentro de un `try/except` para volver a convertir a texto.
+#
+# Tipos del esquema:
+# - 'category': códigos de baja cardinalidad (cod_reg, tip_doc, dep, mun, nov).
+# - 'id': identificadores numéricos como enteros que admiten nulos (Int64).
+# - 'date': fechas DD/MM/YYYY como datetime64 (no se vuelven a convertir a texto).
+# - 'text': texto libre, se deja como está.
+# - 'count': conteos enteros sin nulos (int64; los vacíos cuentan 0).
+#
+# Información Recibida:
+# - DataFrames con las columnas de `NEG_COLUMNS` en formato texto.
+#
+# Información Enviada:
+# - DataFrames con los tipos declarados en `NEG_SCHEMA`.
+# -----------------------------------------------------------------------------
+
+import warnings  # Aviso cuando un identificador no es numérico.
+
+import pandas as pd  # Conversión vectorizada de tipos.
+from pandas.api.types import union_categoricals  # Unión de categorías entre bloques.
+
+# Formato de todas las fechas de los archivos de novedades.
+DATE_FORMAT = '%d/%m/%Y'
+
+# Esquema del consolidado NEG: columna -> tipo lógico.
+NEG_SCHEMA = {
+    'cod_reg': 'category',  # Código de la EPS que reporta.
+    'tip_doc': 'category',  # Tipo de documento (CC, TI, RC, CN, ...).
+    'doc': 'id',  # Número de documento del afiliado.
+    'fech_nac': 'date',  # Fecha de nacimiento.
+    'dep': 'category',  # Código del departamento (se conservan los ceros a la izquierda).
+    'mun': 'category',  # Código del municipio.
+    'nov': 'category',  # Código de la novedad (N01, N09, ...).
+    'fech_nov': 'date',  # Fecha de la novedad.
+    'fecha_rep': 'date',  # Fecha del reporte (tomada del nombre del archivo).
+    'observs': 'text',  # Glosas concatenadas.
+}
+
+# Esquema del consolidado final: esquema NEG más las columnas de glosas de src.data.glosas.
+CONSOLIDATED_SCHEMA = dict(NEG_SCHEMA, **{
+    'No_Glosas': 'count',  # Número de glosas GN del registro.
+    'observaciones_split': 'category',  # Código GN de la glosa.
+    'obs_glos': 'text',  # Descripción de la glosa.
+})
+CONSOLIDATED_COLUMNS = list(CONSOLIDATED_SCHEMA)
+
+
+def _parse_date(s):
+    # Convierte texto DD/MM/YYYY a datetime64; los valores inválidos quedan en NaT.
+    # Las fechas se repiten mucho, así que se convierten solo los valores distintos.
+    codigos, valores = pd.factorize(s)
+    if len(valores) == 0:
+        return pd.Series(pd.NaT, index=s.index, name=s.name, dtype='datetime64[ns]')
+    valores = pd.Series(valores, dtype=object)
+    fechas = pd.to_datetime(valores, format=DATE_FORMAT, errors='coerce')
+    fallidas = fechas.isna()
+    if fallidas.any():  # Exportaciones del consolidado (CSV) con fechas AAAA-MM-DD.
+        fechas[fallidas] = pd.to_datetime(valores[fallidas], format='ISO8601', errors='coerce')
+    resultado = pd.Series(fechas.to_numpy()[codigos], index=s.index, name=s.name)
+    return resultado.where(codigos >= 0)  # Los nulos de entrada (código -1) quedan en NaT.
+
+
+def _parse_id(s):
+    # Convierte identificadores a enteros con nulos (Int64).
+    numeros = pd.to_numeric(s, errors='coerce')
+    perdidos = int((numeros.isna() & s.notna()).sum())
+    if perdidos:
+        warnings.warn(f"{perdidos} valores no numéricos en '{s.name}' quedaron como nulos.")
+    return numeros.astype('Int64')
+
+
+def _parse_category(s):
+    # Convierte códigos de texto a categoría con categorías de texto (object). Una columna
+    # ausente en un archivo corto llega toda en NaN (float64) y sus categorías serían float64,
+    # que no se pueden unir con las de texto de los demás bloques.
+    if s.dtype != object:
+        s = s.astype(object).where(s.isna(), s.astype(str))
+    return s.astype('category')
+
+
+def _text_categories(s):
+    # Categoría con categorías de texto, para unir bloques con union_categoricals.
+    if not isinstance(s.dtype, pd.CategoricalDtype):
+        return _parse_category(s)
+    if s.cat.categories.dtype != object:
+        return s.cat.rename_categories(s.cat.categories.astype(str).astype(object))
+    return s
+
+
+def _parse_count(s):
+    # Convierte conteos a int64; los vacíos o no numéricos cuentan 0.
+    return pd.to_numeric(s, errors='coerce').fillna(0).astype('int64')
+
+
+_PARSERS = {
+    'category': _parse_category,
+    'id': _parse_id,
+    'date': _parse_date,
+    'count': _parse_count,
+    'text': lambda s: s,
+}
+
+
+def coerce_neg(df, schema=NEG_SCHEMA):
+    # Aplica el esquema a las columnas presentes en el DataFrame (una pasada por columna).
+    df = df.copy()
+    for column, tipo in schema.items():
+        if column in df.columns:
+            df[column] = _PARSERS[tipo](df[column])
+    return df
+
+
+def concat_chunks(chunks):
+    # Une bloques ya convertidos conservando las columnas categóricas: pd.concat
+    # convierte a object las categorías que difieren entre bloques, por eso se
+    # unen primero con union_categoricals.
+    chunks = list(chunks)
+    if not chunks:
+        return pd.DataFrame(columns=list(NEG_SCHEMA))
+    columnas = {}
+    for column in chunks[0].columns:
+        serie = chunks[0][column]
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            # Las categorías de todos los bloques se llevan a texto (un bloque sin la columna las trae en float64).
+            partes = [_text_categories(c[column]) for c in chunks]
+            columnas[column] = pd.Series(union_categoricals(partes, ignore_order=True))
+        else:
+            columnas[column] = pd.concat([c[column] for c in chunks], ignore_index=True)
+    return pd.DataFrame(columnas)
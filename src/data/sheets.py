@@ -0,0 +1,300 @@
+# -----------------------------------------------------------------------------
+# Descripción del Código:
+# Este módulo lee las hojas de Google Sheets en segundo plano. Un único hilo por
+# hoja (`SheetsRefresher`) consulta la hoja cada `SHEETS_REFRESH_SECONDS` y guarda
+# el último DataFrame válido en memoria; los callbacks lo leen al instante, sin
+# esperar a la API y sin una llamada por cada pestaña abierta.
+#
+# En cada ciclo se pide primero la fecha de última modificación de la hoja de
+# cálculo (una consulta pequeña, como un ETag). Solo si cambió se leen los valores,
+# con una única llamada `batch_get` sobre el rango configurado. Si la lectura falla
+# se conserva el último DataFrame válido.
+#
+# Con varios procesos (workers de gunicorn) cada uno tiene su actualizador, pero con
+# `SHARED_CACHE_DIR` solo uno consulta la API: el que tiene el bloqueo de la hoja en
+# la caché en disco (y lo renueva en cada ciclo). Ese proceso guarda la huella y los
+# valores en disco y los demás los leen de ahí cada FOLLOW_SECONDS, sin llamar a la
+# API. Si el proceso que lee la hoja termina, otro toma el bloqueo cuando este vence
+# (3 x SHEETS_REFRESH_SECONDS + 60 s). Sin `SHARED_CACHE_DIR` cada proceso consulta la
+# hoja por su cuenta: W workers hacen W consultas por ciclo.
+#
+# `create_client` crea el cliente de gspread con la llave de la cuenta de servicio
+# o, con `SHEETS_CLIENT='fake'`, el cliente en memoria de src/data/fake_gspread.py.
+#
+# Información Recibida:
+# - Id de la hoja de cálculo, nombre de la hoja y rango A1 a leer.
+#
+# Información Enviada:
+# - `get()`: último DataFrame válido (vacío mientras no haya una primera lectura).
+# - `version`: huella de los valores leídos; cambia cuando cambia la hoja. Sale solo
+#   del contenido, así que es la misma en todos los procesos que leen la misma hoja
+#   (antes de la primera lectura es la huella de una hoja vacía).
+# - Las funciones registradas con `add_listener` reciben la versión nueva en
+#   cuanto cambian los datos (por ejemplo, para avisar a las pestañas abiertas).
+# -----------------------------------------------------------------------------
+
+import hashlib  # Huella de los valores leídos.
+import json  # Serialización de los valores para la huella.
+import threading  # Hilo de actualización y bloqueos.
+import time  # Marcas de tiempo de las lecturas.
+
+import os  # Carpeta de la hoja compartida entre procesos.
+
+import pandas as pd  # Manejo de DataFrames.
+
+from config.settings import (  # Configuración de Google Sheets.
+    SHARED_CACHE_DIR, SHEETS_CLIENT, SHEETS_KEY_FILE, SHEETS_RANGE, SHEETS_REFRESH_SECONDS, SHEETS_SPREADSHEET_ID,
+    SHEETS_WORKSHEET,
+)
+from src.data.cache import DiskCache  # Valores y bloqueo de la hoja compartidos entre procesos.
+
+SCOPE = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]  # Alcance de Sheets y Drive.
+FOLLOW_SECONDS = 5  # Cada cuánto los demás procesos buscan en disco los valores nuevos.
+
+_refreshers = {}  # Un actualizador por (id de la hoja de cálculo, hoja, rango).
+_refreshers_lock = threading.Lock()
+_client = None  # Cliente de Google Sheets compartido por el proceso.
+_client_lock = threading.Lock()
+
+
+def create_client(kind=None, key_file=None):
+    # Cliente de Google Sheets: gspread autenticado o el cliente en memoria.
+    kind = kind or SHEETS_CLIENT
+    if kind == 'fake':
+        from src.data.fake_gspread import FakeClient, kpi_values, sample_values
+        return FakeClient(sheets={(SHEETS_SPREADSHEET_ID, SHEETS_WORKSHEET): kpi_values()}, default=sample_values())
+    if kind == 'gspread':
+        import gspread  # Para trabajar con Google Sheets
+        from oauth2client.service_account import ServiceAccountCredentials  # Autenticación en Google Sheets
+        creds = ServiceAccountCredentials.from_json_keyfile_name(key_file or SHEETS_KEY_FILE, SCOPE)
+        return gspread.authorize(creds)
+    raise ValueError(f"Cliente de Google Sheets desconocido: {kind}")
+
+
+def values_to_frame(valores):
+    # DataFrame a partir de las filas leídas (la primera fila es el encabezado).
+    # La API omite las celdas vacías del final de cada fila, así que se completan.
+    if not valores:
+        return pd.DataFrame()
+    encabezado = [str(c) for c in valores[0]]
+    ancho = len(encabezado)
+    filas = [list(fila[:ancho]) + [''] * (ancho - len(fila)) for fila in valores[1:]]
+    return pd.DataFrame(filas, columns=encabezado)
+
+
+def _fingerprint(valores):
+    # Huella corta de los valores, para saber si el contenido cambió.
+    return hashlib.sha1(json.dumps(valores, default=str).encode('utf-8')).hexdigest()[:16]
+
+
+class SheetsRefresher:
+    # Lee una hoja en segundo plano y guarda el último DataFrame válido.
+
+    def __init__(self, client_factory, spreadsheet_id, worksheet, rango=None, interval=None, shared=None):
+        self.client_factory = client_factory
+        self.spreadsheet_id = spreadsheet_id
+        self.worksheet = worksheet
+        self.rango = rango or SHEETS_RANGE
+        self.interval = SHEETS_REFRESH_SECONDS if interval is None else interval
+        self.shared = shared  # DiskCache compartida entre procesos (solo uno consulta la API).
+        self._key = ('hoja', spreadsheet_id, worksheet, self.rango)  # Clave de los valores y del bloqueo en disco.
+        self._leader = False  # Este proceso tiene el bloqueo y consulta la API.
+        self._shared_modified = None  # Última escritura leída de la caché en disco.
+        self._spreadsheet = None  # Hoja de cálculo abierta una sola vez.
+        self._worksheet = None
+        self._df = pd.DataFrame()
+        self._version = _fingerprint([])  # Huella de la hoja vacía, igual en todos los procesos.
+        self._modified = None  # Última fecha de modificación vista.
+        self._lock = threading.Lock()  # Protege el DataFrame y la versión.
+        self._refresh_lock = threading.Lock()  # Una lectura a la vez.
+        self._ready = threading.Event()  # Se activa con la primera lectura (válida o fallida).
+        self._stop = threading.Event()
+        self._thread = None
+        self._listeners = []  # Funciones que reciben la versión nueva.
+        self.refreshes = 0  # Lecturas completas de los valores.
+        self.skipped = 0  # Ciclos sin cambios en la hoja.
+        self.errors = 0
+        self.last_error = None
+        self.last_check = None
+
+    def _open(self):
+        # Abre la hoja de cálculo y la hoja la primera vez (o después de un error).
+        if self._worksheet is None:
+            self._spreadsheet = self.client_factory().open_by_key(self.spreadsheet_id)
+            self._worksheet = self._spreadsheet.worksheet(self.worksheet)
+        return self._spreadsheet, self._worksheet
+
+    def _last_update(self, spreadsheet):
+        # Fecha de modificación de Drive; None si no se puede consultar.
+        try:
+            return spreadsheet.get_lastUpdateTime()
+        except Exception:
+            return None
+
+    def refresh(self, force=False):
+        # Lee la hoja si cambió desde la última lectura. Devuelve True si los datos cambiaron.
+        with self._refresh_lock:
+            if self.shared is not None and not self._lead():
+                return self._follow()
+            try:
+                spreadsheet, worksheet = self._open()
+                modificado = self._last_update(spreadsheet)
+                self.last_check = time.time()
+                if not force and modificado is not None and modificado == self._modified:
+                    self.skipped += 1
+                    return False
+                valores = worksheet.batch_get([self.rango], value_render_option='UNFORMATTED_VALUE')[0]
+                valores = [list(fila) for fila in valores]
+                self.refreshes += 1
+                self._modified = modificado
+                huella = _fingerprint(valores)
+                if huella == self._version:  # Misma información (por ejemplo, sin fecha de modificación).
+                    return False
+                self._set(valores, huella)
+                if self.shared is not None:
+                    self.shared.set(self._key, (huella, valores))  # Para los demás procesos.
+                return True
+            except Exception as e:
+                # Se conserva el último DataFrame válido y se reabre la hoja en el siguiente ciclo.
+                self.errors += 1
+                self.last_error = f"{type(e).__name__}: {e}"
+                self._spreadsheet = self._worksheet = None
+                print(f"No se pudo leer la hoja {self.worksheet}: {self.last_error}")
+                return False
+            finally:
+                self._ready.set()
+
+    def _set(self, valores, huella):
+        # Reemplaza los datos y avisa a las funciones registradas.
+        df = values_to_frame(valores)
+        with self._lock:
+            self._df, self._version = df, huella
+        for funcion in list(self._listeners):
+            funcion(huella)
+
+    def _lead(self):
+        # True si este proceso consulta la API: renueva su bloqueo o toma uno libre o vencido.
+        if self._leader:
+            self._leader = self.shared.renew(self._key)
+        if not self._leader:
+            self._leader = self.shared.lock(self._key)
+            self._modified = None  # Al tomar el bloqueo se vuelve a leer la hoja.
+        return self._leader
+
+    def _follow(self):
+        # Toma de la caché en disco los valores que guardó el proceso que consulta la API.
+        try:
+            modificado = self.shared.modified(self._key)
+            self.last_check = time.time()
+            if modificado is None or modificado == self._shared_modified:
+                self.skipped += 1
+                return False
+            valor = self.shared.get(self._key)
+            if not isinstance(valor, tuple):  # Se está reemplazando: se lee en el siguiente ciclo.
+                return False
+            self._shared_modified = modificado
+            huella, valores = valor
+            if huella == self._version:
+                return False
+            self._set(valores, huella)
+            return True
+        except Exception as e:
+            self.errors += 1
+            self.last_error = f"{type(e).__name__}: {e}"
+            print(f"No se pudo leer la hoja {self.worksheet} de la caché compartida: {self.last_error}")
+            return False
+        finally:
+            # Hay datos (o no se esperan de otro proceso): ya se puede usar la hoja.
+            if self._shared_modified is not None:
+                self._ready.set()
+
+    def add_listener(self, funcion):
+        # Registra una función que recibe la versión cada vez que cambian los datos.
+        self._listeners.append(funcion)
+        return self
+
+    def _run(self):
+        # Ciclo del hilo: lee la hoja y espera el intervalo (o la señal de parada).
+        while not self._stop.is_set():
+            self.refresh()
+            espera = self.interval
+            if self.shared is not None and not self._leader:
+                # Leer el disco es barato: se revisa más seguido (y hasta la primera lectura, cada segundo).
+                espera = min(espera, FOLLOW_SECONDS if self._ready.is_set() else 1)
+            self._stop.wait(espera)
+
+    def start(self):
+        # Inicia el hilo de actualización (una sola vez).
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=f"sheets-{self.worksheet}", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        # Detiene el hilo de actualización.
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        if self._leader:  # Otro proceso puede tomar la hoja enseguida.
+            self.shared.unlock(self._key)
+            self._leader = False
+
+    def wait(self, timeout=None):
+        # Espera la primera lectura. Devuelve True si ya terminó.
+        return self._ready.wait(timeout)
+
+    def get(self):
+        # Último DataFrame válido. Es compartido: quien lo use no debe modificarlo.
+        with self._lock:
+            return self._df
+
+    @property
+    def version(self):
+        with self._lock:
+            return self._version
+
+    def stats(self):
+        # Estado de las lecturas de la hoja.
+        return {
+            'version': self.version,
+            'rows': len(self.get()),
+            'refreshes': self.refreshes,
+            'skipped': self.skipped,
+            'errors': self.errors,
+            'last_error': self.last_error,
+            'last_check': self.last_check,
+            'shared': self.shared is not None,
+            'leader': self._leader if self.shared is not None else None,
+        }
+
+
+def _shared_client():
+    # Cliente de Google Sheets compartido por todos los actualizadores del proceso.
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = create_client()
+        return _client
+
+
+def shared_sheets(interval=None):
+    # Caché en disco de las hojas en SHARED_CACHE_DIR; None si no está configurada. Los valores
+    # no vencen (se reemplazan cuando cambia la hoja) y el bloqueo vence tras tres ciclos sin renovarse.
+    if not SHARED_CACHE_DIR:
+        return None
+    interval = SHEETS_REFRESH_SECONDS if interval is None else interval
+    return DiskCache(os.path.join(SHARED_CACHE_DIR, 'hojas'), ttl=float('inf'), lock_timeout=3 * interval + 60)
+
+
+def get_refresher(spreadsheet_id, worksheet, rango=None, client_factory=None, interval=None, start=True):
+    # Actualizador compartido por el proceso para una hoja; se crea e inicia una sola vez.
+    # Con SHARED_CACHE_DIR solo uno de los procesos consulta la API (ver `shared_sheets`).
+    clave = (spreadsheet_id, worksheet, rango or SHEETS_RANGE)
+    with _refreshers_lock:
+        refresher = _refreshers.get(clave)
+        if refresher is None:
+            refresher = SheetsRefresher(client_factory or _shared_client, spreadsheet_id, worksheet, rango, interval,
+                                        shared=shared_sheets(interval))
+            _refreshers[clave] = refresher
+    return refresher.start() if start else refresher
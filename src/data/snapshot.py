@@ -0,0 +1,256 @@
+# -----------------------------------------------------------------------------
+# Descripción del Código:
+# Este módulo publica y abre instantáneas (snapshots) inmutables de un dataset del
+# almacén para los workers del dashboard. Sin instantáneas, cada worker de gunicorn
+# lee el Parquet y guarda su propia copia en pandas de los registros, así que la
+# memoria crece con el número de workers.
+#
+# - `publish_snapshot` escribe una carpeta `_snapshots/<versión>/` con un archivo
+#   `.npy` por columna: números y fechas tal cual, y las columnas de texto y
+#   categóricas como códigos enteros (del tamaño que usa pandas). Las categorías se
+#   guardan como en Arrow: los bytes UTF-8 de todas seguidos (`<col>.text.npy`) y
+#   la posición donde empieza cada una (`<col>.offsets.npy`). Los enteros (por
+#   ejemplo `doc`) se guardan con su máscara de nulos (`<col>.mask.npy`) para
+#   volver como Int64 y no como float. Al terminar, el puntero `_snapshots/CURRENT`
+#   se reemplaza de forma atómica (`os.replace`) con el nombre de la nueva versión.
+# - `open_snapshot` abre la versión del puntero con `np.load(mmap_mode='r')`: las
+#   columnas no se copian a la memoria del proceso sino que se mapean desde el
+#   archivo, y el sistema operativo comparte esas páginas entre todos los workers.
+#   El DataFrame se arma sobre los arreglos mapeados sin copiarlos: las categorías
+#   son un arreglo de texto de Arrow sobre los bytes mapeados (dtype `string`), sin
+#   crear un objeto de Python por categoría en cada worker.
+# - Antes de publicar una versión se pueden construir índices sobre ella (por
+#   ejemplo el de afiliados, src/data/affiliates.py), que se guardan en su carpeta.
+# - `SnapshotReader` revisa el puntero en cada uso (un `stat`) y, si cambió, abre la
+#   nueva versión; la anterior se libera cuando nadie la usa. Cambiar de versión no
+#   relee el dataset.
+#
+# Se conservan las últimas `SNAPSHOT_KEEP` versiones: un worker que todavía use una
+# versión anterior la sigue leyendo aunque sus archivos se borren (en Linux el
+# archivo mapeado sigue disponible hasta que se libera).
+#
+# Información Recibida:
+# - Carpeta del dataset Parquet.
+#
+# Información Enviada:
+# - Carpetas de instantáneas en disco y DataFrames de solo lectura mapeados desde ellas.
+# -----------------------------------------------------------------------------
+
+import json  # Descripción de las columnas de cada instantánea.
+import os  # Rutas y reemplazo atómico del puntero.
+import shutil  # Borrado de las versiones antiguas.
+import threading  # Cambio de versión entre hilos.
+import uuid  # Nombre único de cada versión.
+
+import numpy as np  # Columnas en archivos .npy mapeados en memoria.
+import pandas as pd  # DataFrames sobre los arreglos mapeados.
+import pyarrow as pa  # Tipos de las columnas del dataset.
+import pyarrow.dataset as ds  # Lectura del dataset columna por columna.
+
+from config.settings import SNAPSHOT_KEEP  # Versiones que se conservan en disco.
+from src.data.store import PARTITION_COLUMNS  # Columnas de partición (no se publican).
+
+SNAPSHOTS_DIR = '_snapshots'  # Carpeta de las instantáneas dentro del dataset (Arrow la ignora por el '_').
+CURRENT_NAME = 'CURRENT'  # Puntero con el nombre de la versión vigente.
+META_NAME = 'meta.json'
+
+
+def snapshots_path(root):
+    # Carpeta de las instantáneas de un dataset.
+    return os.path.join(root, SNAPSHOTS_DIR)
+
+
+def current_version(root):
+    # Nombre de la versión vigente (None si el dataset no tiene instantáneas).
+    try:
+        with open(os.path.join(snapshots_path(root), CURRENT_NAME), encoding='utf-8') as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def _codes_dtype(n_categorias):
+    # Tipo de los códigos que pandas usa para `n_categorias` (así `from_codes` no los copia).
+    for tipo in (np.int8, np.int16, np.int32):
+        if n_categorias < np.iinfo(tipo).max:
+            return np.dtype(tipo)
+    return np.dtype(np.int64)
+
+
+def _text_buffers(categorias):
+    # Categorías como en un arreglo de texto de Arrow: posiciones de inicio (n + 1) y bytes UTF-8.
+    textos = pa.array([str(c) for c in categorias], type=pa.large_string())
+    posiciones, datos = textos.buffers()[1:]
+    n = len(textos)
+    offsets = np.frombuffer(posiciones, dtype=np.int64, count=n + 1) if posiciones is not None else np.zeros(1, np.int64)
+    total = int(offsets[-1])
+    return {'offsets': offsets, 'text': np.frombuffer(datos, dtype=np.uint8, count=total) if total else np.zeros(0, np.uint8)}
+
+
+def _encode(columna):
+    # Arreglos a guardar (sufijo del archivo -> arreglo; '' es el de la columna) y descripción
+    # de una columna del dataset (Arrow).
+    if pa.types.is_dictionary(columna.type) or pa.types.is_string(columna.type) or pa.types.is_large_string(columna.type):
+        serie = columna.to_pandas()
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            serie = serie.cat.remove_unused_categories()
+            codigos, categorias = serie.cat.codes.to_numpy(), serie.cat.categories
+        else:
+            codigos, categorias = pd.factorize(serie)  # Texto libre: cada valor distinto es una categoría.
+        arreglos = {'': codigos.astype(_codes_dtype(len(categorias))), **_text_buffers(categorias)}
+        return arreglos, {'kind': 'category'}
+    if pa.types.is_integer(columna.type):
+        # Valores (0 en los nulos) y máscara de nulos, para armar un Int64 de pandas sin pasar por float.
+        mascara = columna.is_null().to_numpy(zero_copy_only=False)
+        valores = columna.fill_null(0).to_numpy()
+        return {'': valores, 'mask': mascara}, {'kind': 'integer'}
+    valores = columna.to_pandas().to_numpy()
+    if pa.types.is_timestamp(columna.type):
+        return {'': valores.astype('datetime64[ns]')}, {'kind': 'datetime'}
+    if valores.dtype == object:  # Tipos sin equivalente directo en NumPy.
+        raise TypeError(f"Tipo de columna no soportado en la instantánea: {columna.type}")
+    return {'': valores}, {'kind': 'numeric'}
+
+
+def _file_name(nombre, sufijo=''):
+    # Archivo de una columna ('doc.npy') o de una de sus partes ('doc.mask.npy').
+    return f"{nombre}.{sufijo}.npy" if sufijo else f"{nombre}.npy"
+
+
+def publish_snapshot(root, columns=None, keep=None, builders=()):
+    # Publica una instantánea del dataset `root` y la deja como versión vigente.
+    # Cada columna se lee por separado, así que la memoria usada es la de una columna.
+    # `builders` son funciones que reciben la instantánea ya escrita y guardan en su
+    # carpeta archivos adicionales (índices) antes de publicarla.
+    dataset = ds.dataset(root, format='parquet', partitioning='hive')
+    columnas = columns or [c for c in dataset.schema.names if c not in PARTITION_COLUMNS]
+    version = f"{pd.Timestamp.now():%Y%m%d%H%M%S}-{uuid.uuid4().hex[:8]}"
+    carpeta = os.path.join(snapshots_path(root), version)
+    os.makedirs(carpeta)
+    meta = {'version': version, 'rows': dataset.count_rows(), 'columns': {}}
+    for nombre in columnas:
+        columna = dataset.to_table(columns=[nombre]).column(nombre).combine_chunks()
+        arreglos, meta['columns'][nombre] = _encode(columna)
+        for sufijo, arreglo in arreglos.items():
+            np.save(os.path.join(carpeta, _file_name(nombre, sufijo)), np.ascontiguousarray(arreglo), allow_pickle=False)
+    with open(os.path.join(carpeta, META_NAME), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False)
+    for builder in builders:
+        builder(Snapshot(carpeta))
+
+    # El puntero se escribe en un temporal y se reemplaza: los workers ven la versión anterior o la nueva.
+    puntero = os.path.join(snapshots_path(root), CURRENT_NAME)
+    with open(f"{puntero}.tmp", 'w', encoding='utf-8') as f:
+        f.write(version)
+    os.replace(f"{puntero}.tmp", puntero)
+    prune_snapshots(root, SNAPSHOT_KEEP if keep is None else keep)
+    return version
+
+
+def prune_snapshots(root, keep):
+    # Borra las versiones más antiguas y conserva las `keep` más recientes (siempre la vigente).
+    carpeta = snapshots_path(root)
+    vigente = current_version(root)
+    versiones = sorted(v for v in os.listdir(carpeta) if os.path.isdir(os.path.join(carpeta, v)))
+    for version in versiones[:-max(keep, 1)]:
+        if version != vigente:
+            shutil.rmtree(os.path.join(carpeta, version), ignore_errors=True)  # En Windows falla si un proceso la usa.
+
+
+class Snapshot:
+    # Una versión publicada: columnas mapeadas en memoria, de solo lectura.
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, META_NAME), encoding='utf-8') as f:
+            meta = json.load(f)
+        self.version = meta['version']
+        self.rows = meta['rows']
+        self._meta = meta['columns']
+        self._columns = {}  # Columnas ya abiertas (arreglos mapeados o Categorical sobre ellos).
+        self._lock = threading.Lock()
+
+    @property
+    def columns(self):
+        return list(self._meta)
+
+    def _load(self, nombre, sufijo=''):
+        return np.load(os.path.join(self.path, _file_name(nombre, sufijo)), mmap_mode='r', allow_pickle=False)
+
+    def _categories(self, nombre, descripcion):
+        # Categorías de texto sobre los bytes mapeados (versiones anteriores: lista en meta.json).
+        if 'categories' in descripcion:
+            return pd.Index(descripcion['categories'])
+        offsets, texto = self._load(nombre, 'offsets'), self._load(nombre, 'text')
+        textos = pa.LargeStringArray.from_buffers(len(offsets) - 1, pa.py_buffer(offsets), pa.py_buffer(texto))
+        return pd.Index(pd.arrays.ArrowStringArray(textos))
+
+    def column(self, nombre):
+        # Columna mapeada en memoria; las categóricas y los enteros con nulos se arman sobre
+        # los arreglos mapeados sin copiarlos.
+        with self._lock:
+            if nombre not in self._columns:
+                descripcion = self._meta[nombre]
+                arreglo = self._load(nombre)
+                if descripcion['kind'] == 'category':
+                    tipo = pd.CategoricalDtype(self._categories(nombre, descripcion))
+                    arreglo = pd.Categorical.from_codes(arreglo, dtype=tipo, validate=False)
+                elif descripcion['kind'] == 'integer':
+                    arreglo = pd.arrays.IntegerArray(arreglo, self._load(nombre, 'mask'))
+                self._columns[nombre] = arreglo
+            return self._columns[nombre]
+
+    def frame(self, columns=None):
+        # DataFrame de solo lectura con las columnas pedidas (todas por defecto).
+        # Con copy=False cada columna queda en su propio bloque, sobre el arreglo mapeado.
+        columnas = columns or self.columns
+        desconocidas = set(columnas) - set(self._meta)
+        if desconocidas:
+            raise KeyError(f"Columnas que no están en la instantánea: {', '.join(sorted(desconocidas))}")
+        return pd.DataFrame({c: self.column(c) for c in columnas}, copy=False)
+
+
+def open_snapshot(root, version=None):
+    # Abre la versión pedida o la vigente (None si el dataset no tiene instantáneas).
+    version = version or current_version(root)
+    if version is None:
+        return None
+    return Snapshot(os.path.join(snapshots_path(root), version))
+
+
+class SnapshotReader:
+    # Instantánea vigente de un dataset para un proceso. En cada `get` se revisa el
+    # puntero (un `stat`); si otra publicación lo cambió, se abre la nueva versión.
+
+    def __init__(self, root):
+        self.root = root
+        self._snapshot = None
+        self._mtime = None
+        self._lock = threading.Lock()
+
+    def _pointer_mtime(self):
+        try:
+            return os.stat(os.path.join(snapshots_path(self.root), CURRENT_NAME)).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def get(self):
+        # Instantánea vigente (None si no hay ninguna publicada).
+        mtime = self._pointer_mtime()
+        with self._lock:
+            if mtime != self._mtime:
+                self._snapshot = open_snapshot(self.root) if mtime is not None else None
+                self._mtime = mtime
+            return self._snapshot
+
+    def version(self):
+        # Versión vigente ('0' si no hay instantánea).
+        snapshot = self.get()
+        return snapshot.version if snapshot is not None else '0'
+
+    def stats(self):
+        # Versión abierta y columnas mapeadas por este proceso.
+        snapshot = self.get()
+        if snapshot is None:
+            return None
+        return {'version': snapshot.version, 'rows': snapshot.rows, 'columns_mapped': sorted(snapshot._columns)}
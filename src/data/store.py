@@ -0,0 +1,94 @@
+# -----------------------------------------------------------------------------
+# Descripción del Código:
+# Este módulo implementa el almacén de datos del proyecto: datasets en formato
+# Parquet particionados por año y mes (`anio=YYYY/mes=M`). Reemplaza la salida
+# final `to_excel` de los notebooks y la lectura posterior con `read_excel`,
+# que eran lentas y quedaban limitadas a 1.048.576 filas por hoja.
+#
+# - `write_dataset` escribe un DataFrame en el almacén. Cada llamada escribe un
+#   archivo por partición con el nombre base indicado, de modo que volver a
+#   escribir con el mismo nombre reemplaza solo esos archivos. Las filas sin fecha
+#   (archivos cuyo nombre no trae la fecha del reporte) van a la partición
+#   `anio=0/mes=0` (fecha desconocida) en lugar de detener la escritura.
+# - `read_dataset` lee columnas seleccionadas (proyección) y aplica filtros que
+#   Arrow evalúa sobre las particiones y las estadísticas de cada archivo
+#   (predicate pushdown), sin cargar el resto del dataset.
+# - `export_excel` conserva la exportación a Excel como salida opcional.
+#
+# Información Recibida:
+# - `root`: Carpeta del dataset (por ejemplo DATA_DIR/neg_all).
+# - `date_column`: Columna de fecha de la que salen el año y el mes de la partición.
+#
+# Información Enviada:
+# - Archivos Parquet en disco y DataFrames leídos desde ellos.
+# -----------------------------------------------------------------------------
+
+import os  # Manejo de rutas.
+
+import pandas as pd  # Manejo de DataFrames.
+import pyarrow as pa  # Tablas columnares en memoria.
+import pyarrow.parquet as pq  # Lectura y escritura de archivos Parquet.
+
+from config.settings import DATA_DIR  # Carpeta raíz del almacén.
+
+PARTITION_COLUMNS = ['anio', 'mes']  # Columnas de partición (año y mes).
+UNKNOWN_PERIOD = 0  # Año y mes de la partición de las filas sin fecha.
+EXCEL_MAX_ROWS = 1_048_575  # Filas de datos por hoja de Excel (sin contar el encabezado).
+
+
+def dataset_path(name, data_dir=None):
+    # Ruta de un dataset dentro del almacén.
+    return os.path.join(data_dir or DATA_DIR, name)
+
+
+def _to_table(df):
+    # Convierte a Arrow con un tipo uniforme para las columnas categóricas
+    # (diccionario de índices int32 y valores string) y para las columnas de texto
+    # sin ningún valor (string en lugar de null), para que todos los archivos
+    # del dataset compartan el mismo esquema.
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    for i, field in enumerate(table.schema):
+        if pa.types.is_null(field.type):
+            table = table.set_column(i, field.name, table.column(i).cast(pa.string()))
+        elif pa.types.is_dictionary(field.type):
+            value_type = pa.string() if pa.types.is_null(field.type.value_type) else field.type.value_type
+            table = table.set_column(i, field.name, table.column(i).cast(pa.dictionary(pa.int32(), value_type)))
+    return table
+
+
+def write_dataset(df, root, date_column='fecha_rep', basename='part'):
+    # Escribe el DataFrame en `root`, un archivo `<basename>-0.parquet` por cada
+    # partición año/mes de `date_column`. Si el archivo ya existe se reemplaza.
+    # Devuelve la lista de particiones escritas como tuplas (anio, mes).
+    fechas = pd.to_datetime(df[date_column], errors='coerce')
+    sin_fecha = int(fechas.isna().sum())
+    if sin_fecha:
+        print(f"{sin_fecha} filas sin {date_column} van a la partición anio={UNKNOWN_PERIOD}/mes={UNKNOWN_PERIOD} ({basename})")
+    df = df.assign(anio=fechas.dt.year.fillna(UNKNOWN_PERIOD).astype('int32'),
+                   mes=fechas.dt.month.fillna(UNKNOWN_PERIOD).astype('int32'))
+    pq.write_to_dataset(
+        _to_table(df),
+        root,
+        partition_cols=PARTITION_COLUMNS,
+        basename_template=f"{basename}-{{i}}.parquet",
+        existing_data_behavior='overwrite_or_ignore',  # Solo se sobrescriben los archivos con el mismo nombre.
+    )
+    return sorted(set(zip(df['anio'].tolist(), df['mes'].tolist())))
+
+
+def read_dataset(root, columns=None, filters=None):
+    # Lee el dataset con proyección de columnas y filtros. `filters` usa el formato
+    # de pyarrow, por ejemplo [('anio', '>=', 2023), ('nov', 'in', ['N01', 'N09'])].
+    # Devuelve un DataFrame vacío si el dataset todavía no existe.
+    if not os.path.exists(root):
+        return pd.DataFrame(columns=columns or [])
+    table = pq.read_table(root, columns=columns, filters=filters, partitioning='hive')
+    return table.to_pandas()
+
+
+def export_excel(df, output_path):
+    # Exporta a Excel como salida opcional. Si el DataFrame supera el límite de
+    # filas de una hoja, se reparte en varias hojas (datos_1, datos_2, ...).
+    with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
+        for n, inicio in enumerate(range(0, max(len(df), 1), EXCEL_MAX_ROWS), start=1):
+            df.iloc[inicio:inicio + EXCEL_MAX_ROWS].to_excel(writer, sheet_name=f"datos_{n}", index=False)
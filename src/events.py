@@ -0,0 +1,183 @@
+# -----------------------------------------------------------------------------
+# Descripción del Código:
+# Este módulo avisa a las pestañas abiertas cuando cambian los datos, en lugar de
+# que cada una vuelva a pedir todo con un `dcc.Interval`. El servidor publica la
+# versión de cada fuente de datos (`publish`, por ejemplo desde el hilo que lee la
+# hoja de Google Sheets) y la envía por Server-Sent Events a las pestañas
+# conectadas a `/events/data-version`, solo cuando cambia.
+#
+# En el navegador:
+# - `data_version_stores` agrega a la página un `dcc.Store` por fuente
+#   ({'type': 'data-version', 'source': ...}) con la versión con la que se armó.
+# - Un callback del lado del cliente abre un `EventSource` (uno por página) con
+#   esas versiones y, con cada aviso, actualiza el Store de la fuente que cambió
+#   (`dash_clientside.set_props`). Solo se vuelven a ejecutar los callbacks que
+#   tienen ese Store como entrada.
+#
+# Una pestaña sin cambios no hace solicitudes: la conexión queda abierta y solo
+# recibe un comentario cada EVENTS_HEARTBEAT_SECONDS para detectar conexiones
+# caídas. Al reconectarse, el navegador envía la última versión recibida
+# (`Last-Event-ID`) y el servidor avisa lo que haya cambiado mientras tanto.
+#
+# Con gunicorn cada worker publica sus versiones, y una pestaña puede reconectarse a
+# otro worker. Por eso la versión debe salir solo del contenido (la huella de los
+# valores de la hoja, igual en todos los workers) y no de un contador del proceso. Un
+# worker que todavía no leyó un cambio no conoce la versión de la pestaña: no le envía
+# la suya (más vieja) y espera a publicar una nueva, así la pestaña no vuelve a datos
+# anteriores. Cada proceso recuerda las últimas EVENTS_HISTORY versiones de cada fuente.
+#
+# Cada conexión ocupa un hilo del servidor. EVENTS_MAX_STREAMS limita las conexiones
+# por proceso (gunicorn.conf.py reserva esos hilos aparte de los de las solicitudes;
+# 0 = sin límite). Una conexión que pasa del límite recibe los cambios pendientes y
+# el navegador se reconecta más tarde, así que la pestaña no se queda sin avisos.
+#
+# Información Recibida:
+# - Las versiones que publica cada fuente de datos.
+#
+# Información Enviada:
+# - La ruta `/events/data-version` (text/event-stream) y los componentes de la página.
+# -----------------------------------------------------------------------------
+
+import json  # Datos de cada aviso.
+import threading  # Espera de nuevas versiones entre hilos.
+from collections import deque  # Versiones anteriores de cada fuente.
+from urllib.parse import parse_qsl, urlencode  # Versiones conocidas por la pestaña.
+
+from dash import ALL, Input, clientside_callback, dcc  # Componentes y callback del navegador.
+from flask import Response, request  # Respuesta en streaming de Flask.
+
+from config.settings import EVENTS_HEARTBEAT_SECONDS, EVENTS_MAX_STREAMS, EVENTS_RETRY_SECONDS
+
+EVENTS_PATH = '/events/data-version'  # Ruta de los avisos.
+EVENT_NAME = 'data-version'  # Nombre del evento en el EventSource.
+EVENTS_HISTORY = 32  # Versiones anteriores que se recuerdan por fuente.
+
+_versions = {}  # Fuente -> última versión publicada.
+_history = {}  # Fuente -> versiones anteriores publicadas por este proceso.
+_condition = threading.Condition()  # Despierta a las conexiones cuando se publica una versión.
+_stats = {'streams': 0, 'events': 0, 'rejected': 0}
+
+
+def publish(source, version):
+    # Publica la versión actual de una fuente; solo despierta a las conexiones si cambió.
+    version = str(version)
+    with _condition:
+        anterior = _versions.get(source)
+        if anterior == version:
+            return False
+        if anterior is not None:
+            _history.setdefault(source, deque(maxlen=EVENTS_HISTORY)).append(anterior)
+        _versions[source] = version
+        _condition.notify_all()
+        return True
+
+
+def current_versions():
+    with _condition:
+        return dict(_versions)
+
+
+def events_stats():
+    # Conexiones abiertas, avisos enviados y conexiones rechazadas por el límite.
+    with _condition:
+        return dict(_stats, versions=dict(_versions))
+
+
+def _newer(conocidas):
+    # Versiones actuales que no se envían a la pestaña porque la suya es más nueva: no es
+    # la actual ni una anterior de este proceso (la leyó otro worker que ya vio el cambio).
+    # Se llama con `_condition` tomado.
+    return {s: v for s, v in _versions.items()
+            if s in conocidas and conocidas[s] != v and conocidas[s] not in _history.get(s, ())}
+
+
+def _changes(conocidas, omitir):
+    # Versiones publicadas que la pestaña no tiene (se llama con `_condition` tomado).
+    return {s: v for s, v in _versions.items() if s in conocidas and conocidas[s] != v and omitir.get(s) != v}
+
+
+def _event(conocidas, cambios):
+    # Aviso de las fuentes que cambiaron. El id son las versiones de la pestaña: el
+    # navegador lo devuelve al reconectarse.
+    conocidas.update(cambios)
+    return f"id: {urlencode(conocidas)}\nevent: {EVENT_NAME}\ndata: {json.dumps(cambios)}\n\n"
+
+
+def _stream(conocidas, omitir):
+    # Envía un aviso cada vez que cambia la versión de alguna fuente de la pestaña.
+    yield f"retry: {EVENTS_RETRY_SECONDS * 1000}\n\n"
+    while True:
+        with _condition:
+            cambios = _changes(conocidas, omitir)
+            if not cambios:
+                _condition.wait(EVENTS_HEARTBEAT_SECONDS)
+                cambios = _changes(conocidas, omitir)
+            if cambios:
+                _stats['events'] += 1
+        if cambios:
+            yield _event(conocidas, cambios)
+        else:
+            yield ": ping\n\n"  # Mantiene viva la conexión; si la pestaña se cerró, falla la escritura.
+
+
+def _closed():
+    # El servidor cerró la conexión (pestaña cerrada o servidor detenido).
+    with _condition:
+        _stats['streams'] -= 1
+
+
+def register_data_events(app):
+    # Registra la ruta de los avisos y el callback que los recibe en el navegador.
+
+    @app.server.route(app.config.routes_pathname_prefix + EVENTS_PATH.lstrip('/'))
+    def data_version_events():
+        # Versiones de la pestaña: las de la página o, al reconectarse, las del último aviso recibido.
+        conocidas = dict(parse_qsl(request.headers.get('Last-Event-ID') or request.query_string.decode('utf-8')))
+        with _condition:
+            omitir = _newer(conocidas)
+            lleno = 0 < EVENTS_MAX_STREAMS <= _stats['streams']
+            if lleno:
+                _stats['rejected'] += 1
+                cambios = _changes(conocidas, omitir)
+                if cambios:
+                    _stats['events'] += 1
+            else:
+                _stats['streams'] += 1
+        if lleno:
+            # Sin hilos para otra conexión: se envían los cambios pendientes y el navegador
+            # se reconecta más tarde con las versiones recibidas.
+            aviso = _event(conocidas, cambios) if cambios else ''
+            return Response(f"retry: {EVENTS_RETRY_SECONDS * 1000 * 6}\n\n{aviso}", mimetype='text/event-stream')
+        response = Response(_stream(conocidas, omitir), mimetype='text/event-stream')
+        response.headers['Cache-Control'] = 'no-cache'
+        response.headers['X-Accel-Buffering'] = 'no'  # Sin búfer en nginx.
+        response.call_on_close(_closed)  # También si la conexión se cierra antes del primer aviso.
+        return response
+
+    # Abre una sola conexión por página con las versiones con las que se armó.
+    clientside_callback(
+        """
+        function(versions) {
+            if (window.dataVersionEvents || !window.EventSource) {
+                return;
+            }
+            const query = new URLSearchParams(Object.fromEntries(versions.map((v, i) => [
+                dash_clientside.callback_context.inputs_list[0][i].id.source, v
+            ])));
+            const events = new EventSource('""" + app.get_relative_path(EVENTS_PATH) + """?' + query);
+            events.addEventListener('""" + EVENT_NAME + """', (e) => {
+                for (const [source, version] of Object.entries(JSON.parse(e.data))) {
+                    dash_clientside.set_props({type: 'data-version', source: source}, {data: version});
+                }
+            });
+            window.dataVersionEvents = events;
+        }
+        """,
+        Input({'type': 'data-version', 'source': ALL}, 'data'),  # Versiones de todas las fuentes de la página.
+    )
+
+
+def data_version_stores(versions):
+    # Un Store por fuente con la versión de los datos con los que se armó la página.
+    return [dcc.Store(id={'type': 'data-version', 'source': source}, data=str(version))
+            for source, version in versions.items()]
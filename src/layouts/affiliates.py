@@ -0,0 +1,91 @@
+# -----------------------------------------------------------------------------
+# Descripción del Código:
+# Este módulo define la página de consulta de afiliados: el usuario elige el tipo
+# de documento (o todos) y escribe el número, y la página muestra todas las
+# novedades y glosas de esa persona en una tabla paginada en el servidor.
+#
+# La búsqueda usa el índice de afiliados de la instantánea del consolidado
+# (src/data/affiliates.py), así que no recorre el dataset completo. Sin índice, el
+# proveedor filtra al leer el Parquet (más lento, pero con el mismo resultado).
+#
+# Los datos se importan con la primera visita a la página, no al iniciar la aplicación.
+# Los registros de un afiliado son datos personales: la búsqueda y las páginas de su
+# tabla (fuente privada 'afiliados') solo se entregan con la sesión iniciada en el
+# servidor (src/auth.py), no según 'auth-store', que controla el navegador.
+#
+# Información Recibida:
+# - Tipo y número de documento del afiliado.
+#
+# Información Enviada:
+# - El layout de la página y la tabla con los registros del afiliado.
+# -----------------------------------------------------------------------------
+
+import dash_bootstrap_components as dbc  # Componentes de diseño de Bootstrap.
+from dash import Input, Output, State, callback, dcc, html  # Componentes y callbacks de Dash.
+
+from src.auth import is_authenticated  # Sesión iniciada en el servidor.
+from src.components.table import create_paged_table  # Tabla paginada en el servidor.
+from src.profiling import stage  # Instrumentación opcional.
+
+ALL_TYPES = ''  # Valor del desplegable para buscar en todos los tipos de documento.
+
+
+def create_affiliate_content(title='Consulta de Afiliados'):
+    # Página con el buscador; los tipos de documento salen del consolidado.
+    from src.data.sample_data import get_doc_types, has_affiliates
+    if not has_affiliates():
+        cuerpo = dbc.Alert("La consulta de afiliados necesita el consolidado (proveedor Parquet o CSV).", color="warning")
+    else:
+        with stage('data'):
+            tipos = get_doc_types()
+        cuerpo = [
+            dbc.Row([
+                dbc.Col(dcc.Dropdown(  # Tipo de documento (o todos).
+                    id='afiliado-tipo',
+                    options=[{'label': 'Todos los tipos', 'value': ALL_TYPES}] + [{'label': t, 'value': t} for t in tipos],
+                    value=ALL_TYPES,
+                    clearable=False,
+                ), md=3),
+                dbc.Col(dbc.Input(  # Número de documento; Enter también busca.
+                    id='afiliado-doc', type='text', inputMode='numeric', placeholder='Número de documento',
+                ), md=5),
+                dbc.Col(dbc.Button("Buscar", id='afiliado-buscar', color="primary"), md=2),
+            ], className="g-2"),
+            html.Div(id='afiliado-resultado', className="mt-4"),  # Registros del afiliado.
+        ]
+    return dbc.Container([
+        html.H2(title, className="text-center mb-4"),  # Título de la página, centrado.
+        dbc.Card(dbc.CardBody(cuerpo), className="shadow-sm"),  # Tarjeta con el buscador y el resultado.
+    ])
+
+
+def affiliate_results(tip_doc, doc):
+    # Tabla con las novedades y glosas del afiliado, o un aviso si el documento no es válido o no tiene registros.
+    doc = (doc or '').strip()
+    if not doc.isdecimal():  # isdigit acepta caracteres como '²', que int() rechaza.
+        return dbc.Alert("Escriba el número de documento (solo dígitos).", color="warning")
+    from src.data.sample_data import affiliate_key, get_affiliate_source
+    clave = affiliate_key(tip_doc, doc)
+    fuente = get_affiliate_source(clave)
+    if not len(fuente):
+        return dbc.Alert(f"No hay novedades para el documento {doc}.", color="info")
+    return html.Div([
+        html.H5(f"{len(fuente):,} registros".replace(',', '.')),
+        create_paged_table('afiliados', clave, fuente.columns(), search='obs_glos'),  # Novedades y glosas, paginadas en el servidor.
+    ])
+
+
+def register_affiliate_callbacks(app):
+    # Búsqueda de un afiliado con el botón o con Enter en el número de documento.
+    @callback(
+        Output('afiliado-resultado', 'children'),
+        [Input('afiliado-buscar', 'n_clicks'),
+         Input('afiliado-doc', 'n_submit')],
+        [State('afiliado-tipo', 'value'),
+         State('afiliado-doc', 'value')],
+        prevent_initial_call=True
+    )
+    def search_affiliate(n_clicks, n_submit, tip_doc, doc):
+        if not is_authenticated():
+            return dbc.Alert("Inicie sesión para consultar afiliados.", color="danger")
+        return affiliate_results(tip_doc, doc)
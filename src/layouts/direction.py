@@ -1,16 +1,24 @@
 # -----------------------------------------------------------------------------
 # Descripción del Código:
-# Este código define una función llamada `create_direction_content`, la cual genera 
-# el contenido para una página de un área o dirección específica. La función crea 
-# dos gráficos interactivos con Plotly: un gráfico de líneas con área que muestra 
-# los casos mensuales, y un gráfico de barras apiladas que muestra el estado de los 
-# casos (resueltos y pendientes). Además, se presenta una tabla con indicadores de gestión.
+# Este código define una función llamada `create_direction_content`, la cual genera
+# el contenido para una página de un área o dirección específica. La función crea
+# dos gráficos interactivos con Plotly: un gráfico de líneas con área que muestra
+# los casos mensuales, y un gráfico de barras apiladas que muestra el estado de los
+# casos (resueltos y pendientes). Además, se presenta una tabla con indicadores de gestión
+# y, si el proveedor tiene el consolidado, una tabla con los registros de la dirección.
+# Las dos tablas se paginan, filtran y ordenan en el servidor (src/components/table.py).
+#
+# Las figuras se arman directamente como diccionarios JSON de Plotly (sin pasar por
+# los validadores de `go.Figure`) y, junto con las columnas de la tabla, se guardan en una caché por
+# dirección. La caché se vacía cuando cambia la versión de los datos del proveedor,
+# así que cambiar de página solo consulta la caché.
 #
 # Fuentes de Información:
-# - Los datos para los gráficos se obtienen a través de la función `get_sample_data` 
+# - Los datos para los gráficos se obtienen a través de la función `get_sample_data`
 #   de `src.data.sample_data`, que toma un parámetro `direction`.
-# - Los gráficos se generan usando la biblioteca Plotly.
-# 
+# - La plantilla visual 'plotly_white' se convierte a JSON una sola vez
+#   (src/components/charts.py, que también reduce las series largas y usa WebGL).
+#
 # Información Enviada:
 # - La función devuelve un layout con los gráficos generados y una tabla con los datos.
 #
@@ -19,43 +27,115 @@
 #   y `title`, que es el título de la página que se muestra.
 # -----------------------------------------------------------------------------
 
+import threading  # Bloqueo para el cambio de versión de la caché.
+
 import dash_bootstrap_components as dbc  # Se importa Dash Bootstrap Components para crear componentes con Bootstrap.
 from dash import html, dcc  # Se importan componentes HTML y gráficos de Dash.
-import plotly.graph_objects as go  # Se importa Plotly para crear gráficos.
-from src.data.sample_data import get_sample_data  # Se importa la función para obtener los datos de ejemplo.
 
-def create_direction_content(direction, title):
-    # Obtención de los datos de ejemplo para la dirección especificada.
+from config.settings import CACHE_TTL  # Tiempo de vida de las entradas en caché.
+from src.components.charts import MARGIN, line_trace, template_json  # Figuras como diccionarios.
+from src.components.table import create_paged_table  # Tablas paginadas en el servidor.
+from src.data.cache import DataCache, shared_store  # Caché TTL + LRU con contadores.
+from src.data.sample_data import (  # Se importan las funciones de datos.
+    get_data_version, get_kpi_source, get_records_source, get_sample_data, has_records,
+)
+from src.profiling import register_metrics_source, stage  # Instrumentación opcional.
+
+_payloads = DataCache(maxsize=64, ttl=CACHE_TTL, shared=shared_store('figuras', CACHE_TTL))  # Figuras y tabla listas por dirección.
+_payloads_version = None  # Versión de datos con la que se construyeron las entradas.
+_version_lock = threading.Lock()
+
+
+def _build_payload(direction, title):
+    # Construye las dos figuras (como diccionarios) y las columnas de las tablas de la dirección.
     df = get_sample_data(direction)
-    
-    # Gráfico de líneas con área que muestra los casos mensuales.
-    fig1 = go.Figure()
-    fig1.add_trace(go.Scatter(
-        x=df['Mes'],  # Meses en el eje X.
-        y=df['Casos'],  # Casos totales en el eje Y.
-        fill='tonexty',  # Relleno debajo de la línea.
-        name='Casos Totales',  # Nombre de la serie.
-        line=dict(color='#18BC9C')  # Color de la línea.
-    ))
-    fig1.update_layout(
-        title=f'Casos Mensuales - {title}',  # Título dinámico con el nombre de la dirección.
-        template='plotly_white',  # Plantilla de gráfico blanco.
-        height=400,  # Altura del gráfico.
-        margin=dict(l=40, r=40, t=40, b=40)  # Márgenes del gráfico.
-    )
-
-    # Gráfico de barras apiladas mostrando el estado de los casos (resueltos y pendientes).
-    fig2 = go.Figure(data=[
-        go.Bar(name='Resueltos', x=df['Mes'], y=df['Resueltos'], marker_color='#2C3E50'),  # Casos resueltos.
-        go.Bar(name='Pendientes', x=df['Mes'], y=df['Pendientes'], marker_color='#E74C3C')  # Casos pendientes.
-    ])
-    fig2.update_layout(
-        barmode='stack',  # Apilar las barras.
-        title='Estado de Casos',  # Título del gráfico.
-        template='plotly_white',  # Plantilla de gráfico blanco.
-        height=400,  # Altura del gráfico.
-        margin=dict(l=40, r=40, t=40, b=40)  # Márgenes del gráfico.
-    )
+    meses = df['Mes'].tolist()
+
+    with stage('figure'):
+        # Gráfico de líneas con área que muestra los casos mensuales.
+        fig1 = {
+            'data': [line_trace(
+                meses,  # Meses en el eje X.
+                df['Casos'],  # Casos totales en el eje Y.
+                name='Casos Totales',  # Nombre de la serie.
+                mode='lines+markers',  # Línea con marcadores (las series mensuales son cortas).
+                fill='tonexty',  # Relleno debajo de la línea.
+                line={'color': '#18BC9C'},  # Color de la línea.
+            )],
+            'layout': {
+                'title': {'text': f'Casos Mensuales - {title}'},  # Título dinámico con el nombre de la dirección.
+                'template': template_json(),  # Plantilla de gráfico blanco.
+                'height': 400,  # Altura del gráfico.
+                'margin': MARGIN,  # Márgenes del gráfico.
+            },
+        }
+
+        # Gráfico de barras apiladas mostrando el estado de los casos (resueltos y pendientes).
+        fig2 = {
+            'data': [
+                {'type': 'bar', 'name': 'Resueltos', 'x': meses, 'y': df['Resueltos'].tolist(),
+                 'marker': {'color': '#2C3E50'}},  # Casos resueltos.
+                {'type': 'bar', 'name': 'Pendientes', 'x': meses, 'y': df['Pendientes'].tolist(),
+                 'marker': {'color': '#E74C3C'}},  # Casos pendientes.
+            ],
+            'layout': {
+                'barmode': 'stack',  # Apilar las barras.
+                'title': {'text': 'Estado de Casos'},  # Título del gráfico.
+                'template': template_json(),  # Plantilla de gráfico blanco.
+                'height': 400,  # Altura del gráfico.
+                'margin': MARGIN,  # Márgenes del gráfico.
+            },
+        }
+
+    # Columnas de la tabla de indicadores y de la tabla de registros (si el proveedor los tiene).
+    columnas_kpi = get_kpi_source(direction).columns()
+    columnas_registros = get_records_source(direction).columns() if has_records() else None
+    return fig1, fig2, columnas_kpi, columnas_registros
+
+
+def get_direction_payload(direction, title):
+    # Devuelve (figura de casos, figura de estado, columnas de indicadores, columnas de registros) desde la caché.
+    # Si la versión de los datos cambió, se descartan todas las entradas anteriores.
+    global _payloads_version
+    version = get_data_version()
+    with _version_lock:
+        if version != _payloads_version:
+            _payloads.clear()
+            _payloads_version = version
+    return _payloads.get_or_load((direction, title, version), lambda: _build_payload(direction, title))
+
+
+def payload_cache_stats():
+    # Aciertos y fallos de la caché de figuras.
+    return _payloads.stats()
+
+
+register_metrics_source('figuras', payload_cache_stats)  # Visible en /metrics (DASH_PROFILING=1).
+
+
+def create_direction_content(direction, title):
+    # Obtención de las figuras y las columnas ya construidas para la dirección especificada.
+    fig1, fig2, columnas_kpi, columnas_registros = get_direction_payload(direction, title)
+    with stage('layout'):
+        return _direction_layout(title, direction, fig1, fig2, columnas_kpi, columnas_registros)
+
+
+def _direction_layout(title, direction, fig1, fig2, columnas_kpi, columnas_registros):
+    # Componentes de la página con las figuras y las columnas ya construidas.
+    # Tabla de registros del consolidado, solo si el proveedor los tiene.
+    registros = []
+    if columnas_registros is not None:
+        registros = [dbc.Row([
+            dbc.Col(
+                dbc.Card([
+                    dbc.CardHeader(html.H5("Registros")),  # Encabezado de la tarjeta.
+                    dbc.CardBody([
+                        create_paged_table('registros', direction, columnas_registros, search='obs_glos')  # Registros paginados, con búsqueda en las glosas.
+                    ])
+                ], className="shadow-sm mt-4"),
+                md=12
+            )
+        ])]
 
     # Creación del layout con los gráficos y la tabla.
     return dbc.Container([
@@ -85,19 +165,12 @@ def create_direction_content(direction, title):
                         dbc.Card([  # Tarjeta para contener la tabla.
                             dbc.CardHeader(html.H5("Indicadores de Gestión")),  # Encabezado de la tarjeta.
                             dbc.CardBody([  # Cuerpo de la tarjeta.
-                                dbc.Table.from_dataframe(  # Creación de la tabla a partir del DataFrame.
-                                    df,
-                                    striped=True,  # Filas con rayas.
-                                    bordered=True,  # Bordes en la tabla.
-                                    hover=True,  # Resaltado de las filas al pasar el ratón.
-                                    responsive=True,  # Tabla adaptativa al tamaño de pantalla.
-                                    className="mb-0"  # Clase de margen para la tabla.
-                                )
+                                create_paged_table('kpi', direction, columnas_kpi)  # Tabla de indicadores paginada en el servidor.
                             ])
                         ], className="shadow-sm"),  # Tarjeta con sombra.
                         md=12  # Columna de tamaño completo.
                     )
                 ])
-            ])
+            ] + registros)
         ])
     ])
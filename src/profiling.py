@@ -0,0 +1,282 @@
+# -----------------------------------------------------------------------------
+# Descripción del Código:
+# Este módulo agrega instrumentación opcional (DASH_PROFILING=1) a los callbacks
+# de la aplicación para saber en qué se va el tiempo de una página lenta:
+#
+# - Cada callback registrado se envuelve al llegar la primera solicitud: la etapa
+#   `callback` mide la función y la serialización de su respuesta, y la etapa
+#   `serialize` solo la conversión a JSON que hace Dash.
+# - El código de la aplicación marca sus propias etapas con `stage(...)`: `data`
+#   (lectura de datos y caché), `figure` (armado de las figuras) y `layout`
+#   (construcción de los componentes de la página). Las etapas se pueden anidar.
+# - Cada respuesta lleva el encabezado `Server-Timing` con la duración de cada
+#   etapa y del total; las herramientas del navegador (pestaña Red > Tiempos) lo
+#   muestran junto al tiempo de red, así que la diferencia es la red y el navegador.
+# - Con DASH_PROFILING_MEMORY=1 se mide además la memoria asignada por etapa
+#   (pico sobre el inicio de la etapa) con `tracemalloc`. Es aproximado con varios
+#   hilos, porque tracemalloc cuenta las asignaciones de todo el proceso.
+# - Las mediciones se guardan en histogramas de ventana móvil (las últimas
+#   DASH_PROFILING_WINDOW por callback y etapa) que devuelve `/metrics` en JSON,
+#   junto con las estadísticas de las cachés registradas. Las métricas son del
+#   proceso: con gunicorn cada worker responde las suyas (se incluye el pid).
+# - Con DASH_PROFILE_SLOWEST=N cada solicitud se perfila con cProfile y se guardan
+#   en DASH_PROFILE_DIR los perfiles de las N más lentas (archivos .prof que se
+#   abren con `python -m pstats` o snakeviz).
+#
+# Información Recibida:
+# - La aplicación Dash y los nombres de las etapas que marca el código.
+#
+# Información Enviada:
+# - Encabezado `Server-Timing`, la ruta `/metrics` y los perfiles en disco.
+# -----------------------------------------------------------------------------
+
+import cProfile  # Perfiles de las solicitudes más lentas.
+import functools  # Envoltura de los callbacks.
+import heapq  # Solicitudes más lentas.
+import os  # Carpeta de los perfiles y pid del proceso.
+import threading  # Acceso concurrente a las métricas.
+import time  # Medición de tiempos.
+import tracemalloc  # Memoria asignada por etapa.
+from collections import deque  # Ventana móvil de mediciones.
+from contextlib import contextmanager  # Etapas con `with`.
+
+from flask import g, has_request_context, jsonify, request  # Estado de la solicitud actual.
+
+from config.settings import (  # Parámetros de la instrumentación.
+    PROFILE_DIR, PROFILE_SLOWEST, PROFILING, PROFILING_MEMORY, PROFILING_WINDOW,
+)
+
+BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)  # Límites de los histogramas (ms).
+INSTRUMENTED_PATHS = ('_dash-update-component', '_dash-layout')  # Solicitudes que se miden.
+
+_histograms = {}  # 'callback.etapa' -> RollingHistogram.
+_metric_sources = {}  # Nombre -> función que devuelve estadísticas (por ejemplo, de una caché).
+_slowest = []  # Montículo de (ms, ruta del perfil) con las solicitudes más lentas.
+_lock = threading.Lock()
+
+
+class RollingHistogram:
+    # Mediciones de una métrica en una ventana móvil (las últimas `window`).
+
+    def __init__(self, window=PROFILING_WINDOW):
+        self.durations = deque(maxlen=window)  # Milisegundos.
+        self.allocations = deque(maxlen=window)  # Bytes (solo con tracemalloc).
+        self.count = 0  # Mediciones desde que inició el proceso.
+
+    def add(self, ms, allocated=None):
+        self.durations.append(ms)
+        if allocated is not None:
+            self.allocations.append(allocated)
+        self.count += 1
+
+    def summary(self):
+        # Percentiles, máximo e histograma de la ventana.
+        import numpy as np  # Solo se importa al consultar /metrics.
+        ms = np.asarray(self.durations, dtype='float64')
+        if not len(ms):
+            return {'count': self.count, 'window': 0}
+        conteos = np.histogram(ms, bins=(0,) + BUCKETS_MS + (np.inf,))[0]
+        etiquetas = [f"<={b}" for b in BUCKETS_MS] + [f">{BUCKETS_MS[-1]}"]
+        resumen = {
+            'count': self.count,
+            'window': len(ms),
+            'p50_ms': round(float(np.percentile(ms, 50)), 3),
+            'p95_ms': round(float(np.percentile(ms, 95)), 3),
+            'p99_ms': round(float(np.percentile(ms, 99)), 3),
+            'mean_ms': round(float(ms.mean()), 3),
+            'max_ms': round(float(ms.max()), 3),
+            'buckets_ms': [[e, n] for e, n in zip(etiquetas, conteos.tolist())],  # En orden (JSON ordena las claves).
+        }
+        if self.allocations:
+            memoria = np.asarray(self.allocations, dtype='float64')
+            resumen['alloc_p50_bytes'] = int(np.percentile(memoria, 50))
+            resumen['alloc_max_bytes'] = int(memoria.max())
+        return resumen
+
+
+def register_metrics_source(name, func):
+    # Registra estadísticas adicionales que muestra `/metrics` (por ejemplo, `cache_stats`).
+    _metric_sources[name] = func
+
+
+def _current():
+    # Registro de la solicitud actual (None fuera de una solicitud instrumentada).
+    return g.get('_perf') if has_request_context() else None
+
+
+def _enter(registro):
+    # Inicio de una etapa: tiempo y memoria de partida.
+    marco = {'inicio': time.perf_counter(), 'base': 0, 'pico': 0}
+    if registro['memoria']:
+        actual, pico = tracemalloc.get_traced_memory()
+        for padre in registro['pila']:  # El pico acumulado se guarda antes de reiniciarlo.
+            padre['pico'] = max(padre['pico'], pico)
+        tracemalloc.reset_peak()
+        marco['base'] = actual
+    registro['pila'].append(marco)
+    return marco
+
+
+def _exit(registro, nombre, marco):
+    # Fin de una etapa: suma su duración (una etapa puede repetirse) y guarda su memoria máxima.
+    duracion = time.perf_counter() - marco['inicio']
+    registro['pila'].remove(marco)
+    asignado = None
+    if registro['memoria']:
+        asignado = max(marco['pico'], tracemalloc.get_traced_memory()[1]) - marco['base']
+    anterior = registro['etapas'].get(nombre, (0.0, None))
+    if asignado is not None and anterior[1] is not None:
+        asignado = max(asignado, anterior[1])
+    registro['etapas'][nombre] = (anterior[0] + duracion, asignado)
+
+
+@contextmanager
+def stage(name):
+    # Marca una etapa de la solicitud actual. Sin instrumentación no hace nada.
+    registro = _current()
+    if registro is None:
+        yield
+        return
+    marco = _enter(registro)
+    try:
+        yield
+    finally:
+        _exit(registro, name, marco)
+
+
+def _profiled_callback(func):
+    # Envoltura de un callback registrado: nombre del callback y etapa `callback`.
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        registro = _current()
+        if registro is not None:
+            registro['nombre'] = func.__name__
+        with stage('callback'):
+            return func(*args, **kwargs)
+    wrapper._profiled = True
+    return wrapper
+
+
+def _profiled_to_json(to_json):
+    # Serialización de la respuesta de un callback como etapa `serialize`.
+    @functools.wraps(to_json)
+    def wrapper(*args, **kwargs):
+        with stage('serialize'):
+            return to_json(*args, **kwargs)
+    wrapper._profiled = True
+    return wrapper
+
+
+def _wrap_callbacks(app):
+    # Envuelve los callbacks de la aplicación que todavía no están instrumentados.
+    # Se hace en cada solicitud porque Dash agrega los callbacks globales en la primera.
+    # Los callbacks del lado del cliente no tienen función en el servidor.
+    for cb in app.callback_map.values():
+        if 'callback' in cb and not getattr(cb['callback'], '_profiled', False):
+            cb['callback'] = _profiled_callback(cb['callback'])
+
+
+def _record(nombre, etapas):
+    # Guarda las mediciones de una solicitud en los histogramas.
+    with _lock:
+        for etapa, (duracion, asignado) in etapas.items():
+            clave = f"{nombre}.{etapa}"
+            if clave not in _histograms:
+                _histograms[clave] = RollingHistogram()
+            _histograms[clave].add(duracion * 1000, asignado)
+
+
+def _server_timing(nombre, etapas):
+    # Valor del encabezado Server-Timing: `etapa;dur=ms;desc="..."`.
+    partes = []
+    for etapa, (duracion, asignado) in etapas.items():
+        descripcion = [nombre] if etapa in ('callback', 'total') else []
+        if asignado is not None:
+            descripcion.append(f"{asignado / 1024:,.0f} KB")
+        parte = f"{etapa};dur={duracion * 1000:.2f}"
+        if descripcion:
+            parte += ';desc="' + ' '.join(descripcion).replace('"', "'") + '"'
+        partes.append(parte)
+    return ', '.join(partes)
+
+
+def _keep_profile(profiler, ms, nombre):
+    # Guarda el perfil si la solicitud está entre las N más lentas y borra el que sale.
+    with _lock:
+        if len(_slowest) >= PROFILE_SLOWEST and ms <= _slowest[0][0]:
+            return
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        ruta = os.path.join(PROFILE_DIR, f"{ms:.0f}ms_{nombre}_{os.getpid()}_{time.time_ns()}.prof")
+        profiler.dump_stats(ruta)
+        heapq.heappush(_slowest, (ms, ruta))
+        if len(_slowest) > PROFILE_SLOWEST:
+            _, vieja = heapq.heappop(_slowest)
+            try:
+                os.remove(vieja)
+            except OSError:
+                pass
+
+
+def metrics_snapshot():
+    # Estado de las métricas del proceso.
+    with _lock:
+        callbacks = {clave: h.summary() for clave, h in sorted(_histograms.items())}
+        lentas = [{'ms': round(ms, 3), 'profile': ruta} for ms, ruta in sorted(_slowest, reverse=True)]
+    return {
+        'pid': os.getpid(),
+        'memory_tracing': tracemalloc.is_tracing(),
+        'callbacks': callbacks,
+        'caches': {nombre: func() for nombre, func in _metric_sources.items()},
+        'slowest_profiles': lentas,
+    }
+
+
+def register_profiling(app):
+    # Instrumenta la aplicación si DASH_PROFILING=1.
+    if not PROFILING:
+        return
+    import dash._callback as dash_callback  # Serialización de las respuestas de los callbacks.
+    if not getattr(dash_callback.to_json, '_profiled', False):
+        dash_callback.to_json = _profiled_to_json(dash_callback.to_json)
+    if PROFILING_MEMORY and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    prefijo = app.config.routes_pathname_prefix
+
+    @app.server.before_request
+    def start_profiling():
+        # Se registra después del `_setup_server` de Dash, así que los callbacks ya están en `callback_map`.
+        if not request.path.startswith(prefijo) or request.path[len(prefijo):] not in INSTRUMENTED_PATHS:
+            return
+        _wrap_callbacks(app)
+        registro = {'nombre': request.path[len(prefijo):], 'etapas': {}, 'pila': [],
+                    'memoria': tracemalloc.is_tracing(), 'perfil': None}
+        if PROFILE_SLOWEST > 0:
+            perfil = cProfile.Profile()
+            try:
+                perfil.enable()
+                registro['perfil'] = perfil
+            except ValueError:  # Otro perfilador activo en el proceso.
+                pass
+        g._perf = registro
+        registro['total'] = _enter(registro)
+
+    @app.server.after_request
+    def finish_profiling(response):
+        registro = g.pop('_perf', None)
+        if registro is None:
+            return response
+        if registro['perfil'] is not None:
+            registro['perfil'].disable()
+        _exit(registro, 'total', registro['total'])
+        etapas = registro['etapas']
+        total_ms = etapas['total'][0] * 1000
+        _record(registro['nombre'], etapas)
+        response.headers['Server-Timing'] = _server_timing(registro['nombre'], etapas)
+        if registro['perfil'] is not None:
+            _keep_profile(registro['perfil'], total_ms, registro['nombre'])
+        return response
+
+    @app.server.route(prefijo + 'metrics')
+    def metrics():
+        # Métricas del proceso en JSON (solo existe con DASH_PROFILING=1).
+        return jsonify(metrics_snapshot())
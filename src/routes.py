@@ -0,0 +1,118 @@
+# -----------------------------------------------------------------------------
+# Descripción del Código:
+# Este módulo define la tabla de rutas de la aplicación: cada ruta (pathname)
+# se asocia con la clave de su dirección y con el título de la página. Con esta
+# tabla `display_page` elige la página con una consulta a un diccionario en lugar
+# de una cadena de condicionales.
+#
+# Las partes estáticas se construyen una sola vez al iniciar la aplicación
+# (`build_static_layouts`): la barra de navegación, la tarjeta de inicio de sesión
+# y las páginas sin datos (inicio). La consulta de afiliados (`PAGE_BUILDERS`) y las
+# páginas de las direcciones se arman en cada
+# solicitud a partir de las figuras y la tabla que ya están en caché
+# (ver src/layouts/direction.py). Ese módulo, con pandas, pyarrow y los datos, se
+# importa con la primera página de una dirección (o en el precalentamiento,
+# `warm_up_routes`), no al iniciar la aplicación.
+#
+# Información Recibida:
+# - `pathname`: Ruta actual de la URL.
+#
+# Información Enviada:
+# - El contenido de la página de la ruta, la barra de navegación y la tarjeta de
+#   inicio de sesión ya construidas.
+# -----------------------------------------------------------------------------
+
+import dash_bootstrap_components as dbc  # Componentes de diseño de Bootstrap.
+from dash import html  # Componentes HTML de Dash.
+
+from src.components.login import create_login_card  # Tarjeta de inicio de sesión.
+from src.components.navbar import create_navbar  # Barra de navegación.
+from src.components.table import register_table_source  # Fuentes de las tablas paginadas.
+from src.layouts.affiliates import create_affiliate_content  # Consulta de afiliados.
+from src.layouts.home import create_home_content  # Contenido de la página de inicio.
+
+DEFAULT_ROUTE = '/'  # Ruta que se muestra cuando la URL no está registrada.
+
+# Tabla de rutas: pathname -> dirección (None si la página no depende de datos) y título.
+ROUTES = {
+    '/': {'direction': None, 'title': 'Inicio'},
+    '/juridica': {'direction': 'juridica', 'title': 'Oficina Asesora Jurídica'},
+    '/control-interno': {'direction': 'control', 'title': 'Oficina de Control Interno'},
+    '/administrativa': {'direction': 'administrativa', 'title': 'Dirección Administrativa y Financiera'},
+    '/salud-publica': {'direction': 'salud', 'title': 'Dirección de Salud Pública'},
+    '/seguridad-social': {'direction': 'seguridad', 'title': 'Dirección de Seguridad Social'},
+    '/aseguramiento': {'direction': 'aseguramiento', 'title': 'Dirección de Aseguramiento'},
+    '/afiliados': {'direction': None, 'title': 'Consulta de Afiliados'},
+}
+
+# Constructores de las páginas estáticas (sin datos) por ruta.
+STATIC_BUILDERS = {
+    '/': create_home_content,
+}
+
+# Constructores de las páginas sin dirección que dependen de datos (se arman en cada solicitud).
+PAGE_BUILDERS = {
+    '/afiliados': create_affiliate_content,
+}
+
+# Fuentes de las tablas paginadas de las direcciones (la clave es la dirección) y de los
+# afiliados (la clave es 'tipo|documento').
+# Se registran como texto para no importar los datos hasta que se pida una página.
+register_table_source('kpi', 'src.data.sample_data:get_kpi_source')
+register_table_source('registros', 'src.data.sample_data:get_records_source', private=True)  # Documentos y glosas: solo con sesión.
+register_table_source('afiliados', 'src.data.sample_data:get_affiliate_source', private=True)  # Datos personales: solo con sesión.
+
+_static_pages = {}  # Páginas estáticas ya construidas por ruta.
+_navbar = None  # Barra de navegación construida una vez.
+_login = None  # Contenedor de la tarjeta de inicio de sesión construido una vez.
+
+
+def build_static_layouts():
+    # Construye una sola vez las partes estáticas de la aplicación.
+    global _navbar, _login
+    _navbar = create_navbar()
+    _login = dbc.Container(
+        dbc.Row(
+            dbc.Col(create_login_card(), md=6, lg=4),  # Se crea la tarjeta de login en una columna centrada.
+            justify="center",  # Justifica la columna al centro.
+            align="center",  # Alinea el contenido al centro.
+            style={"minHeight": "100vh"}  # Se asegura de que la altura mínima sea completa en la pantalla.
+        )
+    )
+    for path, builder in STATIC_BUILDERS.items():
+        _static_pages[path] = builder()
+
+
+def get_navbar():
+    # Barra de navegación ya construida.
+    return _navbar
+
+
+def get_login_layout():
+    # Tarjeta de inicio de sesión ya construida.
+    return _login
+
+
+def resolve_route(pathname):
+    # Ruta registrada para el pathname; las rutas desconocidas van a la de inicio.
+    return pathname if pathname in ROUTES else DEFAULT_ROUTE
+
+
+def render_route(pathname):
+    # Contenido de la página: estático desde la caché o con los datos de la dirección.
+    path = resolve_route(pathname)
+    if path in _static_pages:
+        return _static_pages[path]
+    route = ROUTES[path]
+    if path in PAGE_BUILDERS:
+        return PAGE_BUILDERS[path](route['title'])
+    from src.layouts.direction import create_direction_content  # Se importa con la primera página de una dirección.
+    return create_direction_content(route['direction'], route['title'])
+
+
+def warm_up_routes():
+    # Precalentamiento: importa las páginas de las direcciones y deja sus figuras en caché.
+    from src.layouts.direction import get_direction_payload
+    for route in ROUTES.values():
+        if route['direction'] is not None:
+            get_direction_payload(route['direction'], route['title'])
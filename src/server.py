@@ -0,0 +1,152 @@
+# -----------------------------------------------------------------------------
+# Descripción del Código:
+# Este módulo ajusta el servidor Flask de la aplicación Dash para producción:
+# agrega encabezados de caché de larga duración a los archivos de la carpeta de
+# assets. Dash agrega a cada URL de asset la fecha de modificación del archivo
+# (`?m=...`), así que el navegador puede guardarlos como inmutables: si el archivo
+# cambia, cambia la URL.
+#
+# La compresión gzip/brotli de las respuestas la hace Flask-Compress (`compress=True`
+# al crear la aplicación) y los paquetes JS de Dash ya se sirven con huella y caché.
+#
+# Los assets construidos con `scripts/build_assets.py` (Bootstrap y Font Awesome en
+# `assets/vendor/`) llevan la huella del contenido en el nombre y ya vienen
+# comprimidos: se envía el `.br` o el `.gz` según `Accept-Encoding`, sin comprimir en
+# cada solicitud, y siempre como inmutables.
+#
+# También registra la ruta de exportación de los datasets del almacén:
+#
+#     /export/<dataset>.<formato>?anio=2023&mes=1,2&direccion=juridica&dep=05&nov=N01&glosa=GN0031
+#
+# - dataset: 'consolidado' (DATASET_CONSOLIDADO) o 'novedades' (DATASET_NOVEDADES).
+# - formato: csv, csv.gz o parquet. Parámetro opcional `columnas` (separadas por coma).
+# - La respuesta se envía por bloques a medida que se lee el dataset (src/data/export.py).
+# - Mientras se envía, la exportación se guarda en EXPORT_DIR; las descargas
+#   reanudadas (`Range`) y las repetidas se sirven desde ese archivo.
+# - Se pide usuario y contraseña (HTTP Basic) con las mismas credenciales del login,
+#   salvo que la sesión ya esté iniciada.
+#
+# Información Recibida:
+# - La instancia de la aplicación Dash.
+#
+# Información Enviada:
+# - Respuestas de los assets con `Cache-Control: public, max-age=..., immutable`
+#   (las de `assets/vendor/` precomprimidas).
+# - Archivos exportados en CSV, CSV comprimido o Parquet.
+# -----------------------------------------------------------------------------
+
+import mimetypes  # Tipo de los assets precomprimidos.
+import os  # Rutas de los datasets y de las exportaciones.
+import threading  # Una sola generación por exportación en el proceso.
+
+from flask import Response, abort, request, send_file  # Solicitud y respuestas de Flask.
+from werkzeug.security import safe_join  # Rutas de los assets dentro de su carpeta.
+
+from config.settings import (  # Caché de los assets y exportaciones.
+    ASSETS_MAX_AGE, DATASET_CONSOLIDADO, DATASET_NOVEDADES, EXPORT_DIR, EXPORT_MAX_AGE, VENDOR_DIR,
+)
+from src.auth import is_authenticated, valid_credentials  # Sesión iniciada y credenciales del login.
+
+# Versiones precomprimidas en orden de preferencia: codificación -> extensión.
+PRECOMPRESSED = (('br', '.br'), ('gzip', '.gz'))
+
+# Datasets que se pueden exportar: nombre en la URL -> nombre en el almacén.
+EXPORT_DATASETS = {
+    'consolidado': DATASET_CONSOLIDADO,
+    'novedades': DATASET_NOVEDADES,
+}
+
+_export_locks = {}  # Clave de la exportación -> bloqueo mientras se genera el archivo.
+_export_locks_lock = threading.Lock()
+
+
+def register_server_hooks(app):
+    # Registra los ajustes del servidor Flask de la aplicación.
+    prefijo = app.config.requests_pathname_prefix + app.config.assets_url_path.strip('/') + '/'
+
+    @app.server.after_request
+    def add_cache_headers(response):
+        # Los assets con versión en la URL se guardan en el navegador sin volver a validarse.
+        if response.status_code == 200 and request.path.startswith(prefijo) and 'm' in request.args:
+            response.headers['Cache-Control'] = f"public, max-age={ASSETS_MAX_AGE}, immutable"
+        return response
+
+    carpeta = os.path.join(app.config.assets_folder, VENDOR_DIR)
+    ruta_assets = app.config.routes_pathname_prefix + app.config.assets_url_path.strip('/')
+
+    # Ruta más específica que la de assets de Dash: Flask la elige para los archivos de vendor/.
+    @app.server.route(f"{ruta_assets}/{VENDOR_DIR}/<path:nombre>")
+    def vendor_asset(nombre):
+        ruta = safe_join(carpeta, nombre)
+        if ruta is None or not os.path.isfile(ruta):
+            abort(404)
+        tipo = mimetypes.guess_type(nombre)[0] or 'application/octet-stream'
+        for codificacion, extension in PRECOMPRESSED:
+            if codificacion in request.accept_encodings and os.path.isfile(ruta + extension):
+                # Con Content-Encoding ya definido, Flask-Compress no vuelve a comprimir.
+                response = send_file(ruta + extension, mimetype=tipo, conditional=True, max_age=ASSETS_MAX_AGE)
+                response.headers['Content-Encoding'] = codificacion
+                break
+        else:
+            response = send_file(ruta, mimetype=tipo, conditional=True, max_age=ASSETS_MAX_AGE)
+        response.headers['Vary'] = 'Accept-Encoding'
+        response.headers['Cache-Control'] = f"public, max-age={ASSETS_MAX_AGE}, immutable"  # El nombre lleva la huella.
+        return response
+
+
+def _authorized():
+    # Credenciales HTTP Basic iguales a las del login, o la sesión ya iniciada en el navegador.
+    auth = request.authorization
+    return is_authenticated() or bool(auth and valid_credentials(auth.username, auth.password))
+
+
+def _export_lock(clave):
+    with _export_locks_lock:
+        return _export_locks.setdefault(clave, threading.Lock())
+
+
+def register_export_routes(app):
+    # Registra la ruta /export/<dataset>.<formato>.
+    prefijo = app.config.routes_pathname_prefix
+
+    @app.server.route(prefijo + 'export/<nombre>')
+    def export_dataset(nombre):
+        from src.data import export  # pyarrow se importa con la primera exportación.
+        from src.data.store import dataset_path
+
+        if not _authorized():
+            return Response('Se requieren credenciales', 401, {'WWW-Authenticate': 'Basic realm="export"'})
+        dataset, _, fmt = nombre.partition('.')
+        if dataset not in EXPORT_DATASETS or fmt not in export.EXPORT_FORMATS:
+            abort(404)
+        root = dataset_path(EXPORT_DATASETS[dataset])
+        if not os.path.exists(root):
+            abort(404)
+        try:
+            filtros = export.parse_filters(request.args)
+            columnas = export.export_columns(root, export.split_values(request.args.get('columnas', '')))
+        except ValueError as error:
+            return Response(str(error), 400, mimetype='text/plain')
+
+        clave = export.export_key(root, fmt, filtros, columnas)
+        ruta = os.path.join(EXPORT_DIR, f"{clave}.{fmt}")
+        opciones = dict(mimetype=export.EXPORT_FORMATS[fmt], as_attachment=True, download_name=nombre,
+                        conditional=True, etag=clave, max_age=0)
+        if request.range is not None and not os.path.exists(ruta):
+            # Descarga reanudada sin archivo guardado: se genera completo en disco y se sirve el rango.
+            with _export_lock(clave):
+                if not os.path.exists(ruta):
+                    export.prune_exports(EXPORT_DIR, EXPORT_MAX_AGE)
+                    export.write_file(export.iter_export(root, fmt, filtros, columnas), ruta)
+        if os.path.exists(ruta):
+            return send_file(ruta, **opciones)  # Soporta Range, If-Range y ETag.
+
+        # Primera descarga: se envía por bloques y se guarda al mismo tiempo para las reanudaciones.
+        export.prune_exports(EXPORT_DIR, EXPORT_MAX_AGE)
+        bloques = export.tee_to_file(export.iter_export(root, fmt, filtros, columnas), ruta)
+        return Response(bloques, mimetype=export.EXPORT_FORMATS[fmt], headers={
+            'Content-Disposition': f'attachment; filename="{nombre}"',
+            'ETag': f'"{clave}"',
+            'Accept-Ranges': 'bytes',  # Las reanudaciones se sirven desde el archivo guardado.
+            'Cache-Control': 'no-cache',
+        })
@@ -0,0 +1,85 @@
+# -----------------------------------------------------------------------------
+# Descripción del Código:
+# Este módulo mide el arranque de la aplicación y ejecuta el precalentamiento
+# opcional. Las dependencias pesadas (pandas, pyarrow, Plotly) y los datos no se
+# cargan al importar la aplicación sino con la primera página que los necesita;
+# así un worker nuevo responde antes. Con DASH_WARMUP=1 esa carga se adelanta en
+# un hilo de fondo que se inicia cuando el servidor ya acepta conexiones (por
+# ejemplo, en `post_worker_init` de gunicorn), sin retrasar la primera respuesta.
+#
+# Se informan en la salida estándar, y en `/metrics` con DASH_PROFILING=1:
+# - El tiempo de importación de la aplicación.
+# - El tiempo hasta la primera respuesta, desde que se empezó a importar.
+# - La duración del precalentamiento.
+#
+# Información Recibida:
+# - La aplicación Dash y las tareas de precalentamiento registradas.
+#
+# Información Enviada:
+# - Los tiempos de arranque (`startup_stats`).
+# -----------------------------------------------------------------------------
+
+import os  # Pid del proceso.
+import threading  # Precalentamiento en segundo plano.
+import time  # Medición de tiempos.
+
+from config.settings import WARMUP  # Precalentamiento activado (DASH_WARMUP=1).
+
+_inicio = time.perf_counter()  # Se importa antes que el resto de la aplicación.
+_stats = {'import_seconds': None, 'first_response_seconds': None, 'warmup_seconds': None, 'warmup_errors': []}
+_warmups = []  # Tareas de precalentamiento: (nombre, función).
+_warmup_thread = None
+_lock = threading.Lock()
+
+
+def startup_stats():
+    # Tiempos de arranque del proceso.
+    return dict(_stats, pid=os.getpid())
+
+
+def mark_imported(name='app'):
+    # Registra el tiempo de importación de la aplicación.
+    _stats['import_seconds'] = round(time.perf_counter() - _inicio, 3)
+    print(f"[{os.getpid()}] {name} importada en {_stats['import_seconds']:.3f} s", flush=True)
+
+
+def register_startup_hooks(app):
+    # Registra el tiempo hasta la primera respuesta del servidor.
+    @app.server.after_request
+    def first_response(response):
+        if _stats['first_response_seconds'] is None:
+            with _lock:
+                if _stats['first_response_seconds'] is None:
+                    _stats['first_response_seconds'] = round(time.perf_counter() - _inicio, 3)
+                    print(f"[{os.getpid()}] Primera respuesta a {_stats['first_response_seconds']:.3f} s del inicio", flush=True)
+        return response
+
+
+def register_warmup(name, func):
+    # Agrega una tarea de precalentamiento (se ejecutan en el orden de registro).
+    _warmups.append((name, func))
+
+
+def _run_warmups():
+    inicio = time.perf_counter()
+    for nombre, func in _warmups:
+        try:
+            func()
+        except Exception as error:  # Un fallo del precalentamiento no debe detener el servidor.
+            _stats['warmup_errors'].append(f"{nombre}: {error}")
+            print(f"[{os.getpid()}] Precalentamiento '{nombre}' falló: {error}", flush=True)
+    _stats['warmup_seconds'] = round(time.perf_counter() - inicio, 3)
+    print(f"[{os.getpid()}] Precalentamiento terminado en {_stats['warmup_seconds']:.3f} s", flush=True)
+
+
+def start_warmup(force=False):
+    # Ejecuta las tareas de precalentamiento en un hilo de fondo (una vez por proceso).
+    # Solo con DASH_WARMUP=1, salvo que se pida con `force`.
+    global _warmup_thread
+    if not (WARMUP or force):
+        return None
+    with _lock:
+        if _warmup_thread is None:
+            _warmup_thread = threading.Thread(target=_run_warmups, name='warmup', daemon=True)
+            _warmup_thread.start()
+    return _warmup_thread
@@ -0,0 +1,48 @@
+import os
+
+from src.data import providers
+from src.data.cube import KpiCube, cube_path
+from src.data.pipeline import consolidate_folder
+from src.data.providers import KPI_SOURCE_COLUMNS, StoreProvider, monthly_kpis
+from src.data.store import read_dataset
+
+from test_pipeline import write_neg
+
+
+def test_kpis_count_records_not_glosas(tmp_path):
+    entrada, salida = tmp_path / 'entrada', tmp_path / 'dataset'
+    entrada.mkdir()
+    write_neg(entrada / 'NSEPS02501022023.NEG', [
+        (1, 'N01', 'GN0001(a);GN0002(b);GN0003(c);'),  # Un registro con tres glosas.
+        (2, 'N09', 'GN0004(d);'),
+        (3, 'N01', ''),  # Registro sin glosa: resuelto.
+        (4, 'N14', ''),
+    ])
+    consolidate_folder(str(entrada), str(salida), workers=1)
+
+    esperado = {'Mes': ['2023-02'], 'Casos': [4], 'Resueltos': [2], 'Pendientes': [2]}
+    cubo = KpiCube.from_dataset(str(salida))
+    assert cubo.monthly().to_dict('list') == esperado
+    assert monthly_kpis(read_dataset(str(salida), columns=KPI_SOURCE_COLUMNS)).to_dict('list') == esperado
+    # Con filtro de glosa se cuentan los registros que tienen esa glosa.
+    assert cubo.monthly(glosa='GN0002')['Casos'].tolist() == [1]
+    assert cubo.monthly(nov='N01').to_dict('list') == {'Mes': ['2023-02'], 'Casos': [2], 'Resueltos': [1], 'Pendientes': [1]}
+
+
+def test_direction_kpis_use_its_novelties_and_report_month(tmp_path, monkeypatch):
+    entrada, salida = tmp_path / 'entrada', tmp_path / 'dataset'
+    entrada.mkdir()
+    # Las novedades son de enero (fech_nov) y se reportan en febrero y marzo (fecha_rep).
+    write_neg(entrada / 'NSEPS02501022023.NEG', [(1, 'N01', 'GN0001(a);'), (2, 'N09', ''), (3, 'N14', '')])
+    write_neg(entrada / 'NSEPS02501032023.NEG', [(4, 'N01', ''), (5, 'N09', 'GN0002(b);')])
+    consolidate_folder(str(entrada), str(salida), workers=1)
+    monkeypatch.setattr(providers, 'NOVEDADES_POR_DIRECCION', {'juridica': ['N01'], 'control': []})
+
+    juridica = {'Mes': ['2023-02', '2023-03'], 'Casos': [1, 1], 'Resueltos': [0, 1], 'Pendientes': [1, 0]}
+    todas = {'Mes': ['2023-02', '2023-03'], 'Casos': [3, 2], 'Resueltos': [2, 1], 'Pendientes': [1, 1]}
+    proveedor = StoreProvider(str(salida))
+    assert proveedor.load('juridica').to_dict('list') == juridica
+    assert proveedor.load('control').to_dict('list') == todas  # Sin códigos: todas las novedades.
+    assert proveedor.records('juridica')['doc'].tolist() == [1, 4]
+    os.remove(cube_path(str(salida)))  # Sin cubo, el mismo resultado leyendo el consolidado.
+    assert StoreProvider(str(salida)).load('juridica').to_dict('list') == juridica
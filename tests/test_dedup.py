@@ -0,0 +1,29 @@
+import pandas as pd
+import pytest
+
+from src.data.dedup import FingerprintSet
+from src.data.pipeline import consolidate_folder
+from src.data.store import read_dataset
+
+from test_pipeline import write_neg
+
+
+@pytest.mark.parametrize('dedup', ['first', 'last'])
+def test_rows_without_doc_are_never_duplicates(tmp_path, dedup):
+    entrada, salida = tmp_path / 'entrada', tmp_path / 'dataset'
+    entrada.mkdir()
+    write_neg(entrada / 'NSEPS02501022023.NEG', [(1, 'N01', 'GN0001(a);'), ('', 'N01', 'GN0002(b);')])
+    write_neg(entrada / 'NSEPS02502022023.NEG', [(1, 'N01', 'GN0001(a);'), ('', 'N01', 'GN0003(c);')])
+
+    consolidate_folder(str(entrada), str(salida), workers=1, dedup=dedup)
+
+    df = read_dataset(str(salida), columns=['doc', 'obs_glos'])
+    assert (df['doc'] == 1).sum() == 1  # La novedad repetida se cuenta una vez.
+    assert sorted(df.loc[df['doc'].isna(), 'obs_glos'].astype(str)) == ['(b)', '(c)']
+
+
+def test_keep_without_rows(tmp_path):
+    conjunto = FingerprintSet(str(tmp_path))
+    conjunto.start('NSEPS02501022023.NEG', 'a')
+    vacio = pd.DataFrame({'tip_doc': [], 'doc': [], 'nov': [], 'fech_nov': []})
+    assert conjunto.keep(vacio).tolist() == []
@@ -0,0 +1,19 @@
+import pandas as pd
+
+from src.data import glosa_search
+from src.data.glosa_search import GlosaIndex
+
+
+def test_partial_word_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(glosa_search, 'PARTIAL_CACHE_SIZE', 4)
+    textos = pd.Series(['(CC|123|PEREZ)', '(F|RE|10/10/2017)', '(cnd_afl|01/11/2023)', None])
+    indice = GlosaIndex(textos.dropna().unique())
+    for i in range(20):  # Cada búsqueda trae una palabra parcial nueva.
+        indice.match(f"PERE{i % 10}")
+        indice.match(f"{i}")
+    assert len(indice._partial) <= 4
+
+    # El resultado no cambia aunque las palabras salgan de la caché.
+    for frase in ('pere', '10/10', 'AFL|01', '|'):
+        esperado = textos.dropna().str.contains(frase, case=False, regex=False).to_numpy()
+        assert indice.match(frase).tolist() == esperado.tolist()
@@ -0,0 +1,12 @@
+import pandas as pd
+
+from src.data.paging import MAX_PAGE_SIZE, FrameSource
+
+
+def test_page_size_and_page_are_bounded():
+    fuente = FrameSource(pd.DataFrame({'doc': range(1000)}))
+    filas, total = fuente.page(0, 10 ** 9)
+    assert len(filas) == MAX_PAGE_SIZE and total == 1000
+    assert fuente.page(-3, 10)[0] == fuente.page(0, 10)[0]
+    assert [f['doc'] for f in fuente.page(2, '5')[0]] == [10, 11, 12, 13, 14]
+    assert len(fuente.page(None, -5)[0]) == 1 and len(fuente.page('x', 'y')[0]) == 10
@@ -0,0 +1,31 @@
+import os
+
+from src.data.pipeline import consolidate_folder
+from src.data.store import read_dataset
+
+
+def write_neg(path, filas):
+    # Archivo .NEG con las columnas en sus posiciones (21 campos por línea).
+    with open(path, 'w', encoding='latin-1') as f:
+        for i, (doc, nov, observs) in enumerate(filas):
+            campos = [''] * 21
+            campos[:4] = [str(i), 'EPS025', 'CC', str(doc)]
+            campos[8:13] = ['01/01/1990', '05', '001', nov, '15/01/2023']
+            campos[20] = observs
+            f.write(','.join(campos) + '\n')
+
+
+def test_consolidate_folder_with_undated_file(tmp_path):
+    entrada, salida = tmp_path / 'entrada', tmp_path / 'dataset'
+    entrada.mkdir()
+    write_neg(entrada / 'NSEPS02501022023.NEG', [(1, 'N01', 'GN0001(a);'), (2, 'N09', 'GN0002(b);GN0003(c);')])
+    write_neg(entrada / 'NSEPS025extra.NEG', [(3, 'N01', 'GN0004(d);')])  # El nombre no trae la fecha.
+
+    plan = consolidate_folder(str(entrada), str(salida), workers=1)
+
+    assert len(plan['nuevos']) == 2
+    df = read_dataset(str(salida))
+    por_particion = df.groupby(['anio', 'mes'], observed=True).size().to_dict()
+    assert por_particion[(2023, 2)] == 3
+    assert por_particion[(0, 0)] == 1  # Partición de fecha desconocida.
+    assert os.path.isdir(salida / 'anio=0' / 'mes=0')
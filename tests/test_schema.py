@@ -0,0 +1,18 @@
+import numpy as np
+import pandas as pd
+
+from src.data.schema import coerce_neg, concat_chunks
+
+
+def test_concat_chunks_with_missing_categorical_column():
+    # Un archivo corto sin la columna llega toda en NaN (float64) después de alinear las columnas.
+    completo = coerce_neg(pd.DataFrame({'nov': ['N01', 'N09'], 'dep': ['05', '11']}))
+    corto = coerce_neg(pd.DataFrame({'nov': ['N01'], 'dep': [np.nan]}))
+    vacio = coerce_neg(pd.DataFrame({'nov': [np.nan], 'dep': [np.nan]}))
+
+    for bloques in ([completo, corto, vacio], [vacio, completo]):
+        df = concat_chunks(bloques)
+        assert isinstance(df['dep'].dtype, pd.CategoricalDtype)
+        assert df['dep'].cat.categories.dtype == object
+        assert sorted(df['dep'].dropna().unique()) == ['05', '11']
+    assert concat_chunks([completo, corto, vacio])['nov'].tolist()[:3] == ['N01', 'N09', 'N01']
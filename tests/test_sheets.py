@@ -0,0 +1,86 @@
+from src.data.fake_gspread import FakeClient, sample_values
+from src.data.cache import DiskCache
+from src.data.sheets import SheetsRefresher
+
+HOJA = ('hoja-de-prueba', 'dataset_limpio')
+
+
+def nuevo_refresher(client):
+    return SheetsRefresher(lambda: client, *HOJA, rango='A:D', interval=0)
+
+
+def test_unchanged_sheet_skips_batch_get():
+    client = FakeClient(sheets={HOJA: sample_values(filas=20)})
+    refresher = nuevo_refresher(client)
+    assert refresher.refresh() is True
+    assert client.calls['batch_get'] == 1
+
+    assert refresher.refresh() is False  # Misma fecha de modificación: no se leen los valores.
+    assert client.calls['batch_get'] == 1
+    assert client.calls['get_lastUpdateTime'] == 2
+    assert refresher.skipped == 1
+
+
+def test_read_error_keeps_last_frame_and_version():
+    client = FakeClient(sheets={HOJA: sample_values(filas=20)})
+    refresher = nuevo_refresher(client)
+    refresher.refresh()
+    df, version = refresher.get(), refresher.version
+
+    hoja = client.open_by_key(HOJA[0]).worksheet(HOJA[1])
+    hoja.update_values(sample_values(filas=30))
+
+    def falla(*args, **kwargs):
+        raise ConnectionError('sin red')
+    hoja.batch_get = falla
+    assert refresher.refresh() is False
+    assert refresher.get() is df and refresher.version == version
+    assert refresher.errors == 1 and 'sin red' in refresher.last_error
+
+    del hoja.batch_get  # La API vuelve: el siguiente ciclo lee el cambio.
+    assert refresher.refresh() is True
+    assert len(refresher.get()) == 30 and refresher.version != version
+
+
+def test_listeners_fire_once_per_change():
+    client = FakeClient(sheets={HOJA: sample_values(filas=20)})
+    refresher = nuevo_refresher(client)
+    recibidas = []
+    refresher.add_listener(recibidas.append)
+
+    refresher.refresh()
+    refresher.refresh()  # Sin cambios.
+    hoja = client.open_by_key(HOJA[0]).worksheet(HOJA[1])
+    hoja.update_values(sample_values(filas=20))  # Nueva fecha de modificación, mismos valores.
+    refresher.refresh()
+    hoja.update_values(sample_values(filas=25))
+    refresher.refresh()
+
+    assert len(recibidas) == 2
+    assert recibidas[-1] == refresher.version
+
+
+def test_only_one_process_reads_the_sheet(tmp_path):
+    # Dos actualizadores con la misma caché en disco, como dos workers: solo uno llama a la API.
+    cliente_a = FakeClient(sheets={HOJA: sample_values(filas=20)})
+    cliente_b = FakeClient(sheets={HOJA: sample_values(filas=20)})
+    a = SheetsRefresher(lambda: cliente_a, *HOJA, rango='A:D', interval=0, shared=DiskCache(tmp_path, ttl=float('inf')))
+    b = SheetsRefresher(lambda: cliente_b, *HOJA, rango='A:D', interval=0, shared=DiskCache(tmp_path, ttl=float('inf')))
+    recibidas = []
+    b.add_listener(recibidas.append)
+
+    assert a.refresh() is True
+    assert b.refresh() is True
+    assert cliente_b.calls['batch_get'] == 0 and cliente_b.calls['get_lastUpdateTime'] == 0
+    assert b.version == a.version and b.get().equals(a.get())
+    assert b.refresh() is False  # Sin escrituras nuevas en disco.
+
+    cliente_a.open_by_key(HOJA[0]).worksheet(HOJA[1]).update_values(sample_values(filas=25))
+    a.refresh()
+    b.refresh()
+    assert len(b.get()) == 25 and b.version == a.version
+    assert len(recibidas) == 2 and recibidas[-1] == a.version
+
+    a.stop()  # Suelta el bloqueo: el otro proceso pasa a leer la hoja.
+    b.refresh()
+    assert b.stats()['leader'] is True and cliente_b.calls['batch_get'] == 1
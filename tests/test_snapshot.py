@@ -0,0 +1,28 @@
+import os
+
+import pandas as pd
+
+from src.data.pipeline import consolidate_folder
+from src.data.snapshot import open_snapshot
+from src.data.store import read_dataset
+
+from test_pipeline import write_neg
+
+
+def test_snapshot_keeps_nullable_integers_and_mapped_categories(tmp_path):
+    entrada, salida = tmp_path / 'entrada', tmp_path / 'dataset'
+    entrada.mkdir()
+    write_neg(entrada / 'NSEPS02501022023.NEG', [(1, 'N01', 'GN0001(a);GN0002(b);'), ('', 'N09', ''), (3, 'N14', 'GN0003(c);')])
+    consolidate_folder(str(entrada), str(salida), workers=1)
+
+    snapshot = open_snapshot(str(salida))
+    df = snapshot.frame()
+    assert df['doc'].dtype == 'Int64' and df['doc'].isna().sum() == 1
+    assert isinstance(df['nov'].dtype, pd.CategoricalDtype) and df['nov'].cat.categories.dtype == 'string'
+    with open(os.path.join(snapshot.path, 'meta.json'), encoding='utf-8') as f:
+        assert 'categories' not in f.read()  # Las categorías están en los .npy mapeados.
+
+    esperado = read_dataset(str(salida), columns=list(df.columns))
+    for columna in df.columns:
+        assert df[columna].astype(object).where(df[columna].notna(), None).tolist() == \
+            esperado[columna].astype(object).where(esperado[columna].notna(), None).tolist()
@@ -0,0 +1,18 @@
+# -----------------------------------------------------------------------------
+# Descripción del Código:
+# Punto de entrada WSGI para producción. Expone el servidor Flask de la
+# aplicación Dash (`server`) para que lo sirva un servidor WSGI con varios
+# workers, por ejemplo:
+#
+#     gunicorn -c gunicorn.conf.py wsgi:server
+#
+# El modo de depuración queda apagado (DASH_DEBUG no se usa aquí) y las
+# respuestas se comprimen (DASH_COMPRESS=1 por defecto).
+#
+# Información Enviada:
+# - `server`: la aplicación Flask de `src.app`.
+# -----------------------------------------------------------------------------
+
+from src.app import app  # Importa la instancia de la aplicación Dash.
+
+server = app.server  # Aplicación WSGI (Flask) que sirve gunicorn.